@@ -41,9 +41,9 @@ class PostAdmin(admin.ModelAdmin):
             )
         return format_html(f'<a href="{author_change_url}">{obj.author}</a>')
 
-    @admin.display(description="likes")
+    @admin.display(description="likes", ordering='likes_count')
     def likes_counter_model(self, obj: Post) -> Any:
-        return obj.likes_stats
+        return obj.likes_count
 
     @admin.display(description="category")
     def category_model(self, obj: Post) -> str | None:
@@ -1,41 +1,81 @@
-from django.db.models.query import QuerySet
+from functools import partial
+from operator import getitem
+from typing import Any
+
+from django.db.models import Count, Q
 from django.http import HttpRequest
+from django.utils.functional import SimpleLazyObject
 from taggit.models import Tag
 
+from utils.cache_utils import bump_cache_version, get_or_build, get_versioned_key
+from utils.context_utils import lazy_context_value
+from utils.request_utils import get_request_section
+
 from .models import Category
 
+NAVIGATION_CACHE_NAMESPACE = 'blog:navigation'
+NAVIGATION_CACHE_TIMEOUT = 60 * 60
+MAIN_CATEGORIES_AMOUNT = 6
+NAVBAR_TAGS = ['sweets', 'snacks', 'drinks', 'ready-to-eat']
 
-def categories(request: HttpRequest) -> dict[str, QuerySet[Category]]:
-    """
-    Returns a category list that can be added to the template context.
-    """
-    return {'categories': Category.objects.all()}
+# Navigation keys used by the base templates of each website section
+NAVIGATION_SECTION_KEYS = {
+    'blog': ['categories', 'main_categories_blog', 'navbar_tags'],
+    'accounts': ['navbar_tags'],
+}
 
-def main_categories_blog(request: HttpRequest) -> dict[str, QuerySet[Category]]:
+
+def build_blog_navigation() -> dict[str, Any]:
     """
-    Returns a list contains six main categories that can be added to the template context.
+    Builds the blog navigation snapshot:
+    all categories, six main categories with the most published posts and navbar tags.
     """
-    all_categories = Category.objects.all()
+    all_categories = list(
+        Category.objects.annotate(
+            published_posts_amount=Count('posts', filter=Q(posts__status='PUB'))
+        ).order_by('pk')
+    )
     sorted_categories = sorted(
         all_categories,
-        key=lambda category: category.get_posts_amount(),
+        key=lambda category: category.published_posts_amount,
         reverse=True
     )
+    main_categories_pks = {
+        category.pk for category in sorted_categories[:MAIN_CATEGORIES_AMOUNT]
+    }
+    navbar_tags = list(
+        Tag.objects.filter(name__in=NAVBAR_TAGS).values_list('name', flat=True)
+    )
     return {
-        'main_categories_blog': 
-            all_categories.filter(pk__in=[category.pk for category in sorted_categories[:6]])
+        'categories': all_categories,
+        'main_categories_blog': [
+            category for category in all_categories
+            if category.pk in main_categories_pks
+        ],
+        'navbar_tags': navbar_tags,
     }
 
-def filter_existing_tags_for_navbar() -> list[str]:
-    expected_tags = ['sweets', 'snacks', 'drinks', 'ready-to-eat']
-    tags_qs = Tag.objects.filter(name__in=expected_tags)
-    context_navbar_tags = list(tags_qs.values_list('name', flat=True))
-    return context_navbar_tags
 
+def get_blog_navigation() -> dict[str, Any]:
+    key = get_versioned_key(NAVIGATION_CACHE_NAMESPACE, 'snapshot')
+    return get_or_build(key, build_blog_navigation, NAVIGATION_CACHE_TIMEOUT)
+
+
+def invalidate_blog_navigation() -> None:
+    bump_cache_version(NAVIGATION_CACHE_NAMESPACE)
 
-def navbar_tags(request: HttpRequest) -> dict[str, list[str]]:
+
+def blog_navigation(request: HttpRequest) -> dict[str, Any]:
     """
-    Returns a tag list to include it in the lower_navbar template.
+    Returns the blog navigation data used by the base template
+    of the current website section.
+    Values are lazy, so the snapshot is fetched only if a template uses it.
     """
-    context_navbar_tags = filter_existing_tags_for_navbar()
-    return {'navbar_tags': context_navbar_tags}
+    keys = NAVIGATION_SECTION_KEYS.get(get_request_section(request) or '')
+    if not keys:
+        return {}
+    navigation = SimpleLazyObject(get_blog_navigation)
+    return {
+        key: lazy_context_value(request, key, partial(getitem, navigation, key))
+        for key in keys
+    }
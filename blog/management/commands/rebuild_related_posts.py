@@ -0,0 +1,15 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from blog.models import RelatedPost
+
+
+class Command(BaseCommand):
+    help = "Recalculates the precomputed related posts scores of all posts."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        stored_scores = RelatedPost.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt related posts with {stored_scores} scores.")
+        )
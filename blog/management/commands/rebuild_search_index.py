@@ -0,0 +1,21 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from blog.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search index of the published posts."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Number of posts written to the index at once."
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        indexed_posts = get_search_backend().rebuild(batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f"Indexed {indexed_posts} posts.")
+        )
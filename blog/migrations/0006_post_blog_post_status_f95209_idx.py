@@ -0,0 +1,19 @@
+# Generated by Django 4.2.3 on 2026-10-18 15:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0005_post_publication"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["status", "-pub_date", "id"], name="blog_post_status_f95209_idx"
+            ),
+        ),
+    ]
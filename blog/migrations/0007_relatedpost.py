@@ -0,0 +1,58 @@
+# Generated by Django 4.2.3 on 2026-10-18 15:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0006_post_blog_post_status_f95209_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RelatedPost",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.PositiveIntegerField()),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="related_scores",
+                        to="blog.post",
+                    ),
+                ),
+                (
+                    "related_post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="related_to_scores",
+                        to="blog.post",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["post", "-score"], name="blog_relate_post_id_890554_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="relatedpost",
+            constraint=models.UniqueConstraint(
+                fields=("post", "related_post"), name="unique_related_post"
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.3 on 2026-10-18 15:40
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_likes_count(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    likes = (
+        Post.likes.through.objects.filter(post=OuterRef("pk"))
+        .order_by()
+        .values("post")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    Post.objects.update(
+        likes_count=Coalesce(Subquery(likes, output_field=IntegerField()), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0007_relatedpost"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="likes_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_likes_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.3 on 2026-10-18 15:48
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE blog_post_search USING fts5("
+            "title, meta_description, body, tags, "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE TABLE blog_post_search ("
+            "post_id bigint PRIMARY KEY REFERENCES blog_post (id) ON DELETE CASCADE, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX blog_post_search_document_idx "
+            "ON blog_post_search USING GIN (document)"
+        )
+
+
+# Space separated tag names of the post p, like in blog.search.get_post_document
+POST_TAGS_SQL = (
+    "SELECT {aggregate} FROM taggit_taggeditem ti "
+    "JOIN taggit_tag t ON t.id = ti.tag_id "
+    "JOIN django_content_type ct ON ct.id = ti.content_type_id "
+    "WHERE ct.app_label = 'blog' AND ct.model = 'post' AND ti.object_id = p.id"
+)
+
+
+def fill_search_index(apps, schema_editor):
+    """
+    Indexes the existing published posts, like the rebuild_search_index command,
+    so the search works right after the deployment.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        tags = POST_TAGS_SQL.format(aggregate="group_concat(t.name, ' ')")
+        schema_editor.execute(
+            "INSERT INTO blog_post_search (rowid, title, meta_description, body, tags) "
+            f"SELECT p.id, p.title, p.meta_description, p.body, COALESCE(({tags}), '') "
+            "FROM blog_post p WHERE p.status = 'PUB'"
+        )
+    elif vendor == "postgresql":
+        tags = POST_TAGS_SQL.format(aggregate="string_agg(t.name, ' ')")
+        schema_editor.execute(
+            "INSERT INTO blog_post_search (post_id, document) "
+            "SELECT p.id, "
+            "setweight(to_tsvector('simple', p.title), 'A') || "
+            "setweight(to_tsvector('simple', p.meta_description), 'B') || "
+            "setweight(to_tsvector('simple', p.body), 'D') || "
+            f"setweight(to_tsvector('simple', COALESCE(({tags}), '')), 'B') "
+            "FROM blog_post p WHERE p.status = 'PUB'"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ("sqlite", "postgresql"):
+        schema_editor.execute("DROP TABLE IF EXISTS blog_post_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0008_post_likes_count"),
+        ("taggit", "0005_auto_20220424_2025"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(fill_search_index, migrations.RunPython.noop),
+    ]
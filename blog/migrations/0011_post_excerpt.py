@@ -0,0 +1,35 @@
+# Generated by Django 4.2.3 on 2026-10-18 16:02
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 150
+BATCH_SIZE = 500
+
+
+def populate_excerpts(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    posts = []
+    for post in Post.objects.only("pk", "body").iterator(chunk_size=BATCH_SIZE):
+        post.excerpt = Truncator(post.body).words(EXCERPT_WORDS, truncate=" …")
+        posts.append(post)
+        if len(posts) >= BATCH_SIZE:
+            Post.objects.bulk_update(posts, ["excerpt"])
+            posts = []
+    Post.objects.bulk_update(posts, ["excerpt"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0010_post_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="excerpt",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(populate_excerpts, migrations.RunPython.noop),
+    ]
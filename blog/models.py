@@ -1,10 +1,13 @@
-from typing import Any
+from typing import Any, Iterable
 
 from django.contrib.auth import get_user_model
-from django.db import models
-from django.db.models import Q, QuerySet
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Count, F, OuterRef, Q, QuerySet, Subquery
+from django.db.models.functions import Coalesce
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.text import Truncator
 from django_resized import ResizedImageField
 from taggit.managers import TaggableManager
 
@@ -37,14 +40,26 @@ class Category(models.Model):
     def get_absolute_url(self) -> str:
         return reverse("blog:category", kwargs={"category_slug": self.slug})
 
-    def get_posts(self) -> QuerySet['Post']:
+    def get_posts(self) -> 'PostQuerySet':
         return self.posts.filter(status='PUB')
 
     def get_posts_amount(self) -> int:
         return self.get_posts().count()
 
 
-class TaggedPostsManager(models.Manager):
+class PostQuerySet(models.QuerySet):
+    def feed(self) -> 'PostQuerySet':
+        """
+        Loads everything displayed for each post in the post lists
+        (author, category, comments counter and tags) in a fixed number of queries.
+        The lists display the stored excerpts, so the full bodies are not loaded.
+        """
+        return self.select_related(
+            'author', 'category', 'publication'
+        ).prefetch_related('tags').defer('body')
+
+
+class TaggedPostsManager(models.Manager.from_queryset(PostQuerySet)):  # type: ignore
     def get_queryset(self) -> QuerySet:
         return super().get_queryset().filter(status='PUB')
 
@@ -65,6 +80,7 @@ class Post(models.Model):
     title = models.CharField(max_length=50, unique=True)
     slug = models.SlugField(max_length=50, unique=True, null=True, blank=True)
     pub_date = models.DateField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
     image = ResizedImageField(
         size=[800, None],
         upload_to='review_images',
@@ -91,6 +107,7 @@ class Post(models.Model):
     )
     meta_description = models.CharField(max_length=150, blank=True)
     body = models.TextField()
+    excerpt = models.TextField(blank=True, editable=False)
     status = models.CharField(
         choices=Status.choices,
         max_length=50,
@@ -103,11 +120,26 @@ class Post(models.Model):
     likes: models.ManyToManyField = models.ManyToManyField(
         User, related_name='post_likes', blank=True
     )
-    objects = models.Manager()
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    objects = PostQuerySet.as_manager()
     tagged_posts = TaggedPostsManager()
 
+    EXCERPT_WORDS = 150
+
+    # The category currently stored in the database, used to update the related posts
+    _stored_category_id: int | None = None
+
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(fields=['status', '-pub_date', 'id']),
+        ]
+
+    @classmethod
+    def from_db(cls, db: str | None, field_names: Any, values: Any) -> 'Post':
+        instance = super().from_db(db, field_names, values)
+        instance._stored_category_id = instance.__dict__.get('category_id')
+        return instance
 
     def __str__(self) -> str:
         return self.title
@@ -121,14 +153,33 @@ class Post(models.Model):
         if not self.category:
             default_category, _ = Category.objects.get_or_create(name='Other')
             self.category = default_category
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'body' in update_fields:
+            self.excerpt = self.make_excerpt(self.body)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'excerpt'}
         super().save(*args, **kwargs)
+        self._stored_category_id = self.category_id
+
+    @classmethod
+    def make_excerpt(cls, body: str) -> str:
+        """
+        Returns the beginning of the body displayed in the post lists,
+        stored on save so the lists don't have to truncate the whole bodies.
+        """
+        return Truncator(body).words(cls.EXCERPT_WORDS, truncate=' …')
 
     def get_absolute_url(self) -> str:
         return reverse("blog:detail_review", kwargs={"post_slug": self.slug})
 
+    @property
+    def active_comments(self) -> int:
+        return self.publication.active_comments if self.publication else 0
+
     @property
     def likes_stats(self) -> int:
-        return self.likes.count()
+        return self.likes_count
 
     def display_likes_stats(self) -> str:
         likes_stats = self.likes_stats
@@ -136,48 +187,197 @@ class Post(models.Model):
         return likes_stats_display
 
     @classmethod
-    def get_tagged_posts(cls, tag_slug: str) -> QuerySet['Post']:
+    def get_tagged_posts(cls, tag_slug: str) -> 'PostQuerySet':
         return cls.tagged_posts.all().filter(tags__slug=tag_slug)
 
     @classmethod
     def get_popular_posts(cls, amount: int) -> list['Post']:
-        posts_with_comment_counters = {}
+        """
+        Gets published posts with the highest number of active comments.
+        Posts are ranked by the stored publication counter, ties keep the newest first.
+        """
+        popular_posts = cls.objects.filter(
+            status='PUB',
+            publication__isnull=False
+        ).order_by('-publication__active_comments_count', '-pub_date', 'pk')[:amount]
+
+        return list(popular_posts)
+
+    def get_related_posts(self, amount: int) -> list['Post']:
+        """
+        Gets posts that have the same tags as post in order to propose them to the user.
+        Posts are ranked by the precomputed similarity score (see RelatedPost).
+        """
+        related_posts = Post.objects.filter(
+            related_to_scores__post=self
+        ).order_by('-related_to_scores__score', '-pub_date', 'pk')[:amount]
+        return list(related_posts)
 
-        for post in cls.objects.filter(status='PUB'):
-            if post.publication:
-                posts_with_comment_counters[post] = post.publication.active_comments
+    def toggle_like(self, user: AccountsUser) -> bool:
+        """
+        Toggle like for the given user.
+        The like and the stored likes counter are changed in one transaction,
+        then the current counter value is loaded into the post.
+        """
+        like_model = Post.likes.through
+        with transaction.atomic():
+            removed, _ = like_model.objects.filter(
+                post_id=self.pk, user_id=user.pk
+            ).delete()
+            liked = not removed
+            delta = -1
+            if liked:
+                try:
+                    with transaction.atomic():
+                        like_model.objects.create(post_id=self.pk, user_id=user.pk)
+                    delta = 1
+                except IntegrityError:
+                    # The like has just been added by a concurrent request
+                    delta = 0
+            Post.objects.filter(pk=self.pk).update(likes_count=F('likes_count') + delta)
+            self.likes_count = Post.objects.values_list(
+                'likes_count', flat=True
+            ).get(pk=self.pk)
+        return liked
 
-        popular_posts_with_comment_counters = sorted(
-            posts_with_comment_counters.items(),
-            key=lambda x: x[1],
-            reverse=True
+    @classmethod
+    def update_likes_count(cls, post_pks: Iterable[int]) -> None:
+        """
+        Recalculates the stored likes counters of the given posts.
+        """
+        likes = cls.likes.through.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(total=Count('pk')).values('total')
+        cls.objects.filter(pk__in=list(post_pks)).update(
+            likes_count=Coalesce(Subquery(likes, output_field=models.IntegerField()), 0)
         )
 
-        # Get just posts without comment counters
-        popular_posts = [
-            popular_post[0] for popular_post
-            in popular_posts_with_comment_counters
-        ][:amount]
 
-        return popular_posts
+class RelatedPost(models.Model):
+    """
+    Precomputed similarity score of two posts sharing at least one tag.
+    Every shared tag counts twice as much as the same category.
+    """
+    SHARED_TAG_SCORE = 2
+    SAME_CATEGORY_SCORE = 1
 
-    def get_related_posts(self, amount: int) -> list['Post']:
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_scores'
+    )
+    related_post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='related_to_scores'
+    )
+    score = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'related_post'], name='unique_related_post'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['post', '-score']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.related_post} related to {self.post} ({self.score})"
+
+    @classmethod
+    def calculate_score(cls, shared_tags: int, same_category: bool) -> int:
+        return (
+            shared_tags * cls.SHARED_TAG_SCORE
+            + int(same_category) * cls.SAME_CATEGORY_SCORE
+        )
+
+    @classmethod
+    def update_for_post(cls, post: Post) -> None:
         """
-        Gets random posts that have the same tag
-        as post in order to propose them to the user.
+        Recalculates the similarity scores between the given post and all the others.
         """
-        post_tags = self.tags.all()
-        all_related_posts = list(
-            Post.objects.filter(tags__in=post_tags).exclude(pk=self.pk).distinct()
-        )
-        return all_related_posts[:amount]
+        candidates = Post.objects.filter(
+            tags__in=post.tags.all()
+        ).exclude(pk=post.pk).values('pk', 'category_id').annotate(
+            shared_tags=Count('tags')
+        ).order_by()
 
-    def toggle_like(self, user: AccountsUser) -> bool:
+        related_posts = []
+        for candidate in candidates:
+            score = cls.calculate_score(
+                candidate['shared_tags'], candidate['category_id'] == post.category_id
+            )
+            related_posts.append(
+                cls(post_id=post.pk, related_post_id=candidate['pk'], score=score)
+            )
+            related_posts.append(
+                cls(post_id=candidate['pk'], related_post_id=post.pk, score=score)
+            )
+
+        with transaction.atomic():
+            cls.objects.filter(Q(post=post) | Q(related_post=post)).delete()
+            cls.objects.bulk_create(related_posts)
+
+    @classmethod
+    def remove_shared_tag(cls, tag_id: int) -> None:
         """
-        Toggle like for the given user.
+        Lowers the scores of the posts sharing the tag which is going to be deleted
+        and removes the pairs which have no other shared tags.
+        Deleting a tag removes its tagged items without the m2m_changed signal.
         """
-        if self.likes.filter(pk=user.pk).exists():
-            self.likes.remove(user)
-            return False
-        self.likes.add(user)
-        return True
+        tagged_posts = Post.tags.through.objects.filter(
+            tag_id=tag_id, content_type=ContentType.objects.get_for_model(Post)
+        ).values('object_id')
+        with transaction.atomic():
+            cls.objects.filter(
+                post__in=tagged_posts, related_post__in=tagged_posts
+            ).update(score=F('score') - cls.SHARED_TAG_SCORE)
+            cls.objects.filter(score__lt=cls.SHARED_TAG_SCORE).delete()
+
+    @classmethod
+    def rebuild(cls, batch_size: int = 1000) -> int:
+        """
+        Recalculates the similarity scores of all posts in bulk.
+        The pairs of posts sharing tags are counted in the database
+        with a self-join of the tagged items and inserted with INSERT ... SELECT,
+        for batch_size posts at a time. Returns the number of stored scores.
+        """
+        quote_name = connection.ops.quote_name
+        tagged_items = quote_name(Post.tags.through._meta.db_table)
+        posts = quote_name(Post._meta.db_table)
+        scores = quote_name(cls._meta.db_table)
+        insert_scores = f"""
+            INSERT INTO {scores} (post_id, related_post_id, score)
+            SELECT item.object_id, related_item.object_id,
+                COUNT(*) * %s + CASE
+                    WHEN source_post.category_id = related_post.category_id
+                        OR (source_post.category_id IS NULL
+                            AND related_post.category_id IS NULL)
+                    THEN %s ELSE 0 END
+            FROM {tagged_items} item
+            INNER JOIN {tagged_items} related_item
+                ON related_item.tag_id = item.tag_id
+                AND related_item.content_type_id = item.content_type_id
+                AND related_item.object_id <> item.object_id
+            INNER JOIN {posts} source_post ON source_post.id = item.object_id
+            INNER JOIN {posts} related_post ON related_post.id = related_item.object_id
+            WHERE item.content_type_id = %s AND item.object_id BETWEEN %s AND %s
+            GROUP BY item.object_id, related_item.object_id,
+                source_post.category_id, related_post.category_id
+        """
+        content_type_id = ContentType.objects.get_for_model(Post).pk
+        post_pks = list(Post.objects.order_by('pk').values_list('pk', flat=True))
+
+        stored_scores = 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            cls.objects.all().delete()
+            for start in range(0, len(post_pks), batch_size):
+                batch = post_pks[start:start + batch_size]
+                cursor.execute(insert_scores, [
+                    cls.SHARED_TAG_SCORE, cls.SAME_CATEGORY_SCORE,
+                    content_type_id, batch[0], batch[-1],
+                ])
+                stored_scores += cursor.rowcount
+        return stored_scores
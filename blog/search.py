@@ -0,0 +1,318 @@
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache, reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.utils.module_loading import import_string
+
+from .models import Post
+
+SEARCH_TABLE = 'blog_post_search'
+
+
+def get_post_document(post: Post) -> dict[str, str]:
+    """
+    Returns the searchable texts of the post.
+    """
+    return {
+        'title': post.title,
+        'meta_description': post.meta_description,
+        'body': post.body,
+        'tags': ' '.join(post.tags.values_list('name', flat=True)),
+    }
+
+
+def get_query_terms(query: str) -> list[str]:
+    """
+    Splits the user query into words, dropping all the search syntax characters.
+    """
+    return re.findall(r'\w+', query.lower())
+
+
+class BaseSearchBackend(ABC):
+    """
+    A basic search backend maintaining the full-text index of published posts.
+    """
+
+    @abstractmethod
+    def _write_documents(self, documents: dict[int, dict[str, str]]) -> None:
+        """Inserts or replaces the index documents of the given posts."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    @abstractmethod
+    def remove_post(self, post_pk: int) -> None:
+        """Removes the post from the index."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Removes all the posts from the index."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    @abstractmethod
+    def search(self, query: str, limit: int, offset: int = 0) -> list[int]:
+        """Returns primary keys of the matching posts, the most relevant first."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    @abstractmethod
+    def count(self, query: str) -> int:
+        """Returns the number of the matching posts."""
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def index_post(self, post: Post) -> None:
+        """Adds the published post to the index, removes it otherwise."""
+        if post.status == Post.Status.PUBLISHED:
+            self._write_documents({post.pk: get_post_document(post)})
+        else:
+            self.remove_post(post.pk)
+
+    def rebuild(self, batch_size: int = 500) -> int:
+        """
+        Rebuilds the whole index in batches. Returns the number of indexed posts.
+        """
+        self.clear()
+        posts = Post.objects.filter(
+            status=Post.Status.PUBLISHED
+        ).prefetch_related('tags').order_by('pk')
+        indexed = 0
+        documents = {}
+
+        for post in posts.iterator(chunk_size=batch_size):
+            documents[post.pk] = {
+                'title': post.title,
+                'meta_description': post.meta_description,
+                'body': post.body,
+                'tags': ' '.join(tag.name for tag in post.tags.all()),
+            }
+            if len(documents) >= batch_size:
+                self._write_documents(documents)
+                indexed += len(documents)
+                documents = {}
+
+        if documents:
+            self._write_documents(documents)
+            indexed += len(documents)
+        return indexed
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    Search backend based on the SQLite FTS5 virtual table ranked with bm25.
+    """
+    # bm25 weights of the title, meta_description, body and tags columns
+    WEIGHTS = (10.0, 5.0, 1.0, 5.0)
+
+    def _get_match_expression(self, query: str) -> str:
+        return ' '.join(f'"{term}"*' for term in get_query_terms(query))
+
+    def _write_documents(self, documents: dict[int, dict[str, str]]) -> None:
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s',
+                [(post_pk,) for post_pk in documents]
+            )
+            cursor.executemany(
+                f'INSERT INTO {SEARCH_TABLE} '
+                '(rowid, title, meta_description, body, tags) '
+                'VALUES (%s, %s, %s, %s, %s)',
+                [
+                    (
+                        post_pk, document['title'], document['meta_description'],
+                        document['body'], document['tags']
+                    )
+                    for post_pk, document in documents.items()
+                ]
+            )
+
+    def remove_post(self, post_pk: int) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [post_pk])
+
+    def clear(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+
+    def search(self, query: str, limit: int, offset: int = 0) -> list[int]:
+        match_expression = self._get_match_expression(query)
+        if not match_expression:
+            return []
+        weights = ', '.join(str(weight) for weight in self.WEIGHTS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s '
+                f'ORDER BY bm25({SEARCH_TABLE}, {weights}) LIMIT %s OFFSET %s',
+                [match_expression, limit, offset]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def count(self, query: str) -> int:
+        match_expression = self._get_match_expression(query)
+        if not match_expression:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s',
+                [match_expression]
+            )
+            return cursor.fetchone()[0]
+
+
+class PostgreSQLSearchBackend(BaseSearchBackend):
+    """
+    Search backend based on a weighted tsvector column with a GIN index,
+    ranked with ts_rank.
+    """
+    CONFIG = 'simple'
+
+    def _get_tsquery(self, query: str) -> str:
+        return ' & '.join(f'{term}:*' for term in get_query_terms(query))
+
+    def _write_documents(self, documents: dict[int, dict[str, str]]) -> None:
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {SEARCH_TABLE} (post_id, document) VALUES ('
+                '%s, '
+                f"setweight(to_tsvector('{self.CONFIG}', %s), 'A') || "
+                f"setweight(to_tsvector('{self.CONFIG}', %s), 'B') || "
+                f"setweight(to_tsvector('{self.CONFIG}', %s), 'D') || "
+                f"setweight(to_tsvector('{self.CONFIG}', %s), 'B')"
+                ') ON CONFLICT (post_id) DO UPDATE SET document = EXCLUDED.document',
+                [
+                    (
+                        post_pk, document['title'], document['meta_description'],
+                        document['body'], document['tags']
+                    )
+                    for post_pk, document in documents.items()
+                ]
+            )
+
+    def remove_post(self, post_pk: int) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE post_id = %s', [post_pk])
+
+    def clear(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {SEARCH_TABLE}')
+
+    def search(self, query: str, limit: int, offset: int = 0) -> list[int]:
+        tsquery = self._get_tsquery(query)
+        if not tsquery:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT post_id FROM {SEARCH_TABLE}, '
+                f"to_tsquery('{self.CONFIG}', %s) query WHERE document @@ query "
+                'ORDER BY ts_rank(document, query) DESC, post_id LIMIT %s OFFSET %s',
+                [tsquery, limit, offset]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def count(self, query: str) -> int:
+        tsquery = self._get_tsquery(query)
+        if not tsquery:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {SEARCH_TABLE} '
+                f"WHERE document @@ to_tsquery('{self.CONFIG}', %s)",
+                [tsquery]
+            )
+            return cursor.fetchone()[0]
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """
+    Fallback search backend for databases without a full-text index.
+    It doesn't store anything and matches the posts containing all the query terms
+    with icontains lookups, the newest first.
+    """
+    FIELDS = ('title', 'meta_description', 'body', 'tags__name')
+
+    def _get_matching_posts(self, query: str) -> QuerySet[Post] | None:
+        terms = get_query_terms(query)
+        if not terms:
+            return None
+        posts = Post.objects.filter(status=Post.Status.PUBLISHED)
+        for term in terms:
+            lookups = [Q(**{f'{field}__icontains': term}) for field in self.FIELDS]
+            posts = posts.filter(reduce(or_, lookups))
+        return posts.distinct()
+
+    def _write_documents(self, documents: dict[int, dict[str, str]]) -> None:
+        pass
+
+    def remove_post(self, post_pk: int) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def rebuild(self, batch_size: int = 500) -> int:
+        return 0
+
+    def search(self, query: str, limit: int, offset: int = 0) -> list[int]:
+        posts = self._get_matching_posts(query)
+        if posts is None:
+            return []
+        return list(
+            posts.order_by('-pub_date', 'pk').values_list('pk', flat=True)[
+                offset:offset + limit
+            ]
+        )
+
+    def count(self, query: str) -> int:
+        posts = self._get_matching_posts(query)
+        return 0 if posts is None else posts.count()
+
+
+DEFAULT_SEARCH_BACKENDS = {
+    'sqlite': 'blog.search.SQLiteSearchBackend',
+    'postgresql': 'blog.search.PostgreSQLSearchBackend',
+}
+
+
+@lru_cache(maxsize=None)
+def get_search_backend() -> BaseSearchBackend:
+    """
+    Returns the search backend set in the BLOG_SEARCH_BACKEND setting
+    or the default one for the current database.
+    Databases without a full-text backend fall back to the simple one,
+    so saving posts never fails because of the search index.
+    """
+    backend_path = getattr(settings, 'BLOG_SEARCH_BACKEND', None)
+    if backend_path is None:
+        backend_path = DEFAULT_SEARCH_BACKENDS.get(
+            connection.vendor, 'blog.search.SimpleSearchBackend'
+        )
+    return import_string(backend_path)()
+
+
+class SearchResults:
+    """
+    Lazy, sliceable sequence of the ranked search results,
+    used with Django's Paginator.
+    Each page is loaded with one search query and one posts query.
+    """
+
+    def __init__(self, query: str) -> None:
+        self.query = query
+        self.backend = get_search_backend()
+
+    def count(self) -> int:
+        return self.backend.count(self.query)
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __getitem__(self, page_slice: slice) -> list[Post]:
+        offset = page_slice.start or 0
+        limit = page_slice.stop - offset
+        post_pks = self.backend.search(self.query, limit=limit, offset=offset)
+        # The index may still contain posts unpublished with queryset updates
+        posts = Post.objects.filter(
+            pk__in=post_pks, status=Post.Status.PUBLISHED
+        ).feed().in_bulk()
+        return [posts[post_pk] for post_pk in post_pks if post_pk in posts]
@@ -0,0 +1,41 @@
+from typing import Any
+
+from comments.models import Publication
+from utils.cache_utils import bump_cache_version, get_or_build, get_versioned_key
+
+from .models import Post
+
+SIDEBAR_CACHE_NAMESPACE = 'blog:sidebar'
+SIDEBAR_CACHE_TIMEOUT = 60 * 15
+POPULAR_POSTS_AMOUNT = 5
+RECENT_COMMENTS_AMOUNT = 3
+
+
+def build_sidebar_data() -> dict[str, Any]:
+    """
+    Computes the data displayed in the blog sidebar.
+    """
+    recent_comments = Publication.get_recent_comments(RECENT_COMMENTS_AMOUNT, 'post')
+    if recent_comments is not None:
+        recent_comments = recent_comments.select_related(
+            'logged_user', 'publication__post'
+        )
+        # Evaluate the queryset, so its results are stored in the cache
+        len(recent_comments)
+
+    return {
+        'popular_posts': Post.get_popular_posts(POPULAR_POSTS_AMOUNT),
+        'recent_comments': recent_comments,
+    }
+
+
+def get_sidebar_data() -> dict[str, Any]:
+    """
+    Returns the blog sidebar data shared by all the post list views.
+    """
+    key = get_versioned_key(SIDEBAR_CACHE_NAMESPACE, 'data')
+    return get_or_build(key, build_sidebar_data, SIDEBAR_CACHE_TIMEOUT)
+
+
+def invalidate_sidebar_data() -> None:
+    bump_cache_version(SIDEBAR_CACHE_NAMESPACE)
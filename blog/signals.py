@@ -1,8 +1,20 @@
-from django.db.models.signals import post_delete, pre_save
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (m2m_changed, post_delete, post_save, pre_delete,
+                                      pre_save)
 from django.dispatch import receiver
+from django.utils import timezone
 from taggit.models import Tag
 
-from .models import Post, convert_to_slug
+from accounts.models import User as AccountsUser
+from comments.models import Comment
+
+from .context_processors import invalidate_blog_navigation
+from .models import Category, Post, RelatedPost, convert_to_slug
+from .search import get_search_backend
+from .sidebar import invalidate_sidebar_data
+
+TAGS_CHANGE_ACTIONS = ('post_add', 'post_remove', 'post_clear')
 
 
 @receiver(pre_save, sender=Tag)
@@ -13,3 +25,95 @@ def convert_tag_to_slug(sender, instance, i=None, **kwargs):
 def delete_publication_with_post(sender, instance, **kwargs):
     if instance.publication:
         instance.publication.delete()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_sidebar_cache(sender, instance, **kwargs):
+    """
+    Invalidates the cached sidebar data right away and once again
+    after commit, so the sidebar is never left rebuilt from uncommitted data.
+    """
+    invalidate_sidebar_data()
+    transaction.on_commit(invalidate_sidebar_data)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_navigation_cache(sender, instance, **kwargs):
+    invalidate_blog_navigation()
+    transaction.on_commit(invalidate_blog_navigation)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def update_related_posts_on_tags_change(sender, instance, action, **kwargs):
+    if action in TAGS_CHANGE_ACTIONS and isinstance(instance, Post):
+        RelatedPost.update_for_post(instance)
+
+
+@receiver(pre_delete, sender=Tag)
+def update_related_posts_on_tag_delete(sender, instance, **kwargs):
+    RelatedPost.remove_shared_tag(instance.pk)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def touch_post_on_tags_change(sender, instance, action, **kwargs):
+    """Tags are displayed with the post, so they are a part of its version."""
+    if action in TAGS_CHANGE_ACTIONS and isinstance(instance, Post):
+        instance.updated_at = timezone.now()
+        Post.objects.filter(pk=instance.pk).update(updated_at=instance.updated_at)
+
+
+@receiver(post_save, sender=Post)
+def update_related_posts_on_post_change(sender, instance, created, **kwargs):
+    """The category of the post is a part of the similarity score."""
+    update_fields = kwargs['update_fields']
+    if created or (update_fields is not None and 'category' not in update_fields):
+        return
+    if instance.category_id != instance._stored_category_id:
+        RelatedPost.update_for_post(instance)
+
+
+@receiver(m2m_changed, sender=Post.likes.through)
+def update_likes_count(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keeps the stored likes counters correct when likes are changed
+    through the many-to-many managers (e.g. in the admin panel).
+    """
+    if action in ('post_add', 'post_remove'):
+        post_pks = pk_set if reverse else [instance.pk]
+        Post.update_likes_count(post_pks)
+        if not reverse:
+            instance.refresh_from_db(fields=['likes_count'])
+    elif action == 'post_clear' and not reverse:
+        Post.objects.filter(pk=instance.pk).update(likes_count=0)
+        instance.likes_count = 0
+    elif action == 'pre_clear' and reverse:
+        Post.objects.filter(likes=instance).update(likes_count=F('likes_count') - 1)
+
+
+@receiver(pre_delete, sender=AccountsUser)
+def decrease_likes_count_of_deleted_user(sender, instance, **kwargs):
+    Post.objects.filter(likes=instance).update(likes_count=F('likes_count') - 1)
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, **kwargs):
+    get_search_backend().index_post(instance)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def update_search_index_on_tags_change(sender, instance, action, **kwargs):
+    if action in TAGS_CHANGE_ACTIONS and isinstance(instance, Post):
+        get_search_backend().index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    get_search_backend().remove_post(instance.pk)
@@ -0,0 +1,19 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from blog.models import Post, RelatedPost
+
+
+class RebuildRelatedPostsCommandTests(TestCase):
+    def setUp(self):
+        self.post = Post.objects.create(title='Test Post', body='Body.')
+        self.post.tags.add('sweets')
+        self.related_post = Post.objects.create(title='Related Post', body='Body.')
+        self.related_post.tags.add('sweets')
+
+    def test_rebuild_restores_related_posts(self):
+        RelatedPost.objects.all().delete()
+        call_command('rebuild_related_posts', stdout=StringIO())
+        self.assertEqual(self.post.get_related_posts(3), [self.related_post])
@@ -0,0 +1,98 @@
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.urls import resolve, reverse
+from taggit.models import Tag
+
+from blog.context_processors import blog_navigation, get_blog_navigation
+from blog.models import Category, Post
+
+
+class BlogNavigationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.categories = [
+            Category.objects.create(name=f'category {i}') for i in range(8)
+        ]
+        for number, category in enumerate(self.categories):
+            for post_number in range(number):
+                Post.objects.create(
+                    title=f'post {number} {post_number}',
+                    body='body',
+                    category=category,
+                    status='PUB'
+                )
+        Tag.objects.create(name='sweets')
+        Tag.objects.create(name='random')
+
+    def test_navigation_contains_six_main_categories(self):
+        main_categories = get_blog_navigation()['main_categories_blog']
+        self.assertEqual(main_categories, self.categories[2:])
+
+    def test_navigation_contains_existing_navbar_tags(self):
+        self.assertEqual(get_blog_navigation()['navbar_tags'], ['sweets'])
+
+    def test_navigation_is_built_with_two_queries(self):
+        with self.assertNumQueries(2):
+            get_blog_navigation()
+
+    def test_navigation_is_cached(self):
+        get_blog_navigation()
+        with self.assertNumQueries(0):
+            get_blog_navigation()
+
+    def test_navigation_invalidated_on_category_change(self):
+        get_blog_navigation()
+        new_category = Category.objects.create(name='new category')
+        self.assertIn(new_category, get_blog_navigation()['categories'])
+
+    def test_navigation_invalidated_on_tag_change(self):
+        get_blog_navigation()
+        Tag.objects.create(name='drinks')
+        self.assertIn('drinks', get_blog_navigation()['navbar_tags'])
+
+    def test_blog_pages_receive_only_blog_navigation(self):
+        response = self.client.get(reverse('blog:home'))
+        self.assertIn('main_categories_blog', response.context)
+        self.assertIn('navbar_tags', response.context)
+        self.assertNotIn('product_brands', response.context)
+        self.assertNotIn('main_categories_shop', response.context)
+
+    def test_accounts_pages_receive_only_navbar_tags(self):
+        response = self.client.get(reverse('accounts:login'))
+        self.assertIn('navbar_tags', response.context)
+        self.assertNotIn('main_categories_blog', response.context)
+        self.assertNotIn('product_brands', response.context)
+
+
+class LazyBlogNavigationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Tag.objects.create(name='sweets')
+        self.request = RequestFactory().get(reverse('blog:home'))
+        self.request.resolver_match = resolve(reverse('blog:home'))
+
+    def test_navigation_values_are_not_evaluated_until_used(self):
+        with self.assertNumQueries(0):
+            context = blog_navigation(self.request)
+        self.assertEqual(
+            self.request.provided_context_values,
+            {'categories', 'main_categories_blog', 'navbar_tags'}
+        )
+        self.assertEqual(set(context), self.request.provided_context_values)
+        self.assertFalse(hasattr(self.request, 'evaluated_context_values'))
+
+    def test_used_navigation_value_is_recorded(self):
+        context = blog_navigation(self.request)
+        self.assertEqual(list(context['navbar_tags']), ['sweets'])
+        self.assertEqual(self.request.evaluated_context_values, {'navbar_tags'})
+
+    def test_navigation_snapshot_fetched_once_per_request(self):
+        context = blog_navigation(self.request)
+        list(context['navbar_tags'])
+        with self.assertNumQueries(0):
+            list(context['categories'])
+
+    def test_unused_context_values_are_logged(self):
+        with self.assertLogs('utils.context_utils', level='INFO') as logs:
+            self.client.get(reverse('blog:home'))
+        self.assertIn("unused: ['categories']", logs.output[0])
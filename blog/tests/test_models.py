@@ -1,11 +1,14 @@
 from datetime import datetime
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.forms import ValidationError
 from django.test import TestCase
 from django.utils import timezone
+from taggit.models import Tag
 
-from blog.models import Category, Post
+from blog.models import Category, Post, RelatedPost
+from comments.models import Comment
 
 User = get_user_model()
 
@@ -164,3 +167,233 @@ class CategoryModelTests(TestCase):
             self.category.get_absolute_url(),
             expected_category_absolute_url
         )
+
+
+class PostPopularPostsTests(TestCase):
+    def setUp(self):
+        self.first_post = Post.objects.create(
+            title='first_post',
+            body='first_body',
+            status='PUB',
+            pub_date=datetime(2023, 1, 1).date()
+        )
+        self.second_post = Post.objects.create(
+            title='second_post',
+            body='second_body',
+            status='PUB',
+            pub_date=datetime(2023, 2, 1).date()
+        )
+        self.draft_post = Post.objects.create(
+            title='draft_post',
+            body='draft_body',
+            status='DRAFT'
+        )
+
+    def add_comments(self, post, amount, active=True):
+        for _ in range(amount):
+            Comment.objects.create(
+                publication=post.publication,
+                body='test_comment',
+                active=active
+            )
+
+    def test_get_popular_posts_ordered_by_active_comments(self):
+        self.add_comments(self.first_post, 2)
+        self.add_comments(self.second_post, 1)
+        self.add_comments(self.second_post, 3, active=False)
+        popular_posts = Post.get_popular_posts(5)
+        self.assertEqual(popular_posts, [self.first_post, self.second_post])
+
+    def test_get_popular_posts_ties_ordered_by_pub_date(self):
+        popular_posts = Post.get_popular_posts(5)
+        self.assertEqual(popular_posts, [self.second_post, self.first_post])
+
+    def test_get_popular_posts_excludes_unpublished_posts(self):
+        self.add_comments(self.draft_post, 5)
+        self.assertNotIn(self.draft_post, Post.get_popular_posts(5))
+
+    def test_get_popular_posts_respects_amount(self):
+        self.assertEqual(len(Post.get_popular_posts(1)), 1)
+
+    def test_get_popular_posts_uses_constant_number_of_queries(self):
+        for number in range(10):
+            post = Post.objects.create(
+                title=f'post_{number}', body='body', status='PUB'
+            )
+            self.add_comments(post, number % 3)
+
+        with self.assertNumQueries(1):
+            Post.get_popular_posts(5)
+
+
+class RelatedPostTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='bars')
+        self.other_category = Category.objects.create(name='drinks')
+        self.post = Post.objects.create(
+            title='post', body='body', category=self.category
+        )
+        self.post.tags.add('sweets', 'protein', 'vegan')
+        self.one_tag_post = Post.objects.create(
+            title='one_tag_post', body='body', category=self.other_category
+        )
+        self.one_tag_post.tags.add('sweets')
+        self.one_tag_same_category_post = Post.objects.create(
+            title='one_tag_same_category_post', body='body', category=self.category
+        )
+        self.one_tag_same_category_post.tags.add('vegan')
+        self.two_tags_post = Post.objects.create(
+            title='two_tags_post', body='body', category=self.other_category
+        )
+        self.two_tags_post.tags.add('sweets', 'protein')
+        self.unrelated_post = Post.objects.create(title='unrelated_post', body='body')
+        self.unrelated_post.tags.add('drinks')
+
+    def test_related_posts_ranked_by_shared_tags_and_category(self):
+        expected_related_posts = [
+            self.two_tags_post,
+            self.one_tag_same_category_post,
+            self.one_tag_post
+        ]
+        self.assertEqual(self.post.get_related_posts(5), expected_related_posts)
+
+    def test_related_posts_respect_amount(self):
+        self.assertEqual(self.post.get_related_posts(1), [self.two_tags_post])
+
+    def test_related_posts_are_symmetric(self):
+        self.assertEqual(
+            self.one_tag_post.get_related_posts(5), [self.two_tags_post, self.post]
+        )
+
+    def test_related_posts_updated_when_tags_removed(self):
+        self.two_tags_post.tags.remove('sweets', 'protein')
+        self.assertNotIn(self.two_tags_post, self.post.get_related_posts(5))
+
+    def test_related_posts_updated_when_category_changed(self):
+        self.one_tag_post.category = self.category
+        self.one_tag_post.save()
+        score = RelatedPost.objects.get(
+            post=self.post, related_post=self.one_tag_post
+        ).score
+        self.assertEqual(score, RelatedPost.calculate_score(1, True))
+
+    def test_related_posts_not_updated_when_category_unchanged(self):
+        post = Post.objects.get(pk=self.one_tag_post.pk)
+        post.title = 'new title'
+        with patch.object(RelatedPost, 'update_for_post') as update_for_post:
+            post.save()
+            post.save(update_fields=['title'])
+        update_for_post.assert_not_called()
+
+    def test_related_posts_updated_when_tag_deleted(self):
+        Tag.objects.get(name='sweets').delete()
+        self.assertEqual(
+            self.post.get_related_posts(5),
+            [self.one_tag_same_category_post, self.two_tags_post]
+        )
+        score = RelatedPost.objects.get(
+            post=self.two_tags_post, related_post=self.post
+        ).score
+        self.assertEqual(score, RelatedPost.calculate_score(1, False))
+
+    def test_related_posts_removed_with_deleted_post(self):
+        self.two_tags_post.delete()
+        self.assertNotIn(self.two_tags_post, self.post.get_related_posts(5))
+
+    def test_get_related_posts_uses_one_query(self):
+        with self.assertNumQueries(1):
+            self.post.get_related_posts(3)
+
+    def test_rebuild_gives_the_same_scores_as_incremental_updates(self):
+        incremental_scores = set(
+            RelatedPost.objects.values_list('post', 'related_post', 'score')
+        )
+        RelatedPost.objects.all().delete()
+        self.assertEqual(RelatedPost.rebuild(batch_size=2), len(incremental_scores))
+        rebuilt_scores = set(
+            RelatedPost.objects.values_list('post', 'related_post', 'score')
+        )
+        self.assertEqual(rebuilt_scores, incremental_scores)
+
+
+class PostLikesCounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='user', email='user@mail.com')
+        self.second_user = User.objects.create(
+            username='second', email='second@mail.com'
+        )
+        self.post = Post.objects.create(title='post', body='body')
+
+    def get_stored_likes_count(self):
+        return Post.objects.get(pk=self.post.pk).likes_count
+
+    def test_toggle_like_adds_like_and_updates_counter(self):
+        liked = self.post.toggle_like(self.user)
+        self.assertTrue(liked)
+        self.assertEqual(self.post.likes_count, 1)
+        self.assertEqual(self.get_stored_likes_count(), 1)
+        self.assertIn(self.user, self.post.likes.all())
+
+    def test_toggle_like_twice_removes_like(self):
+        self.post.toggle_like(self.user)
+        liked = self.post.toggle_like(self.user)
+        self.assertFalse(liked)
+        self.assertEqual(self.post.likes_count, 0)
+        self.assertEqual(self.get_stored_likes_count(), 0)
+
+    def test_toggle_like_loads_likes_of_other_users(self):
+        Post.objects.get(pk=self.post.pk).toggle_like(self.second_user)
+        self.post.toggle_like(self.user)
+        self.assertEqual(self.post.likes_count, 2)
+
+    def test_counter_updated_by_likes_manager(self):
+        self.post.likes.add(self.user, self.second_user)
+        self.assertEqual(self.get_stored_likes_count(), 2)
+        self.post.likes.remove(self.user)
+        self.assertEqual(self.get_stored_likes_count(), 1)
+        self.post.likes.clear()
+        self.assertEqual(self.get_stored_likes_count(), 0)
+
+    def test_counter_updated_by_reverse_likes_manager(self):
+        self.user.post_likes.add(self.post)
+        self.assertEqual(self.get_stored_likes_count(), 1)
+        self.user.post_likes.clear()
+        self.assertEqual(self.get_stored_likes_count(), 0)
+
+    def test_counter_decreased_when_user_deleted(self):
+        self.post.toggle_like(self.user)
+        self.user.delete()
+        self.assertEqual(self.get_stored_likes_count(), 0)
+
+
+class PostExcerptTests(TestCase):
+    def setUp(self):
+        self.long_body = ' '.join(f'word{number}' for number in range(200))
+        self.post = Post.objects.create(title='Long Review', body=self.long_body)
+
+    def test_excerpt_stored_on_save(self):
+        self.post.refresh_from_db()
+        self.assertEqual(len(self.post.excerpt.split()), Post.EXCERPT_WORDS + 1)
+        self.assertTrue(self.post.excerpt.startswith('word0 word1'))
+        self.assertTrue(self.post.excerpt.endswith('word149 …'))
+
+    def test_short_body_is_not_truncated(self):
+        post = Post.objects.create(title='Short Review', body='Short body.')
+        self.assertEqual(post.excerpt, 'Short body.')
+
+    def test_excerpt_updated_with_body(self):
+        self.post.body = 'Changed body.'
+        self.post.save()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.excerpt, 'Changed body.')
+
+    def test_excerpt_updated_with_body_in_update_fields(self):
+        self.post.body = 'Changed body.'
+        self.post.save(update_fields=['body'])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.excerpt, 'Changed body.')
+
+    def test_feed_does_not_load_bodies(self):
+        post = Post.objects.feed().get(pk=self.post.pk)
+        self.assertIn('body', post.get_deferred_fields())
+        self.assertEqual(post.excerpt, Post.make_excerpt(self.long_body))
@@ -0,0 +1,137 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from blog.models import Post
+from blog.search import (SEARCH_TABLE, SearchResults, SimpleSearchBackend,
+                         get_search_backend)
+
+
+class SearchBackendTests(TestCase):
+    def setUp(self):
+        self.backend = get_search_backend()
+        self.title_post = Post.objects.create(
+            title='Peanut butter', body='Creamy and salty.', status='PUB'
+        )
+        self.body_post = Post.objects.create(
+            title='Protein bar', body='Tastes like peanut butter.', status='PUB'
+        )
+        self.draft_post = Post.objects.create(
+            title='Peanut draft', body='Not published yet.', status='DRAFT'
+        )
+
+    def test_search_ranks_title_matches_first(self):
+        results = self.backend.search('peanut butter', limit=10)
+        self.assertEqual(results, [self.title_post.pk, self.body_post.pk])
+
+    def test_search_skips_unpublished_posts(self):
+        self.assertNotIn(self.draft_post.pk, self.backend.search('peanut', limit=10))
+
+    def test_search_matches_prefixes(self):
+        self.assertEqual(self.backend.search('prot', limit=10), [self.body_post.pk])
+
+    def test_search_matches_tag_names(self):
+        self.body_post.tags.add('snacks')
+        self.assertEqual(self.backend.search('snacks', limit=10), [self.body_post.pk])
+
+    def test_index_updated_on_post_save(self):
+        self.body_post.title = 'Chocolate bar'
+        self.body_post.save()
+        self.assertEqual(
+            self.backend.search('chocolate', limit=10), [self.body_post.pk]
+        )
+        self.assertEqual(self.backend.search('protein', limit=10), [])
+
+    def test_post_removed_from_index_when_unpublished(self):
+        self.title_post.status = 'DRAFT'
+        self.title_post.save()
+        self.assertNotIn(self.title_post.pk, self.backend.search('peanut', limit=10))
+
+    def test_post_removed_from_index_when_deleted(self):
+        self.title_post.delete()
+        self.assertNotIn(self.title_post.pk, self.backend.search('peanut', limit=10))
+
+    def test_search_syntax_characters_are_ignored(self):
+        results = self.backend.search('"peanut* (butter:', limit=10)
+        self.assertEqual(results[0], self.title_post.pk)
+        self.assertEqual(self.backend.search('"*()', limit=10), [])
+
+    def test_count(self):
+        self.assertEqual(self.backend.count('peanut'), 2)
+
+    def test_search_results_page_uses_fixed_number_of_queries(self):
+        with self.assertNumQueries(3):  # search, posts, prefetched tags
+            posts = SearchResults('peanut')[0:10]
+        self.assertEqual(posts, [self.title_post, self.body_post])
+
+    def test_search_results_skip_posts_unpublished_without_reindexing(self):
+        Post.objects.filter(pk=self.body_post.pk).update(status='DRAFT')
+        self.assertEqual(SearchResults('peanut')[0:10], [self.title_post])
+
+    def test_rebuild_command_restores_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Indexed 2 posts.', out.getvalue())
+        self.assertEqual(self.backend.count('peanut'), 2)
+
+
+class SimpleSearchBackendTests(TestCase):
+    def setUp(self):
+        self.backend = SimpleSearchBackend()
+        self.bar = Post.objects.create(
+            title='Peanut bar', body='Crunchy.', status='PUB'
+        )
+        self.butter = Post.objects.create(
+            title='Peanut butter', body='Creamy.', status='PUB'
+        )
+        self.butter.tags.add('spreads')
+        Post.objects.create(title='Peanut draft', body='Draft.', status='DRAFT')
+
+    def test_search_matches_all_terms_in_published_posts(self):
+        self.assertEqual(
+            self.backend.search('peanut', limit=10), [self.bar.pk, self.butter.pk]
+        )
+        self.assertEqual(
+            self.backend.search('PEANUT spreads', limit=10), [self.butter.pk]
+        )
+        self.assertEqual(self.backend.search('', limit=10), [])
+
+    def test_count(self):
+        self.assertEqual(self.backend.count('peanut'), 2)
+
+    def test_used_for_databases_without_full_text_backend(self):
+        get_search_backend.cache_clear()
+        self.addCleanup(get_search_backend.cache_clear)
+        with patch.object(connection, 'vendor', 'oracle'):
+            self.assertIsInstance(get_search_backend(), SimpleSearchBackend)
+
+
+class PostSearchViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for number in range(12):
+            Post.objects.create(title=f'Oat bar {number}', body='Oats.', status='PUB')
+
+    def test_search_view_displays_results(self):
+        response = self.client.get(reverse('blog:search'), {'q': 'oat'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'blog/search_results.html')
+        self.assertEqual(len(response.context['posts']), 10)
+        self.assertEqual(response.context['query'], 'oat')
+
+    def test_search_view_is_paginated(self):
+        response = self.client.get(reverse('blog:search'), {'q': 'oat', 'page': 2})
+        self.assertEqual(len(response.context['posts']), 2)
+        self.assertEqual(response.context['paginator'].count, 12)
+
+    def test_search_view_without_query(self):
+        response = self.client.get(reverse('blog:search'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'No reviews found.')
@@ -0,0 +1,113 @@
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from blog.models import Category, Post
+from blog.sidebar import SIDEBAR_CACHE_NAMESPACE, get_sidebar_data
+from comments.models import Comment
+from utils.cache_utils import get_or_build, get_versioned_key
+
+
+class SidebarDataTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(title='Test Post', body='Body.', status='PUB')
+        self.comment = Comment.objects.create(
+            publication=self.post.publication,
+            body='Active comment.',
+            active=True
+        )
+
+    def test_sidebar_data_contains_popular_posts_and_recent_comments(self):
+        sidebar = get_sidebar_data()
+        self.assertEqual(sidebar['popular_posts'], [self.post])
+        self.assertEqual(list(sidebar['recent_comments']), [self.comment])
+
+    def test_sidebar_data_is_cached(self):
+        get_sidebar_data()
+        with self.assertNumQueries(0):
+            sidebar = get_sidebar_data()
+            self.assertEqual(sidebar['popular_posts'][0].title, 'Test Post')
+            self.assertEqual(sidebar['recent_comments'][0].publication.post, self.post)
+
+    def test_sidebar_data_invalidated_on_comment_save(self):
+        get_sidebar_data()
+        with self.captureOnCommitCallbacks(execute=True):
+            new_comment = Comment.objects.create(
+                publication=self.post.publication,
+                body='New comment.',
+                active=True
+            )
+        self.assertIn(new_comment, get_sidebar_data()['recent_comments'])
+
+    def test_sidebar_data_invalidated_on_comment_delete(self):
+        get_sidebar_data()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.comment.delete()
+        self.assertEqual(len(get_sidebar_data()['recent_comments']), 0)
+
+    def test_sidebar_data_invalidated_on_post_save(self):
+        get_sidebar_data()
+        with self.captureOnCommitCallbacks(execute=True):
+            new_post = Post.objects.create(title='New Post', body='Body.', status='PUB')
+        self.assertIn(new_post, get_sidebar_data()['popular_posts'])
+
+    def test_sidebar_data_invalidated_on_post_delete(self):
+        get_sidebar_data()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.delete()
+        self.assertEqual(get_sidebar_data()['popular_posts'], [])
+
+    def test_list_views_share_sidebar_data(self):
+        category = Category.objects.create(name='bars')
+        self.post.category = category
+        self.post.save()
+        self.post.tags.add('sweets')
+        urls = [
+            reverse('blog:home'),
+            reverse('blog:category', kwargs={'category_slug': category.slug}),
+            reverse('blog:tag', kwargs={'tag_slug': 'sweets'}),
+        ]
+        for url in urls:
+            response = self.client.get(url)
+            self.assertEqual(response.context['popular_posts'], [self.post])
+            self.assertEqual(list(response.context['recent_comments']), [self.comment])
+
+
+class GetOrBuildTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.key = get_versioned_key(SIDEBAR_CACHE_NAMESPACE, 'test')
+
+    def test_value_is_built_once(self):
+        builder = Mock(return_value='value')
+        get_or_build(self.key, builder, 60)
+        get_or_build(self.key, builder, 60)
+        builder.assert_called_once()
+
+    def test_waits_for_value_built_by_another_request(self):
+        builder = Mock(return_value='built value')
+        cache.add(f'{self.key}:lock', True)
+
+        def another_request_finished(_):
+            cache.set(self.key, 'value from another request')
+
+        with patch(
+            'utils.cache_utils.time.sleep', side_effect=another_request_finished
+        ):
+            value = get_or_build(self.key, builder, 60)
+
+        self.assertEqual(value, 'value from another request')
+        builder.assert_not_called()
+
+    def test_builds_value_when_waiting_takes_too_long(self):
+        builder = Mock(return_value='built value')
+        cache.add(f'{self.key}:lock', True)
+
+        with patch('utils.cache_utils.time.sleep'):
+            value = get_or_build(self.key, builder, 60)
+
+        self.assertEqual(value, 'built value')
+        builder.assert_called_once()
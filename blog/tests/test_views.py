@@ -1,10 +1,15 @@
+import base64
+import json
 from datetime import timedelta
 
 from django.contrib import messages
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.db.models import QuerySet
 from django.http import HttpResponse
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
 from taggit.models import Tag
@@ -12,6 +17,7 @@ from taggit.models import Tag
 from blog.models import Category, Post
 from comments.forms import CommentForm
 from comments.models import Comment
+from utils.pagination import CursorPaginator
 
 User = get_user_model()
 
@@ -951,3 +957,252 @@ class ConfirmEmailViewTests(TestCase):
         self.assertIsInstance(response, HttpResponse)
         self.assertEqual(response.content.decode().lower(), 'confirmation code has expired')
         self.assertIsInstance(response, HttpResponse)
+
+
+class PostListFeedQueriesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username='author', email='author@mail.com')
+        self.category = Category.objects.create(name='bars')
+
+    def create_posts(self, amount):
+        first_number = Post.objects.count()
+        for number in range(first_number, first_number + amount):
+            post = Post.objects.create(
+                title=f'Post {number}',
+                body='Body of the post.',
+                author=self.author,
+                category=self.category,
+                status='PUB'
+            )
+            post.tags.add('sweets', f'tag-{number}')
+            Comment.objects.create(
+                publication=post.publication, body='Comment.', active=True
+            )
+
+    def count_queries(self, url):
+        self.client.get(url)  # Warm up the sidebar and navigation caches
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_home_queries_do_not_depend_on_number_of_posts(self):
+        self.create_posts(1)
+        queries_for_one_post = self.count_queries(reverse('blog:home'))
+        self.create_posts(3)
+        self.assertEqual(self.count_queries(reverse('blog:home')), queries_for_one_post)
+
+    def test_category_queries_do_not_depend_on_number_of_posts(self):
+        url = reverse('blog:category', kwargs={'category_slug': self.category.slug})
+        self.create_posts(1)
+        queries_for_one_post = self.count_queries(url)
+        self.create_posts(3)
+        self.assertEqual(self.count_queries(url), queries_for_one_post)
+
+    def test_tag_queries_do_not_depend_on_number_of_posts(self):
+        url = reverse('blog:tag', kwargs={'tag_slug': 'sweets'})
+        self.create_posts(1)
+        queries_for_one_post = self.count_queries(url)
+        self.create_posts(3)
+        self.assertEqual(self.count_queries(url), queries_for_one_post)
+
+    def test_home_displays_active_comments_counter(self):
+        self.create_posts(1)
+        response = self.client.get(reverse('blog:home'))
+        self.assertContains(response, '/ 1 comment')
+
+
+class PostListCursorPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.posts = [
+            Post.objects.create(
+                title=f'Post {number}',
+                body='Body of the post.',
+                pub_date=timezone.now().date() - timedelta(days=number // 2),
+                status='PUB'
+            )
+            for number in range(8)
+        ]
+        self.expected_order = sorted(
+            self.posts, key=lambda post: (-post.pub_date.toordinal(), post.pk)
+        )
+
+    def test_walk_forward_and_backward_through_all_pages(self):
+        response = self.client.get(reverse('blog:home'))
+        pages = [list(response.context['posts'])]
+        while response.context['page_obj'].has_next():
+            cursor = response.context['page_obj'].next_cursor
+            response = self.client.get(reverse('blog:home'), {'cursor': cursor})
+            pages.append(list(response.context['posts']))
+
+        self.assertEqual([post for page in pages for post in page], self.expected_order)
+        self.assertEqual(len(pages), 3)
+
+        while response.context['page_obj'].has_previous():
+            cursor = response.context['page_obj'].previous_cursor
+            response = self.client.get(reverse('blog:home'), {'cursor': cursor})
+            pages.pop()
+            self.assertEqual(list(response.context['posts']), pages[-1])
+        self.assertEqual(len(pages), 1)
+
+    def test_pagination_does_not_count_posts(self):
+        # Warm up the sidebar and navigation caches
+        self.client.get(reverse('blog:home'))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('blog:home'))
+        self.assertFalse(any('COUNT' in query['sql'] for query in queries))
+
+    def test_deep_page_costs_the_same_as_the_first_page(self):
+        self.client.get(reverse('blog:home'))
+        with CaptureQueriesContext(connection) as first_page_queries:
+            response = self.client.get(reverse('blog:home'))
+        cursor = response.context['page_obj'].next_cursor
+        with CaptureQueriesContext(connection) as next_page_queries:
+            self.client.get(reverse('blog:home'), {'cursor': cursor})
+        self.assertEqual(len(first_page_queries), len(next_page_queries))
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse('blog:home'), {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_with_invalid_values_returns_404(self):
+        for values in [['notadate', 1], [str(self.posts[0].pub_date), 'abc']]:
+            data = json.dumps({'d': 'next', 'v': values}).encode()
+            cursor = base64.urlsafe_b64encode(data).decode()
+            response = self.client.get(reverse('blog:home'), {'cursor': cursor})
+            self.assertEqual(response.status_code, 404)
+
+    def test_stale_cursor_shows_first_page(self):
+        paginator = CursorPaginator(Post.objects.all(), 3, ['-pub_date', 'pk'])
+        cursor = paginator.encode_cursor(self.expected_order[-1], 'next')
+        response = self.client.get(reverse('blog:home'), {'cursor': cursor})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['posts']), self.expected_order[:3])
+        self.assertFalse(response.context['page_obj'].has_previous())
+
+    def test_category_page_uses_cursor_pagination(self):
+        category = Category.objects.create(name='bars')
+        Post.objects.filter(status='PUB').update(category=category)
+        url = reverse('blog:category', kwargs={'category_slug': category.slug})
+        response = self.client.get(url)
+        cursor = response.context['page_obj'].next_cursor
+        response = self.client.get(url, {'cursor': cursor})
+        self.assertEqual(list(response.context['posts']), self.expected_order[3:6])
+
+
+class PostLikeViewQueriesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser', password='testpassword'
+        )
+        self.review = Post.objects.create(
+            title='Test Review', body='Body of test review.'
+        )
+        self.url = reverse('blog:like_post', kwargs={'pk': self.review.pk})
+        self.client.force_login(self.user)
+
+    def test_like_response_contains_state_and_stored_counter(self):
+        response = self.client.post(self.url)
+        self.assertEqual(response.json()['liked'], True)
+        self.assertEqual(response.json()['likes_stats_display'], '1 Like')
+        self.review.refresh_from_db()
+        self.assertEqual(self.review.likes_count, 1)
+
+    def test_unlike_response_contains_state_and_stored_counter(self):
+        self.client.post(self.url)
+        response = self.client.post(self.url)
+        self.assertEqual(response.json()['liked'], False)
+        self.assertEqual(response.json()['likes_stats_display'], '0 Likes')
+
+
+class PostDetailConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpassword'
+        )
+        self.review = Post.objects.create(
+            title='Test Review', body='Body of test review.', status='PUB'
+        )
+        self.url = self.review.get_absolute_url()
+
+    def get_etag(self) -> str:
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response.headers)
+        self.assertIn('private', response.headers['Cache-Control'])
+        return response.headers['ETag']
+
+    def test_unchanged_post_returns_not_modified_with_one_query(self):
+        etag = self.get_etag()
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+
+    def test_if_modified_since_returns_not_modified(self):
+        response = self.client.get(self.url)
+        response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=response.headers['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_post_change_invalidates_etag(self):
+        etag = self.get_etag()
+        self.review.body = 'Changed body.'
+        self.review.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Changed body.')
+
+    def test_tags_change_invalidates_etag(self):
+        etag = self.get_etag()
+        self.review.tags.add('snacks')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_active_comment_invalidates_etag(self):
+        etag = self.get_etag()
+        Comment.objects.create(
+            publication=self.review.publication, body='Nice.', active=True
+        )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_inactive_comment_keeps_etag(self):
+        etag = self.get_etag()
+        Comment.objects.create(publication=self.review.publication, body='Spam.')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_like_invalidates_etag(self):
+        self.client.force_login(self.user)
+        etag = self.get_etag()
+        self.review.toggle_like(self.user)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_user(self):
+        etag = self.get_etag()
+        self.client.force_login(self.user)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_pending_messages_are_rendered(self):
+        etag = self.get_etag()
+        self.client.post(self.url, {'body': 'Comment waiting for moderation.'})
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'moderation')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_unpublished_post_returns_not_found(self):
+        self.review.status = 'DRAFT'
+        self.review.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response.headers)
@@ -1,14 +1,16 @@
 from django.urls import path
 
 from .views import (CategoryListView, ConfirmEmailView, PostCreateView, PostDeleteView,
-                    PostDetailView, PostLikeView, PostListView, PostUpdateView,
-                    ProductSubmissionFormView, TaggedPostsListView, TagsListView)
+                    PostDetailView, PostLikeView, PostListView, PostSearchView,
+                    PostUpdateView, ProductSubmissionFormView, TaggedPostsListView,
+                    TagsListView)
 
 app_name = 'blog'
 
 urlpatterns = [
     path('', PostListView.as_view(), name='home'),
     path('tags/', TagsListView.as_view(), name='tags'),
+    path('search/', PostSearchView.as_view(), name='search'),
     path('create-review/', PostCreateView.as_view(), name='create_review'),
     path('update-review/<int:pk>/', PostUpdateView.as_view(), name='update_review'),
     path('delete-review/<int:pk>/', PostDeleteView.as_view(), name='delete_review'),
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any
 
 from django.contrib import messages
 from django.contrib.auth import get_user_model
@@ -23,47 +23,69 @@ from taggit.models import Tag
 from accounts.models import \
     User as AccountsUser  # Importing User directly for type hints
 from comments.forms import CommentForm
-from comments.models import Publication
 from comments.views import CommentSubmissionMixin
 from fitfoodfeed.settings import EMAIL_HOST_USER
+from utils.conditional_utils import ConditionalDetailMixin
+from utils.pagination import CursorPaginationMixin
 
 from .forms import PostForm, ProductSubmissionForm
 from .models import Category, Post
+from .search import SearchResults
+from .sidebar import get_sidebar_data
 from .utils import (generate_confirmation_data, generate_mail_data,
                     prepare_mail_message, send_email_with_product_for_review)
 
 User = get_user_model()
 
 
-class PostListView(ListView):
-    model = Post
-    template_name = 'blog/home.html'
-    context_object_name = 'posts'
-    paginate_by = 3
-    queryset = Post.objects.filter(status='PUB').order_by('-pub_date')
+class SidebarContextMixin:
+    """
+    Mixin adding the cached sidebar data (popular posts and recent comments)
+    to the context of the post list views.
+    """
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
-        context = super().get_context_data(**kwargs)
-        context['popular_posts'] = Post.get_popular_posts(5)
-        context['recent_comments'] = Publication.get_recent_comments(3, 'post')
+        context = super().get_context_data(**kwargs)  # type: ignore
+        context.update(get_sidebar_data())
         return context
 
 
-class TaggedPostsListView(ListView):
+class PostListView(SidebarContextMixin, CursorPaginationMixin, ListView):
     model = Post
     template_name = 'blog/home.html'
     context_object_name = 'posts'
     paginate_by = 3
+    cursor_ordering = ['-pub_date', 'pk']
+    queryset = Post.objects.filter(status='PUB').feed()
 
-    def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
-        context = super().get_context_data(**kwargs)
-        context['popular_posts'] = Post.get_popular_posts(5)
-        context['recent_comments'] = Publication.get_recent_comments(3, 'post')
-        return context
+
+class TaggedPostsListView(SidebarContextMixin, CursorPaginationMixin, ListView):
+    model = Post
+    template_name = 'blog/home.html'
+    context_object_name = 'posts'
+    paginate_by = 3
+    cursor_ordering = ['-pub_date', 'pk']
 
     def get_queryset(self) -> QuerySet[Post]:
         tag_slug = self.kwargs['tag_slug']
-        return Post.get_tagged_posts(tag_slug)
+        return Post.get_tagged_posts(tag_slug).feed()
+
+
+class PostSearchView(SidebarContextMixin, ListView):
+    template_name = 'blog/search_results.html'
+    context_object_name = 'posts'
+    paginate_by = 10
+
+    def get_search_query(self) -> str:
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self) -> SearchResults:  # type: ignore
+        return SearchResults(self.get_search_query())
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.get_search_query()
+        return context
 
 
 class TagsListView(ListView):
@@ -72,12 +94,18 @@ class TagsListView(ListView):
     context_object_name = 'tags'
 
 
-class PostDetailView(CommentSubmissionMixin, FormMixin, DetailView):
+class PostDetailView(
+    ConditionalDetailMixin, CommentSubmissionMixin, FormMixin, DetailView
+):
     form_class = CommentForm
     model = Post
     slug_url_kwarg = 'post_slug'
     queryset = Post.objects.filter(status="PUB")
     template_name = 'blog/review_detail.html'
+    version_fields = [
+        'pk', 'updated_at', 'likes_count',
+        'publication__active_comments_count', 'publication__last_comment_at',
+    ]
 
     def get_success_url(self) -> str:
         return self.object.get_absolute_url()
@@ -109,7 +137,9 @@ class PostLikeView(View):
         self, request: HttpRequest, *args: Any, **kwargs: Any
     ) -> JsonResponse:
         pk: int | None = kwargs.get('pk')
-        post: Post = get_object_or_404(Post, pk=pk)
+        post: Post = get_object_or_404(
+            Post.objects.only('pk', 'slug', 'likes_count'), pk=pk
+        )
         user: AccountsUser
         liked: bool
 
@@ -211,22 +241,17 @@ class PostDeleteView(  # type: ignore
         return f"Post <strong>{self.object.title}</strong> deleted successfully."
 
 
-class CategoryListView(ListView):
+class CategoryListView(SidebarContextMixin, CursorPaginationMixin, ListView):
     model = Post
     template_name = 'blog/home.html'
     context_object_name = 'posts'
     paginate_by = 3
-
-    def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
-        context = super().get_context_data(**kwargs)
-        context['popular_posts'] = Post.get_popular_posts(5)
-        context['recent_comments'] = Publication.get_recent_comments(3, 'post')
-        return context
+    cursor_ordering = ['-pub_date', 'pk']
 
     def get_queryset(self) -> QuerySet[Post]:
         category_slug = self.kwargs['category_slug']
         category = get_object_or_404(Category, slug=category_slug)
-        return category.get_posts()
+        return category.get_posts().feed()
 
 
 class ProductSubmissionFormView(FormView, SuccessMessageMixin):
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class CartConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "carts"
+
+    def ready(self):
+        import carts.signals  # noqa: F401
+        from carts.checks import check_database_returning
+
+        checks.register(check_database_returning)
@@ -1,25 +1,52 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from contextlib import nullcontext
+from decimal import Decimal
+from functools import partial
+from typing import Any, Callable, ContextManager
 
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
 from django.http import HttpRequest
+from django.utils import timezone
 
 from shop.models import Product
 
-from .models import ShoppingUser
+from .models import CartItem, ShoppingUser
+from .reservations import SESSION_CART_KEY, get_cart_key, transfer_holds
+
+User = get_user_model()
+
+# Product fields needed to add the product to a cart
+CART_PRODUCT_FIELDS = ['name', 'price', 'sale_price', 'is_on_sale']
 
 
 class BaseCart(ABC):
-    """A fundamental basic Cart class for manipulating client cart."""
+    """
+    A fundamental basic Cart class for manipulating client cart.
+
+    The cart works as a unit of work: it is loaded once, the changes are only
+    tracked in memory and written with a single save() by flush(). It is called
+    by CartMiddleware at the end of the request, or when the cart is used as
+    a context manager.
+    """
 
     def __init__(self, request: HttpRequest) -> None:
         """Initializes the cart with the given request."""
         self.session = request.session
+        self.modified = False
         self.cart: dict[str, dict[str, Any]] = self._get_cart()
 
+    def __enter__(self) -> 'BaseCart':
+        return self
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        if exc_type is None:
+            self.flush()
+
     def __iter__(self):
-        """Iterates over the items in the cart."""
+        """Iterates over the items in the cart, with their prices as Decimals."""
         for item in self.cart.values():
-            yield item
+            yield {**item, 'price': Decimal(str(item['price']))}
 
     def __len__(self) -> int:
         """Returns the total amount of all cart items."""
@@ -47,27 +74,40 @@ class BaseCart(ABC):
         """Saves the current state of the cart."""
         raise NotImplementedError("Subclasses must implement this method.")
 
+    def flush(self) -> None:
+        """Saves the cart if it was changed since it was loaded or flushed."""
+        if self.modified:
+            self.save()
+            self.modified = False
+
     def add(self, item_id: str, model_name: str, quantity: int = 1) -> None:
         """Adds an item to the cart."""
         if model_name == 'Product':
-            self._add_product(item_id, quantity)
+            self._add_product(str(item_id), quantity)
         else:
             raise ValueError(f"Unsupported model: {model_name}")
 
-    def _add_product(self, product_id: str, quantity: int) -> None:
-        """Adds a product to the cart."""
-        product = Product.objects.get(pk=product_id)
+    def _add_product(
+        self, product_id: str, quantity: int, product: Product | None = None
+    ) -> None:
+        """
+        Adds a product to the cart, the product is loaded only if it is not
+        in the cart yet and it was not given.
+        """
         cart_product = self.cart.get(product_id)
 
         if cart_product:
             cart_product['quantity'] += quantity
         else:
+            if product is None:
+                product = Product.objects.only(*CART_PRODUCT_FIELDS).get(pk=product_id)
+            # The price is stored as a string, as sessions are serialized to JSON
             self.cart[product_id] = {
                 "name": product.name,
                 "quantity": quantity,
-                "price": float(product.price)
+                "price": str(product.current_price)
             }
-        self.save()
+        self.modified = True
 
     def update(self, item_id: str, model_name: str, new_quantity: int) -> None:
         """
@@ -78,7 +118,7 @@ class BaseCart(ABC):
             raise ValueError("Quantity must be grater than zero.")
 
         if model_name == 'Product':
-            self._update_product(item_id, new_quantity)
+            self._update_product(str(item_id), new_quantity)
         else:
             raise ValueError(f"Unsupported model: {model_name}")
 
@@ -89,14 +129,14 @@ class BaseCart(ABC):
                 self.delete(product_id, 'Product')
             else:
                 self.cart[product_id]['quantity'] = new_quantity
-                self.save()
+                self.modified = True
         else:
             raise KeyError("Product not found in the cart.")
 
     def delete(self, item_id: str, model_name: str) -> None:
         """Deletes an item from the cart if it is contained."""
         if model_name == 'Product':
-            self._delete_product(item_id)
+            self._delete_product(str(item_id))
         else:
             raise ValueError(f"Unsupported model: {model_name}")
 
@@ -104,13 +144,29 @@ class BaseCart(ABC):
         """Deletes a product from the cart."""        
         if product_id in self.cart:
             del self.cart[product_id]
-            self.save()
+            self.modified = True
         else:
             raise KeyError("Product not found in the cart.")
 
-    def get_total_price(self) -> float:
-        """Calculates the total price of all items in the cart."""
-        return sum(float(item['price']) * item['quantity'] for item in self.cart.values())
+    def merge(self, items: dict[str, dict[str, Any]]) -> None:
+        """
+        Adds the items of another cart (e.g. the session cart of a user who just
+        logged in), checking all their products with one query.
+        Items of deleted products are dropped.
+        """
+        product_ids = [int(product_id) for product_id in items if product_id.isdigit()]
+        products = Product.objects.only(*CART_PRODUCT_FIELDS).in_bulk(product_ids)
+        for product_id, item in items.items():
+            product = products.get(int(product_id)) if product_id.isdigit() else None
+            if product is not None and item.get('quantity', 0) > 0:
+                self._add_product(product_id, item['quantity'], product)
+
+    def get_total_price(self) -> Decimal:
+        """
+        Calculates the total price of all items in the cart at their prices
+        from adding time, see carts.pricing.price_cart for the current prices.
+        """
+        return sum((item['price'] * item['quantity'] for item in self), Decimal('0.00'))
 
 
 class AnonymousCart(BaseCart):
@@ -124,7 +180,9 @@ class AnonymousCart(BaseCart):
 
     def reset(self) -> None:
         """Resets the cart in the current session."""
-        del self.session['cart']
+        self.session.pop('cart', None)
+        self.cart = {}
+        self.modified = False
 
     def save(self) -> None:
         """Saves the cart to the session."""
@@ -133,24 +191,181 @@ class AnonymousCart(BaseCart):
 
 
 class AuthenticatedCart(BaseCart):
-    """Cart class for authenticated users."""
+    """
+    Cart class for authenticated users, stored as CartItem rows.
+
+    The cart records which products were added, updated or deleted,
+    so save() writes only the changed rows. Additions are applied as increments
+    of the stored quantities, so the carts changed in many tabs at once
+    don't lose each other's products.
+    """
 
     def __init__(self, request: HttpRequest) -> None:
+        if not isinstance(request.user, User):
+            raise TypeError("Anonymous users' carts are stored in the session.")
         self.user = request.user
+        self.shopping_user_id: int | None = None
+        self._increments: dict[str, int] = {}
+        self._quantities: dict[str, int] = {}
+        self._deleted: set[str] = set()
+        self._cleared = False
         super().__init__(request)
 
     def _get_cart(self) -> dict[str, Any]:
-        """Retrieves the cart from the database."""
-        shopping_user, _ = ShoppingUser.objects.get_or_create(user=self.user)
-        return shopping_user.cart
+        """
+        Retrieves the cart from the database with one query,
+        joining the shopping user with its items and their products.
+        """
+        cart = {}
+        rows = ShoppingUser.objects.filter(user=self.user).values_list(
+            'pk', 'items__product_id', 'items__product__name',
+            'items__quantity', 'items__unit_price'
+        ).order_by('items__created_at', 'items__pk')
+        for shopping_user_id, product_id, name, quantity, unit_price in rows:
+            self.shopping_user_id = shopping_user_id
+            if product_id is not None:
+                cart[str(product_id)] = {
+                    "name": name,
+                    "quantity": quantity,
+                    "price": unit_price
+                }
+        return cart
+
+    def _add_product(
+        self, product_id: str, quantity: int, product: Product | None = None
+    ) -> None:
+        super()._add_product(product_id, quantity, product)
+        if (
+            self._cleared
+            or product_id in self._quantities
+            or product_id in self._deleted
+        ):
+            self._quantities[product_id] = self.cart[product_id]['quantity']
+            self._deleted.discard(product_id)
+        else:
+            increment = self._increments.get(product_id, 0) + quantity
+            self._increments[product_id] = increment
+
+    def _update_product(self, product_id: str, new_quantity: int) -> None:
+        super()._update_product(product_id, new_quantity)
+        if new_quantity:
+            self._quantities[product_id] = new_quantity
+            self._increments.pop(product_id, None)
+
+    def _delete_product(self, product_id: str) -> None:
+        super()._delete_product(product_id)
+        self._deleted.add(product_id)
+        self._increments.pop(product_id, None)
+        self._quantities.pop(product_id, None)
 
     def reset(self) -> None:
         """Clear the cart."""
         self.cart.clear()
-        self.save()
+        self._increments.clear()
+        self._quantities.clear()
+        self._deleted.clear()
+        self._cleared = True
+        self.modified = True
 
     def save(self) -> None:
-        """Saves the cart to the database."""
-        shopping_user, _ = ShoppingUser.objects.get_or_create(user=self.user)
-        shopping_user.cart = self.cart
-        shopping_user.save()
+        """
+        Saves the changes of the cart with one query per kind of change:
+        deleting the products, setting their quantities and incrementing them.
+        """
+        shopping_user_id = self.shopping_user_id
+        if shopping_user_id is None:
+            shopping_user, _ = ShoppingUser.objects.get_or_create(user=self.user)
+            shopping_user_id = self.shopping_user_id = shopping_user.pk
+        items = CartItem.objects.filter(shopping_user_id=shopping_user_id)
+
+        writes: list[Callable[[], Any]] = []
+        if self._cleared:
+            writes.append(items.delete)
+        elif self._deleted:
+            writes.append(partial(items.filter(product_id__in=self._deleted).delete))
+        if self._quantities:
+            writes.append(partial(
+                CartItem.objects.bulk_create,
+                [self._make_item(shopping_user_id, product_id, quantity)
+                 for product_id, quantity in self._quantities.items()],
+                update_conflicts=True,
+                unique_fields=['shopping_user', 'product'],
+                update_fields=['quantity', 'updated_at'],
+            ))
+        if self._increments:
+            writes.append(partial(
+                self._increment_items,
+                [self._make_item(shopping_user_id, product_id, quantity)
+                 for product_id, quantity in self._increments.items()]
+            ))
+
+        # A single write doesn't need a transaction
+        context: ContextManager[Any] = nullcontext()
+        if len(writes) > 1:
+            context = transaction.atomic()
+        with context:
+            for write in writes:
+                write()
+        self._increments.clear()
+        self._quantities.clear()
+        self._deleted.clear()
+        self._cleared = False
+
+    def _make_item(
+        self, shopping_user_id: int, product_id: str, quantity: int
+    ) -> CartItem:
+        return CartItem(
+            shopping_user_id=shopping_user_id,
+            product_id=int(product_id),
+            quantity=quantity,
+            unit_price=Decimal(str(self.cart[product_id]['price'])),
+        )
+
+    @staticmethod
+    def _increment_items(items: list[CartItem]) -> None:
+        """
+        Inserts the items or increments the quantities of the stored ones
+        with one INSERT ... ON CONFLICT DO UPDATE, supported by SQLite and PostgreSQL.
+        """
+        ops = connection.ops
+        table = ops.quote_name(CartItem._meta.db_table)
+        now = ops.adapt_datetimefield_value(timezone.now())
+        params: list[Any] = []
+        for item in items:
+            params += [
+                item.shopping_user_id, item.product_id, item.quantity,
+                ops.adapt_decimalfield_value(item.unit_price, 6, 2), now, now,
+            ]
+        values = ', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(items))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} '
+                '(shopping_user_id, product_id, quantity, unit_price, '
+                'created_at, updated_at) '
+                f'VALUES {values} '
+                'ON CONFLICT (shopping_user_id, product_id) DO UPDATE SET '
+                f'quantity = {table}.quantity + excluded.quantity, '
+                'updated_at = excluded.updated_at',
+                params
+            )
+
+
+def merge_session_cart(request: HttpRequest) -> None:
+    """
+    Moves the session cart of a user who just logged in to their cart in the database
+    in one transaction, with a constant number of queries, and clears the session cart.
+    The stock held for the session cart is held for the user cart from then on.
+    """
+    session_cart_key = request.session.pop(SESSION_CART_KEY, None)
+    items = request.session.get('cart')
+    if not items:
+        return
+    with transaction.atomic():
+        cart = AuthenticatedCart(request)
+        cart.merge(items)
+        cart.flush()
+        if session_cart_key is not None:
+            transfer_holds(session_cart_key, get_cart_key(request))
+    del request.session['cart']
+    # The anonymous cart loaded earlier in the request mustn't be saved again
+    request.cart = cart  # type: ignore
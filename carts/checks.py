@@ -0,0 +1,25 @@
+import sqlite3
+from typing import Any
+
+from django.core.checks import CheckMessage, Error
+from django.db import connection
+
+
+def check_database_returning(**kwargs: Any) -> list[CheckMessage]:
+    """
+    The stock holds are released with DELETE ... RETURNING,
+    which SQLite supports since the version 3.35.
+    """
+    if connection.vendor != 'sqlite':
+        return []
+    version = sqlite3.sqlite_version_info
+    if version >= (3, 35):
+        return []
+    return [
+        Error(
+            f"SQLite {'.'.join(map(str, version))} doesn't support "
+            "DELETE ... RETURNING, used to release the stock holds.",
+            hint="Upgrade SQLite to 3.35 or later.",
+            id='carts.E001',
+        )
+    ]
@@ -0,0 +1,23 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from carts.reservations import RELEASE_BATCH_SIZE, release_expired_holds
+
+
+class Command(BaseCommand):
+    help = "Returns the units of the expired stock holds of the carts to stock."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--batch-size', type=int, default=RELEASE_BATCH_SIZE,
+            help=f"Number of holds released at once (default: {RELEASE_BATCH_SIZE})."
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options['batch_size'] < 1:
+            raise CommandError("The batch size must be positive.")
+        released = release_expired_holds(batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f"Released {released} expired stock holds.")
+        )
@@ -0,0 +1,21 @@
+from typing import Callable
+
+from django.http import HttpRequest, HttpResponse
+
+
+class CartMiddleware:
+    """
+    Flushes the changes of the cart loaded during the request (see get_cart)
+    with one write after the view, unless the view failed.
+    It must be placed after SessionMiddleware, which saves the anonymous carts.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        response = self.get_response(request)
+        cart = getattr(request, 'cart', None)
+        if cart is not None and response.status_code < 500:
+            cart.flush()
+        return response
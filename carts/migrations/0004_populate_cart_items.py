@@ -0,0 +1,74 @@
+# Generated by Django 4.2.3 on 2026-10-18 16:17
+
+from decimal import Decimal
+
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+
+def populate_cart_items(apps, schema_editor):
+    ShoppingUser = apps.get_model("carts", "ShoppingUser")
+    CartItem = apps.get_model("carts", "CartItem")
+    Product = apps.get_model("shop", "Product")
+
+    shopping_users = ShoppingUser.objects.exclude(cart={}).order_by("pk")
+    last_pk = 0
+    while batch := list(shopping_users.filter(pk__gt=last_pk)[:BATCH_SIZE]):
+        last_pk = batch[-1].pk
+        product_ids = {
+            int(product_id)
+            for shopping_user in batch
+            for product_id in shopping_user.cart
+            if str(product_id).isdigit()
+        }
+        prices = dict(
+            Product.objects.filter(pk__in=product_ids).values_list("pk", "price")
+        )
+        items = []
+        for shopping_user in batch:
+            for product_id, item in shopping_user.cart.items():
+                product_id = int(product_id) if str(product_id).isdigit() else None
+                # Products deleted since they were added are dropped
+                if product_id not in prices or item.get("quantity", 0) <= 0:
+                    continue
+                price = item.get("price")
+                items.append(
+                    CartItem(
+                        shopping_user=shopping_user,
+                        product_id=product_id,
+                        quantity=item["quantity"],
+                        unit_price=(
+                            Decimal(str(price)) if price is not None else prices[product_id]
+                        ),
+                    )
+                )
+        CartItem.objects.bulk_create(items, ignore_conflicts=True)
+
+
+def populate_carts(apps, schema_editor):
+    ShoppingUser = apps.get_model("carts", "ShoppingUser")
+    CartItem = apps.get_model("carts", "CartItem")
+
+    carts = {}
+    for item in CartItem.objects.values(
+        "shopping_user_id", "product_id", "product__name", "quantity", "unit_price"
+    ).iterator(chunk_size=BATCH_SIZE):
+        carts.setdefault(item["shopping_user_id"], {})[str(item["product_id"])] = {
+            "name": item["product__name"],
+            "quantity": item["quantity"],
+            "price": float(item["unit_price"]),
+        }
+    for shopping_user_id, cart in carts.items():
+        ShoppingUser.objects.filter(pk=shopping_user_id).update(cart=cart)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("carts", "0003_cartitem"),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_cart_items, populate_carts),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.3 on 2026-10-18 16:18
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("carts", "0004_populate_cart_items"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="shoppinguser",
+            name="cart",
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.3 on 2026-10-18 16:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0010_product_filter_indexes"),
+        ("carts", "0005_remove_shoppinguser_cart"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockHold",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("cart_key", models.CharField(max_length=50)),
+                ("quantity", models.PositiveIntegerField()),
+                ("expires_at", models.DateTimeField(db_index=True)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="shop.product",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="stockhold",
+            constraint=models.UniqueConstraint(
+                fields=("cart_key", "product"), name="carts_stockhold_unique_product"
+            ),
+        ),
+    ]
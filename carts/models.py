@@ -1,5 +1,11 @@
+from datetime import datetime
+from typing import Any
+
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Count, F, Sum
+
+from shop.models import Product
 
 User = get_user_model()
 
@@ -8,4 +14,69 @@ class ShoppingUser(models.Model):
     user = models.OneToOneField(
         User, blank=False, null=False, on_delete=models.CASCADE, related_name='shoppinguser'
     )
-    cart = models.JSONField(default=dict)
+
+
+class CartItemQuerySet(models.QuerySet):
+    def get_abandoned_stats(self, cutoff: datetime) -> dict[str, Any]:
+        """
+        Returns the number of carts not changed since the cutoff,
+        the number of their products and their value, aggregated with one query.
+        """
+        active_carts = self.filter(updated_at__gte=cutoff).values('shopping_user')
+        return self.exclude(shopping_user__in=active_carts).aggregate(
+            carts=Count('shopping_user', distinct=True),
+            products=Sum('quantity'),
+            value=Sum(F('quantity') * F('unit_price')),
+        )
+
+
+class CartItem(models.Model):
+    """
+    A product in the cart of an authenticated user,
+    with its price from adding time.
+    """
+
+    shopping_user = models.ForeignKey(
+        ShoppingUser, on_delete=models.CASCADE, related_name='items'
+    )
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    quantity = models.PositiveIntegerField(default=1)
+    unit_price = models.DecimalField(max_digits=6, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = CartItemQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['shopping_user', 'product'],
+                name='carts_cartitem_unique_product'
+            ),
+        ]
+        indexes = [models.Index(fields=['updated_at'])]
+
+    def __str__(self) -> str:
+        return f"{self.quantity} x {self.product_id}"
+
+
+class StockHold(models.Model):
+    """
+    Units of a product taken from its stock for a cart until the hold expires.
+    The cart is identified by its key, see carts.reservations.get_cart_key.
+    """
+
+    cart_key = models.CharField(max_length=50)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['cart_key', 'product'], name='carts_stockhold_unique_product'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.quantity} x {self.product_id} for {self.cart_key}"
@@ -0,0 +1,104 @@
+from decimal import Decimal
+from typing import Any
+
+from shop.models import Product
+
+from .cart import BaseCart
+from .reservations import get_held_quantities
+
+
+class CartLine:
+    """A product in the cart with its current price and availability."""
+
+    def __init__(
+        self, product_id: str, item: dict[str, Any], product: Product | None,
+        held: int = 0
+    ) -> None:
+        self.product_id = product_id
+        self.product = product
+        self.quantity: int = item['quantity']
+        self.added_price = Decimal(str(item['price']))
+        self.name: str = product.name if product else item['name']
+        self.unit_price = product.current_price if product else self.added_price
+        # The units held for the cart are already taken from the product stock
+        stock: int = product.quantity + held if product else 0
+        # Deleted products and products not sold at the moment can't be bought
+        self.available = bool(product and product.available and stock > 0)
+        self.enough_stock = self.available and stock >= self.quantity
+
+    @property
+    def price_changed(self) -> bool:
+        return self.available and self.unit_price != self.added_price
+
+    @property
+    def total_price(self) -> Decimal:
+        return self.unit_price * self.quantity
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'product_id': self.product_id,
+            'name': self.name,
+            'url': self.product.get_absolute_url() if self.product else None,
+            'quantity': self.quantity,
+            'unit_price': self.unit_price,
+            'total_price': self.total_price,
+            'available': self.available,
+            'enough_stock': self.enough_stock,
+            'price_changed': self.price_changed,
+        }
+
+
+class PricedCart:
+    """
+    The cart revalidated against the current products: the prices are refreshed
+    and the lines which can't be bought are flagged and left out of the total.
+    """
+
+    def __init__(self, lines: list[CartLine]) -> None:
+        self.lines = lines
+
+    def __iter__(self):
+        return iter(self.lines)
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    @property
+    def total_price(self) -> Decimal:
+        return sum(
+            (line.total_price for line in self.lines if line.available),
+            Decimal('0.00')
+        )
+
+    @property
+    def has_problems(self) -> bool:
+        return any(not line.enough_stock for line in self.lines)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'lines': [line.as_dict() for line in self.lines],
+            'total_price': self.total_price,
+            'has_problems': self.has_problems,
+        }
+
+
+def price_cart(cart: BaseCart, cart_key: str | None = None) -> PricedCart:
+    """
+    Revalidates all the cart products with one query, for both the cart page
+    and the JSON cart summary. With the key of the cart, the stock held for it
+    is loaded with one more query and counted as available to it.
+    """
+    product_ids = [int(product_id) for product_id in cart.cart if product_id.isdigit()]
+    products = Product.objects.only(
+        'name', 'slug', 'price', 'sale_price', 'is_on_sale', 'available', 'quantity'
+    ).in_bulk(product_ids)
+    held = get_held_quantities(cart_key, product_ids)
+    return PricedCart([
+        CartLine(
+            product_id,
+            item,
+            products.get(int(product_id)) if product_id.isdigit() else None,
+            held.get(int(product_id), 0) if product_id.isdigit() else 0
+        )
+        for product_id, item in cart.cart.items()
+    ])
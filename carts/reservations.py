@@ -0,0 +1,251 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import partial
+from uuid import uuid4
+
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.db.models import Case, F, Value, When
+from django.http import HttpRequest
+from django.utils import timezone
+
+from shop.catalog import invalidate_product
+from shop.models import Product
+
+from .models import StockHold
+
+RELEASE_BATCH_SIZE = 500
+
+# Session key of the random key identifying the cart of an anonymous user
+SESSION_CART_KEY = 'cart_key'
+
+
+class InsufficientStock(Exception):
+    pass
+
+
+def find_cart_key(request: HttpRequest) -> str | None:
+    """
+    Returns the key of the cart of the request without creating one,
+    None if the anonymous cart hasn't held any stock yet.
+    """
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return request.session.get(SESSION_CART_KEY)
+
+
+def get_cart_key(request: HttpRequest) -> str:
+    """
+    Returns the key identifying the cart of the request in the stock holds.
+    Anonymous carts get a random key kept in the session, which unlike
+    the session key isn't changed at login, so their holds can be moved
+    to the user cart (see transfer_holds).
+    """
+    cart_key = find_cart_key(request)
+    if cart_key is None:
+        cart_key = request.session[SESSION_CART_KEY] = f'session:{uuid4().hex}'
+    return cart_key
+
+
+def get_held_quantities(cart_key: str | None, product_ids: list[int]) -> dict[int, int]:
+    """
+    Returns the units of the products held for the cart, by the product ids.
+    They are already taken from the product stock, but the cart can still buy them.
+    """
+    if cart_key is None or not product_ids:
+        return {}
+    return dict(
+        StockHold.objects.filter(
+            cart_key=cart_key, product_id__in=product_ids
+        ).values_list('product_id', 'quantity')
+    )
+
+
+def get_hold_expiry() -> datetime:
+    return timezone.now() + timedelta(minutes=settings.CART_STOCK_HOLD_MINUTES)
+
+
+def _stock_changed(changes: dict[int, int]) -> None:
+    """
+    Invalidates the cached products whose stock was changed by the given amounts
+    (negative for the reserved units), loading their slugs with one query.
+    The product lists only depend on whether the products are in stock,
+    so they are invalidated only when a stock runs out or is refilled from zero.
+    """
+    # Stock is changed with queryset updates, which don't send the signals
+    products = Product.objects.filter(pk__in=changes).values_list(
+        'pk', 'slug', 'quantity'
+    )
+    for product_id, slug, quantity in products:
+        if slug is None:
+            continue
+        change = changes[product_id]
+        lists = quantity == 0 if change < 0 else quantity == change
+        invalidate_product(slug, lists=lists)
+        transaction.on_commit(partial(invalidate_product, slug, lists=lists))
+
+
+def reserve(cart_key: str, product_id: int, quantity: int) -> None:
+    """
+    Takes the units from the product stock and holds them for the cart,
+    raises InsufficientStock if there are not enough units.
+
+    The stock is decremented with one conditional UPDATE
+    (quantity = quantity - n WHERE quantity >= n), so concurrent reservations
+    can't take more units than there are, without locking the product.
+    """
+    if quantity <= 0:
+        raise ValueError("Quantity must be greater than zero.")
+    expires_at = get_hold_expiry()
+
+    with transaction.atomic():
+        taken = Product.objects.filter(
+            pk=product_id, quantity__gte=quantity
+        ).update(quantity=F('quantity') - quantity)
+        if not taken:
+            raise InsufficientStock(
+                f"Not enough units of the product {product_id} in stock."
+            )
+        held = StockHold.objects.filter(
+            cart_key=cart_key, product_id=product_id
+        ).update(quantity=F('quantity') + quantity, expires_at=expires_at)
+        if not held:
+            StockHold.objects.create(
+                cart_key=cart_key, product_id=product_id,
+                quantity=quantity, expires_at=expires_at
+            )
+        _stock_changed({product_id: -quantity})
+
+
+def _release_units(cart_key: str, product_id: int, quantity: int) -> None:
+    """
+    Returns some of the held units to stock, the hold is decremented
+    with one conditional UPDATE, so the units can't be returned twice.
+    """
+    with transaction.atomic():
+        released = StockHold.objects.filter(
+            cart_key=cart_key, product_id=product_id, quantity__gt=quantity
+        ).update(quantity=F('quantity') - quantity, expires_at=get_hold_expiry())
+        if released:
+            Product.objects.filter(pk=product_id).update(
+                quantity=F('quantity') + quantity
+            )
+            _stock_changed({product_id: quantity})
+
+
+def hold_stock(cart_key: str, product_id: int, quantity: int) -> None:
+    """
+    Sets the units held for the cart product to the given quantity,
+    reserving or releasing only the difference to the current hold.
+    Raises InsufficientStock if there are not enough units, the hold is then
+    left unchanged.
+    """
+    if quantity < 0:
+        raise ValueError("Quantity can't be negative.")
+    held = StockHold.objects.filter(
+        cart_key=cart_key, product_id=product_id
+    ).values_list('quantity', flat=True).first() or 0
+    if quantity > held:
+        reserve(cart_key, product_id, quantity - held)
+    elif quantity == 0:
+        release(cart_key, product_id)
+    elif quantity < held:
+        _release_units(cart_key, product_id, held - quantity)
+
+
+def _release_holds(condition: str, params: list) -> int:
+    """
+    Deletes the holds matching the SQL condition and returns their units to stock,
+    with one DELETE ... RETURNING and one UPDATE of all the products.
+    As each hold is deleted by exactly one statement, concurrent releases
+    never return the same units twice. Returns the number of released holds.
+
+    DELETE ... RETURNING requires PostgreSQL or SQLite 3.35+,
+    which is verified by the carts.E001 system check.
+    """
+    table = connection.ops.quote_name(StockHold._meta.db_table)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {table} WHERE {condition} '
+                'RETURNING product_id, quantity',
+                params
+            )
+            released = cursor.fetchall()
+
+        quantities: dict[int, int] = defaultdict(int)
+        for product_id, quantity in released:
+            quantities[product_id] += quantity
+        if quantities:
+            Product.objects.filter(pk__in=quantities).update(
+                quantity=F('quantity') + Case(
+                    *[When(pk=product_id, then=Value(quantity))
+                      for product_id, quantity in quantities.items()],
+                    output_field=models.PositiveIntegerField()
+                )
+            )
+            _stock_changed(quantities)
+    return len(released)
+
+
+def release(cart_key: str, product_id: int | None = None) -> int:
+    """
+    Returns the units held for the cart (or only for its given product) to stock.
+    """
+    if product_id is None:
+        return _release_holds('cart_key = %s', [cart_key])
+    return _release_holds('cart_key = %s AND product_id = %s', [cart_key, product_id])
+
+
+def transfer_holds(from_key: str, to_key: str) -> None:
+    """
+    Moves the holds of one cart to another one, e.g. the holds of the session cart
+    of a user who just logged in, with a constant number of queries.
+    The holds of the products held by both carts are added together.
+    The stock doesn't change, so the catalog stays cached.
+    """
+    table = connection.ops.quote_name(StockHold._meta.db_table)
+    expires_at = get_hold_expiry()
+    with transaction.atomic():
+        # Deleting the conflicting holds first takes them from concurrent releases
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {table} WHERE cart_key = %s AND product_id IN '
+                f'(SELECT product_id FROM {table} WHERE cart_key = %s) '
+                'RETURNING product_id, quantity',
+                [from_key, to_key]
+            )
+            conflicting = cursor.fetchall()
+        if conflicting:
+            StockHold.objects.filter(
+                cart_key=to_key, product_id__in=[row[0] for row in conflicting]
+            ).update(
+                quantity=F('quantity') + Case(
+                    *[When(product_id=product_id, then=Value(quantity))
+                      for product_id, quantity in conflicting],
+                    output_field=models.PositiveIntegerField()
+                ),
+                expires_at=expires_at
+            )
+        StockHold.objects.filter(cart_key=from_key).update(
+            cart_key=to_key, expires_at=expires_at
+        )
+
+
+def release_expired_holds(
+    now: datetime | None = None, batch_size: int = RELEASE_BATCH_SIZE
+) -> int:
+    """
+    Returns the units of the expired holds to stock in batches,
+    each released in its own transaction. Returns the number of released holds.
+    """
+    now_value = connection.ops.adapt_datetimefield_value(now or timezone.now())
+    table = connection.ops.quote_name(StockHold._meta.db_table)
+    condition = (
+        f'id IN (SELECT id FROM {table} '
+        'WHERE expires_at <= %s ORDER BY expires_at LIMIT %s)'
+    )
+    total = 0
+    while released := _release_holds(condition, [now_value, batch_size]):
+        total += released
+    return total
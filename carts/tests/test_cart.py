@@ -1,8 +1,11 @@
+from decimal import Decimal
+
 from django.contrib.auth import get_user_model
 from django.http import HttpRequest
 from django.test import TestCase
 
 from carts.cart import AnonymousCart, AuthenticatedCart, BaseCart
+from carts.models import CartItem, ShoppingUser
 from shop.models import Product
 
 User = get_user_model()
@@ -105,8 +108,8 @@ class AnonymousCartTests(TestCase):
         self.assertEqual(len(items), 2)
         self.assertEqual(items[0]['name'], 'Test Product')
         self.assertEqual(items[1]['name'], 'Second Test Product')
-        self.assertEqual(items[0]['price'], 10.0)
-        self.assertEqual(items[1]['price'], 20.0)
+        self.assertEqual(items[0]['price'], Decimal('10.00'))
+        self.assertEqual(items[1]['price'], Decimal('20.00'))
 
     def test_reset_cart(self):
         self.cart.add(
@@ -124,10 +127,21 @@ class AuthenticatedCartTests(TestCase):
         self.request.session = self.client.session
         self.user = User.objects.create_user(username='testuser', password='testpassword')
         self.product = Product.objects.create(name='Test Product', price=10.0)
+        self.second_product = Product.objects.create(
+            name='Second Test Product', price=20.0
+        )
         self.client.force_login(self.user)
         self.request.user = self.user
+        self.shopping_user = ShoppingUser.objects.create(user=self.user)
         self.cart = AuthenticatedCart(self.request)
 
+    def get_stored_quantities(self):
+        return dict(
+            CartItem.objects.filter(shopping_user=self.shopping_user).values_list(
+                'product__name', 'quantity'
+            )
+        )
+
     def test_reset_cart(self):
         self.cart.add(
             item_id=self.product.id, model_name=self.product.__class__.__name__, quantity=2
@@ -137,6 +151,98 @@ class AuthenticatedCartTests(TestCase):
         self.cart.reset()
         self.assertEqual(len(self.cart), 0)
 
+    def test_changes_are_saved_on_flush(self):
+        self.cart.add(item_id=str(self.product.id), model_name='Product', quantity=2)
+        self.assertEqual(self.get_stored_quantities(), {})
+
+        self.cart.flush()
+        self.assertEqual(self.get_stored_quantities(), {'Test Product': 2})
+        self.assertFalse(self.cart.modified)
+
+    def test_unchanged_cart_is_not_saved(self):
+        with self.assertNumQueries(0):
+            self.cart.flush()
+
+    def test_add_queries(self):
+        # Loading the cart, loading the new product and upserting its item
+        with self.assertNumQueries(3):
+            with AuthenticatedCart(self.request) as cart:
+                cart.add(item_id=str(self.product.id), model_name='Product')
+                cart.add(item_id=str(self.product.id), model_name='Product')
+        self.assertEqual(len(AuthenticatedCart(self.request)), 2)
+
+    def test_update_queries(self):
+        with self.cart as cart:
+            cart.add(item_id=str(self.product.id), model_name='Product')
+        with self.assertNumQueries(2):
+            with AuthenticatedCart(self.request) as cart:
+                cart.update(
+                    item_id=str(self.product.id), model_name='Product', new_quantity=5
+                )
+        self.assertEqual(len(AuthenticatedCart(self.request)), 5)
+
+    def test_delete_queries(self):
+        with self.cart as cart:
+            cart.add(item_id=str(self.product.id), model_name='Product')
+        with self.assertNumQueries(2):
+            with AuthenticatedCart(self.request) as cart:
+                cart.delete(item_id=str(self.product.id), model_name='Product')
+        self.assertEqual(len(AuthenticatedCart(self.request)), 0)
+
+    def test_shopping_user_is_created_on_first_save(self):
+        self.shopping_user.delete()
+        with AuthenticatedCart(self.request) as cart:
+            cart.add(item_id=self.product.id, model_name='Product')
+        self.assertEqual(CartItem.objects.get().shopping_user.user, self.user)
+
+    def test_cart_is_loaded_from_items(self):
+        with self.cart as cart:
+            cart.add(item_id=self.product.id, model_name='Product', quantity=2)
+            cart.add(item_id=self.second_product.id, model_name='Product')
+        items = list(AuthenticatedCart(self.request))
+        self.assertEqual(
+            [item['name'] for item in items], ['Test Product', 'Second Test Product']
+        )
+        self.assertEqual([item['quantity'] for item in items], [2, 1])
+        self.assertEqual(items[1]['price'], 20.0)
+
+    def test_concurrent_additions_are_not_lost(self):
+        with self.cart as cart:
+            cart.add(item_id=self.product.id, model_name='Product')
+        first_tab = AuthenticatedCart(self.request)
+        second_tab = AuthenticatedCart(self.request)
+        first_tab.add(item_id=self.product.id, model_name='Product', quantity=2)
+        second_tab.add(item_id=self.product.id, model_name='Product', quantity=3)
+        second_tab.add(item_id=self.second_product.id, model_name='Product')
+        first_tab.flush()
+        second_tab.flush()
+        self.assertEqual(
+            self.get_stored_quantities(), {'Test Product': 6, 'Second Test Product': 1}
+        )
+
+    def test_deleted_and_added_again_product(self):
+        with self.cart as cart:
+            cart.add(item_id=self.product.id, model_name='Product', quantity=5)
+        with AuthenticatedCart(self.request) as cart:
+            cart.delete(item_id=self.product.id, model_name='Product')
+            cart.add(item_id=self.product.id, model_name='Product')
+        self.assertEqual(self.get_stored_quantities(), {'Test Product': 1})
+
+    def test_reset_deletes_items(self):
+        with self.cart as cart:
+            cart.add(item_id=self.product.id, model_name='Product')
+        with AuthenticatedCart(self.request) as cart:
+            cart.reset()
+            cart.add(item_id=self.second_product.id, model_name='Product')
+        self.assertEqual(self.get_stored_quantities(), {'Second Test Product': 1})
+
+    def test_changes_are_not_saved_on_error(self):
+        with self.assertRaises(KeyError):
+            with self.cart as cart:
+                cart.add(item_id=str(self.product.id), model_name='Product')
+                cart.delete(item_id='0', model_name='Product')
+        self.assertEqual(self.get_stored_quantities(), {})
+
 
 class UnimplementedCartTests(TestCase):
     def setUp(self):
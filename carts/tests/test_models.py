@@ -1,7 +1,13 @@
+from datetime import timedelta
+from decimal import Decimal
+
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError
 from django.test import TestCase
+from django.utils import timezone
 
-from carts.models import ShoppingUser
+from carts.models import CartItem, ShoppingUser
+from shop.models import Product
 
 User = get_user_model()
 
@@ -25,8 +31,53 @@ class ShoppingUserModelTests(TestCase):
         )
         self.assertEqual(ShoppingUser.objects.all().count(), 1)
         self.assertEqual(shopping_user.user, self.user)
-        self.assertEqual(shopping_user.cart, {})
+        self.assertEqual(shopping_user.items.count(), 0)
 
     def test_delete_user(self):
         self.user.delete()
         self.assertEqual(ShoppingUser.objects.all().count(), 0)
+
+
+class CartItemModelTests(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(name='Product', price=10)
+        self.shopping_user = ShoppingUser.objects.create(
+            user=User.objects.create_user(username='user', password='test_password')
+        )
+
+    def test_product_is_unique_in_cart(self):
+        CartItem.objects.create(
+            shopping_user=self.shopping_user, product=self.product, unit_price=10
+        )
+        with self.assertRaises(IntegrityError):
+            CartItem.objects.create(
+                shopping_user=self.shopping_user, product=self.product, unit_price=10
+            )
+
+    def test_abandoned_stats(self):
+        other_product = Product.objects.create(name='Other product', price=5)
+        active_user = ShoppingUser.objects.create(
+            user=User.objects.create_user(
+                username='active', email='active@example.com', password='test_password'
+            )
+        )
+        CartItem.objects.create(
+            shopping_user=self.shopping_user, product=self.product,
+            quantity=2, unit_price=10
+        )
+        CartItem.objects.create(
+            shopping_user=self.shopping_user, product=other_product,
+            quantity=1, unit_price=5
+        )
+        CartItem.objects.create(
+            shopping_user=active_user, product=self.product, unit_price=10
+        )
+        CartItem.objects.filter(shopping_user=self.shopping_user).update(
+            updated_at=timezone.now() - timedelta(days=3)
+        )
+
+        with self.assertNumQueries(1):
+            stats = CartItem.objects.get_abandoned_stats(
+                timezone.now() - timedelta(days=1)
+            )
+        self.assertEqual(stats, {'carts': 1, 'products': 3, 'value': Decimal('25')})
@@ -0,0 +1,71 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.http import HttpRequest
+from django.test import TestCase
+
+from carts.cart import AnonymousCart, AuthenticatedCart
+from carts.pricing import price_cart
+from shop.models import Product
+
+User = get_user_model()
+
+
+class PriceCartTests(TestCase):
+    def setUp(self):
+        self.request = HttpRequest()
+        self.request.session = self.client.session
+        self.bar = Product.objects.create(name='Bar', price='2.10', quantity=10)
+        self.shake = Product.objects.create(name='Shake', price='3.30', quantity=10)
+        self.cart = AnonymousCart(self.request)
+        self.cart.add(item_id=self.bar.id, model_name='Product', quantity=3)
+        self.cart.add(item_id=self.shake.id, model_name='Product')
+
+    def test_products_are_loaded_with_one_query(self):
+        with self.assertNumQueries(1):
+            priced_cart = price_cart(self.cart)
+        self.assertEqual([line.name for line in priced_cart], ['Bar', 'Shake'])
+
+    def test_total_is_decimal(self):
+        priced_cart = price_cart(self.cart)
+        self.assertEqual(priced_cart.total_price, Decimal('9.60'))
+        self.assertIsInstance(priced_cart.total_price, Decimal)
+        self.assertFalse(priced_cart.has_problems)
+
+    def test_prices_are_refreshed(self):
+        Product.objects.filter(pk=self.shake.pk).update(
+            is_on_sale=True, sale_price='1.00'
+        )
+        line = price_cart(self.cart).lines[1]
+        self.assertEqual(line.unit_price, Decimal('1.00'))
+        self.assertEqual(line.added_price, Decimal('3.30'))
+        self.assertTrue(line.price_changed)
+
+    def test_unavailable_products_are_flagged_and_not_counted(self):
+        Product.objects.filter(pk=self.shake.pk).update(available=False)
+        priced_cart = price_cart(self.cart)
+        self.assertFalse(priced_cart.lines[1].available)
+        self.assertTrue(priced_cart.has_problems)
+        self.assertEqual(priced_cart.total_price, Decimal('6.30'))
+
+    def test_deleted_products_are_flagged(self):
+        self.shake.delete()
+        line = price_cart(self.cart).lines[1]
+        self.assertIsNone(line.product)
+        self.assertFalse(line.available)
+        self.assertEqual(line.name, 'Shake')
+
+    def test_insufficient_stock_is_flagged(self):
+        Product.objects.filter(pk=self.bar.pk).update(quantity=2)
+        line = price_cart(self.cart).lines[0]
+        self.assertTrue(line.available)
+        self.assertFalse(line.enough_stock)
+
+    def test_authenticated_cart(self):
+        self.request.user = User.objects.create_user(
+            username='user', password='password'
+        )
+        with AuthenticatedCart(self.request) as cart:
+            cart.add(item_id=self.bar.id, model_name='Product', quantity=2)
+        priced_cart = price_cart(AuthenticatedCart(self.request))
+        self.assertEqual(priced_cart.total_price, Decimal('4.20'))
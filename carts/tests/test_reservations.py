@@ -0,0 +1,241 @@
+import sqlite3
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.checks import Error
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.utils import timezone
+
+from carts.checks import check_database_returning
+from carts.models import StockHold
+from carts.reservations import (InsufficientStock, get_cart_key, hold_stock, release,
+                                release_expired_holds, reserve, transfer_holds)
+from shop.catalog import CATALOG_LISTS_CACHE_NAMESPACE, get_cached_product
+from shop.models import Product
+from utils.cache_utils import get_cache_version
+
+User = get_user_model()
+
+
+class ReservationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.product = Product.objects.create(name='Bar', price=5, quantity=5)
+        self.other_product = Product.objects.create(name='Shake', price=5, quantity=5)
+
+    def get_quantity(self, product):
+        product.refresh_from_db(fields=['quantity'])
+        return product.quantity
+
+    def test_reserve_takes_units_from_stock(self):
+        reserve('cart', self.product.pk, 2)
+        reserve('cart', self.product.pk, 1)
+        self.assertEqual(self.get_quantity(self.product), 2)
+        self.assertEqual(StockHold.objects.get(cart_key='cart').quantity, 3)
+
+    def test_reserve_more_than_stock(self):
+        with self.assertRaises(InsufficientStock):
+            reserve('cart', self.product.pk, 6)
+        self.assertEqual(self.get_quantity(self.product), 5)
+        self.assertFalse(StockHold.objects.exists())
+
+    def test_reserve_invalid_quantity(self):
+        with self.assertRaises(ValueError):
+            reserve('cart', self.product.pk, 0)
+
+    def test_reserve_queries(self):
+        reserve('cart', self.product.pk, 1)
+        # The conditional stock update, the hold update
+        # and the invalidated product slug in a savepoint
+        with self.assertNumQueries(5):
+            reserve('cart', self.product.pk, 1)
+
+    def test_reserve_invalidates_catalog(self):
+        get_cached_product(self.product.slug)
+        reserve('cart', self.product.pk, 2)
+        self.assertEqual(get_cached_product(self.product.slug).quantity, 3)
+
+    def test_product_lists_are_invalidated_only_when_stock_runs_out(self):
+        lists_version = get_cache_version(CATALOG_LISTS_CACHE_NAMESPACE)
+        reserve('cart', self.product.pk, 2)
+        self.assertEqual(
+            get_cache_version(CATALOG_LISTS_CACHE_NAMESPACE), lists_version
+        )
+        reserve('cart', self.product.pk, 3)
+        self.assertGreater(
+            get_cache_version(CATALOG_LISTS_CACHE_NAMESPACE), lists_version
+        )
+
+    def test_product_lists_are_invalidated_when_stock_is_refilled(self):
+        reserve('cart', self.product.pk, 5)
+        reserve('cart', self.other_product.pk, 1)
+        with patch('carts.reservations.invalidate_product') as invalidate:
+            release('cart')
+        invalidate.assert_any_call(self.product.slug, lists=True)
+        invalidate.assert_any_call(self.other_product.slug, lists=False)
+
+    def test_hold_stock_reserves_and_releases_the_difference(self):
+        hold_stock('cart', self.product.pk, 3)
+        self.assertEqual(self.get_quantity(self.product), 2)
+        hold_stock('cart', self.product.pk, 1)
+        self.assertEqual(self.get_quantity(self.product), 4)
+        self.assertEqual(StockHold.objects.get().quantity, 1)
+        hold_stock('cart', self.product.pk, 0)
+        self.assertEqual(self.get_quantity(self.product), 5)
+        self.assertFalse(StockHold.objects.exists())
+
+    def test_hold_stock_more_than_stock(self):
+        hold_stock('cart', self.product.pk, 2)
+        with self.assertRaises(InsufficientStock):
+            hold_stock('cart', self.product.pk, 8)
+        self.assertEqual(StockHold.objects.get().quantity, 2)
+
+    def test_transfer_holds(self):
+        reserve('session', self.product.pk, 2)
+        reserve('session', self.other_product.pk, 1)
+        reserve('user', self.product.pk, 1)
+        transfer_holds('session', 'user')
+
+        self.assertEqual(
+            dict(StockHold.objects.values_list('product__name', 'quantity')),
+            {'Bar': 3, 'Shake': 1}
+        )
+        self.assertEqual(
+            set(StockHold.objects.values_list('cart_key', flat=True)), {'user'}
+        )
+        self.assertEqual(self.get_quantity(self.product), 2)
+
+    def test_release_cart(self):
+        reserve('cart', self.product.pk, 2)
+        reserve('cart', self.other_product.pk, 3)
+        reserve('other cart', self.product.pk, 1)
+
+        self.assertEqual(release('cart'), 2)
+        self.assertEqual(self.get_quantity(self.product), 4)
+        self.assertEqual(self.get_quantity(self.other_product), 5)
+        self.assertEqual(
+            list(StockHold.objects.values_list('cart_key', flat=True)), ['other cart']
+        )
+
+    def test_release_product(self):
+        reserve('cart', self.product.pk, 2)
+        reserve('cart', self.other_product.pk, 3)
+        release('cart', self.product.pk)
+        self.assertEqual(self.get_quantity(self.product), 5)
+        self.assertEqual(self.get_quantity(self.other_product), 2)
+
+    def test_release_expired_holds_in_batches(self):
+        for number in range(5):
+            reserve(f'cart {number}', self.product.pk, 1)
+        reserve('active cart', self.other_product.pk, 2)
+        StockHold.objects.filter(product=self.product).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        self.assertEqual(release_expired_holds(batch_size=2), 5)
+        self.assertEqual(self.get_quantity(self.product), 5)
+        self.assertEqual(self.get_quantity(self.other_product), 3)
+        self.assertEqual(StockHold.objects.get().cart_key, 'active cart')
+
+    def test_release_expired_holds_command(self):
+        reserve('cart', self.product.pk, 1)
+        StockHold.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+        out = StringIO()
+        call_command('release_expired_stock_holds', stdout=out)
+        self.assertIn('Released 1 expired stock holds.', out.getvalue())
+        self.assertEqual(self.get_quantity(self.product), 5)
+
+
+class GetCartKeyTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_authenticated_user(self):
+        request = self.factory.get('/')
+        request.user = User.objects.create_user(username='user', password='password')
+        self.assertEqual(get_cart_key(request), f'user:{request.user.pk}')
+
+    def test_anonymous_user(self):
+        request = self.factory.get('/')
+        request.user = AnonymousUser()
+        request.session = self.client.session
+        cart_key = get_cart_key(request)
+        self.assertRegex(cart_key, r'^session:[0-9a-f]{32}$')
+        # The key is kept when the session key is changed at login
+        request.session.cycle_key()
+        self.assertEqual(get_cart_key(request), cart_key)
+
+
+class DatabaseReturningCheckTests(TestCase):
+    def test_supported_sqlite(self):
+        with patch.object(sqlite3, 'sqlite_version_info', (3, 35, 0)):
+            self.assertEqual(check_database_returning(), [])
+
+    def test_old_sqlite(self):
+        with patch.object(sqlite3, 'sqlite_version_info', (3, 31, 1)):
+            errors = check_database_returning()
+        self.assertEqual([error.id for error in errors], ['carts.E001'])
+        self.assertIsInstance(errors[0], Error)
+
+
+class ConcurrentReservationTests(TransactionTestCase):
+    max_attempts = 500
+    join_timeout = 30
+
+    def test_last_units_are_not_oversold(self):
+        product = Product.objects.create(name='Bar', price=5, quantity=3)
+        buyers = 8
+        results = []
+        barrier = threading.Barrier(buyers)
+
+        errors = []
+
+        def buy(number):
+            barrier.wait()
+            last_error = None
+            try:
+                # SQLite reports a locked database instead of waiting, so it is retried
+                for _ in range(self.max_attempts):
+                    try:
+                        reserve(f'cart {number}', product.pk, 1)
+                        results.append(True)
+                        break
+                    except OperationalError as error:
+                        last_error = error
+                        time.sleep(0.01)
+                else:
+                    errors.append(
+                        f"Buyer {number} gave up after {self.max_attempts} "
+                        f"attempts: {last_error}"
+                    )
+            except InsufficientStock:
+                results.append(False)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=buy, args=(number,)) for number in range(buyers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=self.join_timeout)
+            self.assertFalse(
+                thread.is_alive(),
+                f"A buyer didn't finish in {self.join_timeout} seconds."
+            )
+        self.assertEqual(errors, [])
+
+        product.refresh_from_db()
+        self.assertEqual(results.count(True), 3)
+        self.assertEqual(results.count(False), buyers - 3)
+        self.assertEqual(product.quantity, 0)
+        self.assertEqual(StockHold.objects.count(), 3)
@@ -0,0 +1,109 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import HttpRequest
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from carts.cart import AnonymousCart, AuthenticatedCart, merge_session_cart
+from carts.models import CartItem, ShoppingUser, StockHold
+from shop.models import Product
+
+User = get_user_model()
+
+
+class MergeSessionCartOnLoginTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='user', password='asdf1234', email='user@test.pl'
+        )
+        self.product = Product.objects.create(name='Bar', price=5, quantity=10)
+        self.other_product = Product.objects.create(name='Shake', price=7, quantity=10)
+
+    def add_to_cart(self, product, quantity):
+        self.client.post(
+            reverse('carts:cart_add'),
+            {'item_type': 'product', 'item_id': product.id, 'quantity': quantity}
+        )
+
+    def log_in(self):
+        self.client.post(
+            reverse(settings.LOGIN_URL), {'username': 'user', 'password': 'asdf1234'}
+        )
+
+    def get_stored_quantities(self):
+        return dict(
+            CartItem.objects.filter(shopping_user__user=self.user).values_list(
+                'product__name', 'quantity'
+            )
+        )
+
+    def test_session_cart_is_moved_to_user_cart(self):
+        self.add_to_cart(self.product, 2)
+        self.add_to_cart(self.other_product, 1)
+        self.log_in()
+
+        self.assertEqual(self.get_stored_quantities(), {'Bar': 2, 'Shake': 1})
+        self.assertNotIn('cart', self.client.session)
+
+    def test_session_cart_is_combined_with_user_cart(self):
+        shopping_user = ShoppingUser.objects.create(user=self.user)
+        CartItem.objects.create(
+            shopping_user=shopping_user, product=self.product, quantity=3, unit_price=5
+        )
+        self.add_to_cart(self.product, 2)
+        self.add_to_cart(self.other_product, 1)
+        self.log_in()
+
+        self.assertEqual(self.get_stored_quantities(), {'Bar': 5, 'Shake': 1})
+
+    def test_stock_holds_are_moved_to_user_cart(self):
+        self.add_to_cart(self.product, 2)
+        self.log_in()
+
+        hold = StockHold.objects.get()
+        self.assertEqual((hold.cart_key, hold.quantity), (f'user:{self.user.pk}', 2))
+        self.assertNotIn('cart_key', self.client.session)
+
+    def test_deleted_products_are_dropped(self):
+        self.add_to_cart(self.product, 2)
+        self.add_to_cart(self.other_product, 1)
+        self.other_product.delete()
+        self.log_in()
+
+        self.assertEqual(self.get_stored_quantities(), {'Bar': 2})
+
+    def test_empty_session_cart(self):
+        self.log_in()
+        self.assertFalse(ShoppingUser.objects.exists())
+
+
+class MergeSessionCartQueriesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user', password='asdf1234')
+        ShoppingUser.objects.create(user=self.user)
+        self.products = [
+            Product.objects.create(name=f'Product {number}', price=5)
+            for number in range(10)
+        ]
+
+    def count_merge_queries(self, products):
+        request = HttpRequest()
+        request.session = self.client.session
+        cart = AnonymousCart(request)
+        for product in products:
+            cart.add(item_id=product.id, model_name='Product')
+        cart.flush()
+
+        request.user = self.user
+        with CaptureQueriesContext(connection) as queries:
+            merge_session_cart(request)
+        self.assertNotIn('cart', request.session)
+        self.assertIsInstance(request.cart, AuthenticatedCart)
+        return len(queries)
+
+    def test_merge_cost_does_not_depend_on_cart_size(self):
+        small_cart_queries = self.count_merge_queries(self.products[:1])
+        CartItem.objects.all().delete()
+        self.assertEqual(self.count_merge_queries(self.products), small_cart_queries)
@@ -4,8 +4,9 @@ from django.test import RequestFactory, TestCase
 from django.urls import reverse
 
 from carts.cart import AnonymousCart, AuthenticatedCart
+from carts.models import CartItem, StockHold
 from carts.views import get_cart, get_item_info
-from shop.models import Product
+from shop.models import Brand, Product
 
 User = get_user_model()
 
@@ -25,6 +26,12 @@ class GetCartTests(TestCase):
         cart = get_cart(self.client)
         self.assertIsInstance(cart, AnonymousCart)
 
+    def test_cart_is_loaded_once_per_request(self):
+        self.client.user = self.user
+        cart = get_cart(self.client)
+        with self.assertNumQueries(0):
+            self.assertIs(get_cart(self.client), cart)
+
 
 class GetItemInfoTests(TestCase):
     def setUp(self):
@@ -80,7 +87,9 @@ class GetItemInfoTests(TestCase):
 class CartViewsTests(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(username='testuser', password='testpassword')
-        self.product = Product.objects.create(name='Test Product', price=10.0)
+        self.product = Product.objects.create(
+            name='Test Product', price=10.0, quantity=10
+        )
 
     def test_cart_detail_view_anonymous_user(self):
         response = self.client.get(reverse('carts:cart_detail'))
@@ -199,3 +208,110 @@ class CartViewsTests(TestCase):
             {'item_type': 'invalid_item_type', 'item_id': self.product.id}
         )
         self.assertEqual(response.status_code, 404)
+
+    def test_authenticated_cart_changes_are_saved_after_the_view(self):
+        self.client.force_login(self.user)
+        self.client.post(
+            reverse('carts:cart_add'),
+            {'item_type': 'product', 'item_id': self.product.id, 'quantity': 3}
+        )
+        item = CartItem.objects.get(shopping_user__user=self.user)
+        self.assertEqual((item.product, item.quantity), (self.product, 3))
+
+    def test_cart_detail_shows_current_prices(self):
+        self.client.post(
+            reverse('carts:cart_add'),
+            {'item_type': 'product', 'item_id': self.product.id, 'quantity': 2}
+        )
+        Product.objects.filter(pk=self.product.pk).update(
+            quantity=5, is_on_sale=True, sale_price='7.50'
+        )
+        response = self.client.get(reverse('carts:cart_detail'))
+        self.assertContains(response, 'Total: 15.00 PLN')
+
+    def get_held_quantity(self):
+        return sum(StockHold.objects.values_list('quantity', flat=True))
+
+    def test_cart_add_holds_stock(self):
+        for _ in range(2):
+            self.client.post(
+                reverse('carts:cart_add'),
+                {'item_type': 'product', 'item_id': self.product.id, 'quantity': 2}
+            )
+        self.assertEqual(self.get_held_quantity(), 4)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity, 6)
+
+    def test_cart_add_more_than_stock(self):
+        response = self.client.post(
+            reverse('carts:cart_add'),
+            {'item_type': 'product', 'item_id': self.product.id, 'quantity': 11},
+            follow=True
+        )
+        self.assertRedirects(response, reverse('carts:cart_detail'))
+        self.assertContains(response, 'There are not enough units of the product')
+        self.assertEqual(len(response.context['cart']), 0)
+        self.assertFalse(StockHold.objects.exists())
+
+    def test_cart_update_holds_new_quantity(self):
+        self.client.post(
+            reverse('carts:cart_add'),
+            {'item_type': 'product', 'item_id': self.product.id, 'quantity': 5}
+        )
+        self.client.post(
+            reverse('carts:cart_update'),
+            {'item_type': 'product', 'item_id': self.product.id, 'quantity': 2}
+        )
+        self.assertEqual(self.get_held_quantity(), 2)
+        response = self.client.post(
+            reverse('carts:cart_update'),
+            {'item_type': 'product', 'item_id': self.product.id, 'quantity': 20},
+            follow=True
+        )
+        self.assertEqual(len(response.context['cart']), 2)
+        self.assertEqual(self.get_held_quantity(), 2)
+
+    def test_cart_delete_releases_stock(self):
+        self.client.post(
+            reverse('carts:cart_add'),
+            {'item_type': 'product', 'item_id': self.product.id, 'quantity': 3}
+        )
+        self.client.post(
+            reverse('carts:cart_delete'),
+            {'item_type': 'product', 'item_id': self.product.id}
+        )
+        self.assertFalse(StockHold.objects.exists())
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity, 10)
+
+    def test_cart_detail_shows_shop_navigation(self):
+        brand = Brand.objects.create(name='Brand X')
+        response = self.client.get(reverse('carts:cart_detail'))
+        self.assertContains(response, brand.get_absolute_url())
+
+    def test_cart_summary(self):
+        self.client.post(
+            reverse('carts:cart_add'),
+            {'item_type': 'product', 'item_id': self.product.id, 'quantity': 2}
+        )
+        # The hold expired and its units were sold to someone else
+        StockHold.objects.all().delete()
+        Product.objects.filter(pk=self.product.pk).update(quantity=1)
+        response = self.client.get(reverse('carts:cart_summary'))
+        self.assertEqual(response.status_code, 200)
+        summary = response.json()
+        self.assertEqual(summary['total_price'], '20.00')
+        self.assertEqual(summary['lines'][0]['name'], 'Test Product')
+        self.assertFalse(summary['lines'][0]['enough_stock'])
+
+    def test_cart_summary_counts_held_stock(self):
+        Product.objects.filter(pk=self.product.pk).update(quantity=2)
+        self.client.post(
+            reverse('carts:cart_add'),
+            {'item_type': 'product', 'item_id': self.product.id, 'quantity': 2}
+        )
+        response = self.client.get(reverse('carts:cart_summary'))
+        line = response.json()['lines'][0]
+        self.assertTrue(line['available'])
+        self.assertTrue(line['enough_stock'])
+        self.assertEqual(response.json()['total_price'], '20.00')
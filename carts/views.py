@@ -1,14 +1,27 @@
-from django.http import HttpResponseNotFound
+from django.contrib import messages
+from django.http import HttpResponseNotFound, JsonResponse
 from django.shortcuts import redirect, render
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 
 from .cart import AnonymousCart, AuthenticatedCart
+from .pricing import price_cart
+from .reservations import (InsufficientStock, find_cart_key, get_cart_key, hold_stock,
+                           release)
 
 
 def get_cart(request):
-    if request.user.is_authenticated:
-        return AuthenticatedCart(request)
-    return AnonymousCart(request)
+    """
+    Returns the cart of the request, loading it only once per request.
+    The changes are saved by CartMiddleware.
+    """
+    cart = getattr(request, 'cart', None)
+    if cart is None:
+        if request.user.is_authenticated:
+            cart = AuthenticatedCart(request)
+        else:
+            cart = AnonymousCart(request)
+        request.cart = cart
+    return cart
 
 def get_item_info(request):
     """Helper function to extract item id, type and quantity from request."""
@@ -23,9 +36,33 @@ def get_item_info(request):
 
     return {'type': item_type, 'id': str(item_id), 'quantity': quantity}
 
+
+def hold_product_stock(request, product_id, quantity):
+    """
+    Holds the units of the product for the cart, returns False and reports
+    the problem to the user if there are not enough units in stock.
+    """
+    try:
+        hold_stock(get_cart_key(request), int(product_id), quantity)
+    except InsufficientStock:
+        messages.error(request, "There are not enough units of the product in stock.")
+        return False
+    return True
+
+
 def cart_detail(request):
     cart = get_cart(request)
-    return render(request, 'carts/cart_detail.html', {'cart': cart})
+    return render(
+        request, 'carts/cart_detail.html',
+        {'cart': cart, 'priced_cart': price_cart(cart, find_cart_key(request))}
+    )
+
+
+@require_GET
+def cart_summary(request):
+    """The cart with the current prices and availability of its products as JSON."""
+    priced_cart = price_cart(get_cart(request), find_cart_key(request))
+    return JsonResponse(priced_cart.as_dict())
 
 @require_POST
 def cart_add(request):
@@ -34,7 +71,13 @@ def cart_add(request):
     item_info = get_item_info(request)
 
     if item_info['type'] == 'product':
-        cart.add(item_id=item_info['id'], model_name='Product', quantity=item_info['quantity'])
+        item = cart.cart.get(item_info['id'])
+        quantity = (item['quantity'] if item else 0) + item_info['quantity']
+        if hold_product_stock(request, item_info['id'], quantity):
+            cart.add(
+                item_id=item_info['id'], model_name='Product',
+                quantity=item_info['quantity']
+            )
     else:
         return HttpResponseNotFound('Invalid item type.')
     return redirect('carts:cart_detail')
@@ -45,12 +88,13 @@ def cart_update(request):
     item_info = get_item_info(request)
 
     if item_info['type'] == 'product':
-        try:
+        if item_info['id'] not in cart.cart:
+            return HttpResponseNotFound('Product not found in the cart.')
+        if hold_product_stock(request, item_info['id'], item_info['quantity']):
             cart.update(
-                item_id=item_info['id'], model_name='Product', new_quantity=item_info['quantity']
+                item_id=item_info['id'], model_name='Product',
+                new_quantity=item_info['quantity']
             )
-        except KeyError:
-            return HttpResponseNotFound('Product not found in the cart.')
     else:
         return HttpResponseNotFound('Invalid item type.')
 
@@ -66,6 +110,7 @@ def cart_delete(request):
             cart.delete(item_id=item_info['id'], model_name='Product')
         except KeyError:
             return HttpResponseNotFound('Product not found in the cart.')
+        release(get_cart_key(request), int(item_info['id']))
     else:
         return HttpResponseNotFound('Invalid item type.')
 
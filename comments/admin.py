@@ -19,6 +19,10 @@ class PublicationAdmin(admin.ModelAdmin):
     list_display_links = ['publication_object']
     readonly_fields = ['publication_type', 'publication_object']
 
+    @admin.display(description="active comments", ordering='active_comments_count')
+    def active_comments(self, obj: Publication) -> int:
+        return obj.active_comments_count
+
     def publication_type(self, obj: Publication):
         if hasattr(obj, 'post'):
             return "post"
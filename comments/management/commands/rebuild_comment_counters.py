@@ -0,0 +1,28 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from comments.models import Comment, Publication
+
+
+class Command(BaseCommand):
+    help = "Recalculates the stored active comments counters of all publications."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        active_comments = Comment.objects.filter(
+            publication=OuterRef('pk'),
+            active=True
+        ).order_by().values('publication').annotate(total=Count('pk')).values('total')
+
+        updated = Publication.objects.update(
+            active_comments_count=Coalesce(
+                Subquery(active_comments, output_field=IntegerField()), 0
+            )
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt active comments counters for {updated} publications."
+            )
+        )
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.3 on 2026-10-18 15:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comments", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["publication", "active"], name="comments_co_publica_ffba94_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.3 on 2026-10-18 15:22
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_active_comments_count(apps, schema_editor):
+    Comment = apps.get_model("comments", "Comment")
+    Publication = apps.get_model("comments", "Publication")
+    active_comments = (
+        Comment.objects.filter(publication=OuterRef("pk"), active=True)
+        .order_by()
+        .values("publication")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    Publication.objects.update(
+        active_comments_count=Coalesce(
+            Subquery(active_comments, output_field=IntegerField()), 0
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comments", "0002_comment_comments_co_publica_ffba94_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="publication",
+            name="active_comments_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            populate_active_comments_count, migrations.RunPython.noop
+        ),
+    ]
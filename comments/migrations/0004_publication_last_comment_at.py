@@ -0,0 +1,33 @@
+# Generated by Django 4.2.3 on 2026-10-18 15:46
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+
+
+def populate_last_comment_at(apps, schema_editor):
+    Comment = apps.get_model("comments", "Comment")
+    Publication = apps.get_model("comments", "Publication")
+    last_comment = (
+        Comment.objects.filter(publication=OuterRef("pk"), active=True)
+        .order_by()
+        .values("publication")
+        .annotate(last=Max("pub_datetime"))
+        .values("last")
+    )
+    Publication.objects.update(last_comment_at=Subquery(last_comment))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comments", "0003_publication_active_comments_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="publication",
+            name="last_comment_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(populate_last_comment_at, migrations.RunPython.noop),
+    ]
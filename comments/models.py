@@ -3,13 +3,17 @@ from typing import Any
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator
-from django.db import models
-from django.db.models import Model, QuerySet
+from django.db import models, transaction
+from django.db.models import F, Model, QuerySet
+from django.utils import timezone
 
 User = get_user_model()
 
 
 class Publication(models.Model):
+    active_comments_count = models.PositiveIntegerField(default=0, editable=False)
+    last_comment_at = models.DateTimeField(null=True, blank=True, editable=False)
+
     def __str__(self):
         return f"{self.publication_type}"
 
@@ -23,7 +27,18 @@ class Publication(models.Model):
 
     @property
     def active_comments(self) -> int:
-        return self.comments.filter(active=True).count()
+        return self.active_comments_count
+
+    @classmethod
+    def change_active_comments_count(cls, publication_id: int, delta: int) -> None:
+        """
+        Atomically changes the stored active comments counter of the given publication
+        and stamps the time of the last change of its active comments.
+        """
+        cls.objects.filter(pk=publication_id).update(
+            active_comments_count=F('active_comments_count') + delta,
+            last_comment_at=timezone.now()
+        )
 
     @classmethod
     def get_recent_comments(cls, amount: int, publication_type: str) -> QuerySet['Comment'] | None:
@@ -80,8 +95,20 @@ class Comment(models.Model):
     active = models.BooleanField(default=False)
     level = models.PositiveIntegerField(default=1, validators=[MaxValueValidator(8)])
 
+    # The active state currently stored in the database, used to maintain counters
+    _stored_active = False
+
     class Meta:
         ordering = ['-pub_datetime']
+        indexes = [
+            models.Index(fields=['publication', 'active']),
+        ]
+
+    @classmethod
+    def from_db(cls, db: str | None, field_names: Any, values: Any) -> 'Comment':
+        instance = super().from_db(db, field_names, values)
+        instance._stored_active = instance.__dict__.get('active', False)
+        return instance
 
     def __str__(self) -> str:
         if self.logged_user:
@@ -92,6 +119,7 @@ class Comment(models.Model):
         """
         Assigns email for logged-in users.
         Switch for active if comment is written by superuser.
+        Keeps the publication active comments counter up to date.
         """
         if self.logged_user:
             self.email = self.logged_user.email
@@ -107,7 +135,15 @@ class Comment(models.Model):
                 'Fields response_to and publication must be associated with the same publication.'
             )
 
-        return super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            delta = int(self.active) - int(self._stored_active)
+            if self.active or self._stored_active:
+                Publication.change_active_comments_count(self.publication_id, delta)
+
+        if delta and Comment.publication.is_cached(self):
+            self.publication.active_comments_count += delta
+        self._stored_active = self.active
 
     @property
     def active_replies(self) -> QuerySet['Comment']:
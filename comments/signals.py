@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import Comment, Publication
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_active_comments_count(sender, instance, **kwargs):
+    """
+    Keeps the publication counter correct for deleted comments,
+    including replies removed by cascade.
+    """
+    if instance._stored_active:
+        Publication.change_active_comments_count(instance.publication_id, -1)
@@ -339,3 +339,33 @@ class CommentAdminInterfaceOtherTests(TestCase):
             body=long_body
         )
         self.assertEqual(self.admin.comment(comment), long_body[:75])
+
+
+class CommentAdminListEditableCounterTests(TestCase):
+    def setUp(self):
+        self.superuser = User.objects.create_superuser(
+            username='admin',
+            password='password',
+            email='admin@mail.com'
+        )
+        self.post = baker.make(Post)
+        self.comment = Comment.objects.create(
+            publication=self.post.publication,
+            body='Comment waiting for moderation.'
+        )
+        self.client.force_login(self.superuser)
+
+    def test_activating_comment_in_changelist_updates_counter(self):
+        response = self.client.post(
+            reverse('admin:comments_comment_changelist'),
+            {
+                'form-TOTAL_FORMS': '1',
+                'form-INITIAL_FORMS': '1',
+                'form-0-id': str(self.comment.pk),
+                'form-0-active': 'on',
+                '_save': 'Save',
+            }
+        )
+        self.assertEqual(response.status_code, 302)
+        self.post.publication.refresh_from_db()
+        self.assertEqual(self.post.publication.active_comments, 1)
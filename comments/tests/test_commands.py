@@ -0,0 +1,26 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from blog.models import Post
+from comments.models import Comment, Publication
+
+
+class RebuildCommentCountersCommandTests(TestCase):
+    def setUp(self):
+        self.post = Post.objects.create(title='Test Post', body='Body.', status='PUB')
+        self.empty_publication = Publication.objects.create()
+        publication = self.post.publication
+        Comment.objects.create(publication=publication, body='A.', active=True)
+        Comment.objects.create(publication=publication, body='B.', active=True)
+        Comment.objects.create(publication=publication, body='C.')
+
+    def test_rebuild_fixes_out_of_sync_counters(self):
+        Publication.objects.update(active_comments_count=7)
+        call_command('rebuild_comment_counters', stdout=StringIO())
+
+        self.post.publication.refresh_from_db()
+        self.empty_publication.refresh_from_db()
+        self.assertEqual(self.post.publication.active_comments, 2)
+        self.assertEqual(self.empty_publication.active_comments, 0)
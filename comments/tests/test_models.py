@@ -180,3 +180,87 @@ class CommentModelTests(TestCase):
             'response_to and publication must be associated with the same publication',
             str(context.exception)
         )
+
+
+class PublicationActiveCommentsCounterTests(TestCase):
+    def setUp(self):
+        self.staff_user = User.objects.create_user(
+            username='staff',
+            password='xyz',
+            email='staff@mail.com',
+            is_staff=True
+        )
+        self.post = Post.objects.create(
+            title='Test Post',
+            body='This is a test post.',
+            status='PUB'
+        )
+        self.publication = self.post.publication
+
+    def get_counter(self):
+        self.publication.refresh_from_db()
+        return self.publication.active_comments
+
+    def test_counter_ignores_inactive_comment(self):
+        Comment.objects.create(publication=self.publication, body='Inactive comment.')
+        self.assertEqual(self.get_counter(), 0)
+
+    def test_counter_increases_for_active_comment(self):
+        Comment.objects.create(
+            publication=self.publication, body='Active.', active=True
+        )
+        self.assertEqual(self.get_counter(), 1)
+
+    def test_counter_increases_for_staff_comment(self):
+        Comment.objects.create(
+            publication=self.publication, logged_user=self.staff_user,
+            body='Staff comment.'
+        )
+        self.assertEqual(self.get_counter(), 1)
+
+    def test_counter_follows_activation_and_deactivation(self):
+        comment = Comment.objects.create(publication=self.publication, body='Comment.')
+        comment = Comment.objects.get(pk=comment.pk)
+        comment.active = True
+        comment.save()
+        self.assertEqual(self.get_counter(), 1)
+
+        comment = Comment.objects.get(pk=comment.pk)
+        comment.active = False
+        comment.save()
+        self.assertEqual(self.get_counter(), 0)
+
+    def test_counter_unchanged_when_active_comment_edited(self):
+        comment = Comment.objects.create(
+            publication=self.publication, body='A.', active=True
+        )
+        comment.body = 'Edited.'
+        comment.save()
+        self.assertEqual(self.get_counter(), 1)
+
+    def test_counter_decreases_when_active_comment_deleted(self):
+        comment = Comment.objects.create(
+            publication=self.publication, body='A.', active=True
+        )
+        Comment.objects.create(publication=self.publication, body='Inactive.')
+        comment.delete()
+        self.assertEqual(self.get_counter(), 0)
+
+    def test_counter_decreases_for_cascaded_replies(self):
+        parent = Comment.objects.create(
+            publication=self.publication, body='A.', active=True
+        )
+        Comment.objects.create(
+            publication=self.publication, response_to=parent, body='Reply.', active=True
+        )
+        Comment.objects.create(
+            publication=self.publication, response_to=parent, body='Inactive reply.'
+        )
+        self.assertEqual(self.get_counter(), 2)
+        parent.delete()
+        self.assertEqual(self.get_counter(), 0)
+
+    def test_counter_of_cached_publication_is_updated(self):
+        comment = Comment(publication=self.publication, body='A.', active=True)
+        comment.save()
+        self.assertEqual(comment.publication.active_comments, 1)
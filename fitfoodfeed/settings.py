@@ -44,8 +44,10 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'carts.middleware.CartMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'utils.context_utils.ContextValuesUsageMiddleware',
 ]
 
 ROOT_URLCONF = 'fitfoodfeed.urls'
@@ -61,12 +63,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
-                'blog.context_processors.categories',
-                'blog.context_processors.main_categories_blog',
-                'blog.context_processors.navbar_tags',
-                'shop.context_processors.product_categories',
-                'shop.context_processors.main_categories_shop',
-                'shop.context_processors.product_brands',
+                'blog.context_processors.blog_navigation',
+                'shop.context_processors.shop_navigation',
             ],
         },
     },
@@ -85,6 +83,22 @@ DATABASES = {
     }
 }
 
+# Local memory cache in development,
+# set REDIS_URL to share the cache between all the processes in production
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 AUTH_USER_MODEL = 'accounts.User'
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -140,6 +154,29 @@ LOGOUT_REDIRECT_URL = 'blog:home'
 
 TAGGIT_CASE_INSENSITIVE = True
 
+# Products added in this number of days are listed as new in the shop
+SHOP_NEW_PRODUCTS_DAYS = 30
+
+# Products reserved for a cart are held for it for this number of minutes
+CART_STOCK_HOLD_MINUTES = 15
+
+# The usage of the lazy context processor values is logged at INFO,
+# which Django's default logging drops for the project loggers
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'utils.context_utils': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 # SMTP Configuration
 
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
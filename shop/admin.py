@@ -1,10 +1,12 @@
-from typing import Any
+from typing import Any, cast
 
 from django.contrib import admin
+from django.db.models import QuerySet
+from django.http import HttpRequest
 from django.urls import reverse
 from django.utils.html import format_html
 
-from .models import Brand, Category, Product
+from .models import Brand, Category, Product, ProductsCountQuerySet
 
 
 @admin.register(Category)
@@ -19,10 +21,18 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields = ['name', 'description']
     prepopulated_fields = {'slug': ('name',)}
 
+    def get_queryset(self, request: HttpRequest) -> QuerySet[Category]:
+        queryset = cast(ProductsCountQuerySet, super().get_queryset(request))
+        return queryset.with_products_count()
+
     @admin.display(description="category description")
     def short_description(self, obj:Category) -> str:
         return f"{obj.description[:150]}..." if len(obj.description) > 150 else f"{obj.description}"
 
+    @admin.display(description="number of products", ordering='products_count')
+    def number_of_products(self, obj: Category) -> int:
+        return obj.number_of_products
+
 
 @admin.register(Brand)
 class BrandAdmin(admin.ModelAdmin):
@@ -36,10 +46,18 @@ class BrandAdmin(admin.ModelAdmin):
     search_fields = ['name', 'description']
     prepopulated_fields = {'slug': ('name',)}
 
+    def get_queryset(self, request: HttpRequest) -> QuerySet[Brand]:
+        queryset = cast(ProductsCountQuerySet, super().get_queryset(request))
+        return queryset.with_products_count()
+
     @admin.display(description='brand description')
     def short_description(self, obj: Brand) -> str:
         return f"{obj.description[:150]}..." if len(obj.description) > 150 else f"{obj.description}"
 
+    @admin.display(description='number of products', ordering='products_count')
+    def number_of_products(self, obj: Brand) -> int:
+        return obj.number_of_products
+
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
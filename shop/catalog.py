@@ -0,0 +1,149 @@
+import hashlib
+from typing import Any, Callable
+
+from django.core.cache import cache
+from django.db.models import Model, QuerySet
+from django.http import HttpRequest
+
+from utils.cache_utils import (build_once, bump_cache_version, get_cache_version,
+                               get_versioned_key)
+from utils.pagination import CursorPage, CursorPaginator, get_cursor_page
+
+from .models import Brand, Category, Product
+
+CATALOG_CACHE_NAMESPACE = 'shop:catalog'
+# Product lists (pages, facets, counts) also change with every product change
+CATALOG_LISTS_CACHE_NAMESPACE = f'{CATALOG_CACHE_NAMESPACE}:lists'
+CATALOG_CACHE_TIMEOUT = 15 * 60
+CATALOG_HITS_KEY = f'{CATALOG_CACHE_NAMESPACE}:hits'
+CATALOG_MISSES_KEY = f'{CATALOG_CACHE_NAMESPACE}:misses'
+
+
+def _increment_counter(key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_catalog_value(name: str, builder: Callable[[], Any]) -> Any:
+    """
+    Returns the catalog value cached under the current catalog version,
+    builds and caches it on a miss. Builders returning None are not cached.
+    """
+    key = get_versioned_key(CATALOG_CACHE_NAMESPACE, name)
+    value = cache.get(key)
+    if value is not None:
+        _increment_counter(CATALOG_HITS_KEY)
+        return value
+    _increment_counter(CATALOG_MISSES_KEY)
+    return build_once(key, builder, CATALOG_CACHE_TIMEOUT)
+
+
+def get_catalog_list_value(name: str, builder: Callable[[], Any]) -> Any:
+    """
+    Returns the cached value built from many products, like a page or facets,
+    which is invalidated by the change of any product.
+    """
+    version = get_cache_version(CATALOG_LISTS_CACHE_NAMESPACE)
+    return get_catalog_value(f'lists:{version}:{name}', builder)
+
+
+def invalidate_catalog() -> None:
+    bump_cache_version(CATALOG_CACHE_NAMESPACE)
+
+
+def invalidate_product(slug: str, lists: bool = True) -> None:
+    """
+    Invalidates the cached product and, unless lists is False, the product lists,
+    other products, categories and brands stay cached.
+    """
+    cache.delete(get_versioned_key(CATALOG_CACHE_NAMESPACE, f'product:{slug}'))
+    if lists:
+        bump_cache_version(CATALOG_LISTS_CACHE_NAMESPACE)
+
+
+def get_catalog_cache_stats() -> dict[str, Any]:
+    hits = cache.get(CATALOG_HITS_KEY, 0)
+    misses = cache.get(CATALOG_MISSES_KEY, 0)
+    requests = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / requests if requests else None,
+        'version': cache.get(f'{CATALOG_CACHE_NAMESPACE}:version', 1),
+    }
+
+
+def reset_catalog_cache_stats() -> None:
+    cache.delete_many([CATALOG_HITS_KEY, CATALOG_MISSES_KEY])
+
+
+def get_request_query_key(request: HttpRequest) -> str:
+    """
+    Returns the key part identifying the query string of the request,
+    independent of the parameters order.
+    """
+    query = repr(sorted(request.GET.lists()))
+    return hashlib.md5(query.encode(), usedforsecurity=False).hexdigest()
+
+
+def get_cached_product(slug: str) -> Product | None:
+    """
+    Returns the product with everything displayed on its page
+    besides the comments, which change independently of the catalog.
+    """
+    return get_catalog_value(
+        f'product:{slug}',
+        lambda: Product.objects.select_related(
+            'category', 'brand', 'publication'
+        ).filter(slug=slug).first()
+    )
+
+
+def get_cached_category(slug: str) -> Category:
+    """
+    Returns the category with the given slug,
+    raises Category.DoesNotExist if it is missing.
+    """
+    category = get_catalog_value(
+        f'category:{slug}', lambda: Category.objects.filter(slug=slug).first()
+    )
+    if category is None:
+        raise Category.DoesNotExist
+    return category
+
+
+def get_cached_brand(slug: str) -> Brand:
+    """
+    Returns the brand with the given slug, raises Brand.DoesNotExist if it is missing.
+    """
+    brand = get_catalog_value(
+        f'brand:{slug}', lambda: Brand.objects.filter(slug=slug).first()
+    )
+    if brand is None:
+        raise Brand.DoesNotExist
+    return brand
+
+
+def get_cached_page(
+    request: HttpRequest,
+    name: str,
+    products: QuerySet[Product],
+    per_page: int,
+    ordering: list[str],
+) -> CursorPage:
+    """
+    Returns the page of the product list selected by the request,
+    caching the displayed products for the query string of the request.
+    """
+    def build_page() -> tuple[list[Model], bool, bool]:
+        page = get_cursor_page(request, products, per_page, ordering)
+        return (page.object_list, page.has_next(), page.has_previous())
+
+    object_list, has_next, has_previous = get_catalog_list_value(
+        f'page:{name}:{get_request_query_key(request)}', build_page
+    )
+    paginator = CursorPaginator(products, per_page, ordering)
+    return CursorPage(object_list, paginator, has_next, has_previous)
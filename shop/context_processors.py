@@ -1,37 +1,63 @@
-from django.db.models import QuerySet
+from functools import partial
+from operator import getitem
+from typing import Any
+
 from django.http import HttpRequest
+from django.utils.functional import SimpleLazyObject
+
+from utils.cache_utils import bump_cache_version, get_or_build, get_versioned_key
+from utils.context_utils import lazy_context_value
+from utils.request_utils import get_request_section
 
 from .models import Brand, Category
 
+NAVIGATION_CACHE_NAMESPACE = 'shop:navigation'
+NAVIGATION_CACHE_TIMEOUT = 60 * 60
+MAIN_CATEGORIES_AMOUNT = 6
+
+# Navigation keys used by the base templates of each website section
+NAVIGATION_SECTION_KEYS = {
+    'shop': ['main_categories_shop', 'product_brands'],
+    'cart': ['main_categories_shop', 'product_brands'],
+}
 
-def product_categories(request: HttpRequest) -> dict[str, QuerySet[Category]]:
-    """
-    Returns a list of product categories that can be added to the template context.
-    
-    These categories are used in the online shop.
-    """
-    categories = Category.objects.all()
-    return {'product_categories': categories}
 
-def product_brands(request: HttpRequest) -> dict[str, QuerySet[Brand]]:
+def build_shop_navigation() -> dict[str, Any]:
     """
-    Returns a dict contained a QuerySet of product brands from database
-    that can be added to the template context.
+    Builds the shop navigation snapshot:
+    six main categories with the most products and all product brands.
     """
-    brands = Brand.objects.all()
-    return {'product_brands': brands}
+    main_categories = Category.objects.with_products_count().order_by(
+        '-products_count', 'name'
+    )[:MAIN_CATEGORIES_AMOUNT]
+    return {
+        'main_categories_shop': sorted(
+            main_categories, key=lambda category: category.name
+        ),
+        'product_brands': list(Brand.objects.all()),
+    }
+
+
+def get_shop_navigation() -> dict[str, Any]:
+    key = get_versioned_key(NAVIGATION_CACHE_NAMESPACE, 'snapshot')
+    return get_or_build(key, build_shop_navigation, NAVIGATION_CACHE_TIMEOUT)
+
+
+def invalidate_shop_navigation() -> None:
+    bump_cache_version(NAVIGATION_CACHE_NAMESPACE)
+
 
-def main_categories_shop(request: HttpRequest) -> dict[str, QuerySet[Category]]:
+def shop_navigation(request: HttpRequest) -> dict[str, Any]:
     """
-    Returns a list contains six main categories that can be added to the template context.
+    Returns the shop navigation data used by the base template
+    of the current website section.
+    Values are lazy, so the snapshot is fetched only if a template uses it.
     """
-    all_categories = Category.objects.all()
-    sorted_categories = sorted(
-        all_categories,
-        key=lambda category: category.number_of_products,
-        reverse=True
-    )
+    keys = NAVIGATION_SECTION_KEYS.get(get_request_section(request) or '')
+    if not keys:
+        return {}
+    navigation = SimpleLazyObject(get_shop_navigation)
     return {
-        'main_categories_shop': 
-            all_categories.filter(pk__in=[category.pk for category in sorted_categories[:6]])
+        key: lazy_context_value(request, key, partial(getitem, navigation, key))
+        for key in keys
     }
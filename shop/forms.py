@@ -0,0 +1,123 @@
+from typing import Any
+
+from django import forms
+from django.core.validators import validate_slug
+from django.db.models import Count, Max, Min, Q, QuerySet
+
+from .models import Product
+
+
+class SlugListField(forms.Field):
+    """Field accepting many slugs sent with the same query parameter."""
+
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value: Any) -> list[str]:
+        return [slug for slug in (value or []) if slug]
+
+    def validate(self, value: list[str]) -> None:
+        super().validate(value)
+        for slug in value:
+            validate_slug(slug)
+
+
+class ProductFilterForm(forms.Form):
+    """
+    Filters of the product list sent in the query string,
+    e.g. ?category=bars&brand=brand-x&min_price=10&on_sale=1.
+    """
+    category = SlugListField(required=False)
+    brand = SlugListField(required=False)
+    min_price = forms.DecimalField(required=False, min_value=0, decimal_places=2)
+    max_price = forms.DecimalField(required=False, min_value=0, decimal_places=2)
+    on_sale = forms.BooleanField(required=False)
+    in_stock = forms.BooleanField(required=False)
+
+    def get_conditions(self) -> dict[str, Q]:
+        """
+        Returns the conditions of the valid filters grouped by facet,
+        invalid filters are ignored.
+        """
+        self.is_valid()
+        data = self.cleaned_data
+        conditions = {}
+
+        if data.get('category'):
+            conditions['category'] = Q(category__slug__in=data['category'])
+        if data.get('brand'):
+            conditions['brand'] = Q(brand__slug__in=data['brand'])
+        price = Q()
+        if data.get('min_price') is not None:
+            price &= Q(price__gte=data['min_price'])
+        if data.get('max_price') is not None:
+            price &= Q(price__lte=data['max_price'])
+        if price:
+            conditions['price'] = price
+        if data.get('on_sale'):
+            conditions['on_sale'] = Q(is_on_sale=True)
+        if data.get('in_stock'):
+            conditions['in_stock'] = Q(available=True, quantity__gt=0)
+        return conditions
+
+
+def filter_products(
+    products: QuerySet[Product],
+    conditions: dict[str, Q],
+    exclude_facet: str | None = None,
+) -> QuerySet[Product]:
+    """
+    Applies the filters conditions, except for the conditions of the excluded facet.
+    """
+    for facet, condition in conditions.items():
+        if facet != exclude_facet:
+            products = products.filter(condition)
+    return products
+
+
+def get_product_facets(
+    products: QuerySet[Product], conditions: dict[str, Q]
+) -> dict[str, Any]:
+    """
+    Returns the counts of products for each option of each facet.
+    Each facet group is counted with one aggregated query, applying the filters
+    of the other groups only, so the counts show what selecting an option would add.
+    """
+    categories = filter_products(products, conditions, 'category').filter(
+        category__isnull=False
+    ).values('category__slug', 'category__name').annotate(
+        count=Count('pk')
+    ).order_by('category__name')
+
+    brands = filter_products(products, conditions, 'brand').filter(
+        brand__isnull=False
+    ).values('brand__slug', 'brand__name').annotate(
+        count=Count('pk')
+    ).order_by('brand__name')
+
+    return {
+        'categories': [
+            {
+                'slug': row['category__slug'],
+                'name': row['category__name'],
+                'count': row['count'],
+            }
+            for row in categories
+        ],
+        'brands': [
+            {
+                'slug': row['brand__slug'],
+                'name': row['brand__name'],
+                'count': row['count'],
+            }
+            for row in brands
+        ],
+        'price': filter_products(products, conditions, 'price').aggregate(
+            min=Min('price'), max=Max('price')
+        ),
+        'on_sale': filter_products(products, conditions, 'on_sale').aggregate(
+            count=Count('pk', filter=Q(is_on_sale=True))
+        )['count'],
+        'in_stock': filter_products(products, conditions, 'in_stock').aggregate(
+            count=Count('pk', filter=Q(available=True, quantity__gt=0))
+        )['count'],
+    }
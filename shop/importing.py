@@ -0,0 +1,195 @@
+import csv
+import json
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import IO, Any
+
+from django import forms
+from django.db import transaction
+from django.db.models import Q
+
+from comments.models import Publication
+from utils.polish_slug_utils import convert_to_slug
+
+from .catalog import invalidate_catalog
+from .context_processors import invalidate_shop_navigation
+from .models import Brand, Category, Product
+
+IMPORT_BATCH_SIZE = 500
+
+# Product fields overwritten when an imported row matches
+# an existing product by slug
+UPDATED_FIELDS = [
+    'name', 'brief_description', 'full_description', 'price', 'quantity',
+    'category', 'brand', 'available', 'is_on_sale', 'sale_price', 'updated_at',
+]
+
+
+class ProductImportForm(forms.Form):
+    """Validates a single imported row, the category and brand are given by slugs."""
+
+    name = forms.CharField(max_length=50)
+    slug = forms.SlugField(max_length=50, required=False)
+    brief_description = forms.CharField(max_length=255, required=False)
+    full_description = forms.CharField(required=False)
+    price = forms.DecimalField(max_digits=6, decimal_places=2, min_value=0)
+    quantity = forms.IntegerField(min_value=0, required=False)
+    category = forms.SlugField(required=False)
+    brand = forms.SlugField(required=False)
+    # Text inputs accept the true/false and 1/0 values of the CSV files
+    available = forms.NullBooleanField(required=False, widget=forms.TextInput)
+    is_on_sale = forms.NullBooleanField(required=False, widget=forms.TextInput)
+    sale_price = forms.DecimalField(
+        max_digits=6, decimal_places=2, min_value=0, required=False
+    )
+
+
+def read_rows(file: IO[str], file_format: str) -> Iterator[dict[str, Any]]:
+    """
+    Yields the rows of a CSV file with a header or of a JSON Lines file
+    (one object per line), reading the file lazily.
+    """
+    if file_format == 'csv':
+        yield from csv.DictReader(file)
+    elif file_format == 'jsonl':
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError(f"Unsupported import format: {file_format}")
+
+
+def chunked(rows: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class ProductImporter:
+    """
+    Upserts products in batches, matching the existing products by slug.
+
+    Each batch costs a constant number of queries: one to find the existing
+    products with the same slugs or names, one bulk insert of the publications
+    of the new products and one INSERT ... ON CONFLICT DO UPDATE of the products.
+    The names are unique too, so the rows taking the names of the other products
+    are reported as errors instead of failing the batch. The categories
+    and brands are looked up in dictionaries loaded once.
+    Product.save is bypassed, so the caches are invalidated after the import.
+    """
+
+    def __init__(self, batch_size: int = IMPORT_BATCH_SIZE) -> None:
+        self.batch_size = batch_size
+        self.categories = dict(Category.objects.values_list('slug', 'pk'))
+        self.brands = dict(Brand.objects.values_list('slug', 'pk'))
+        self.created = 0
+        self.updated = 0
+        self.errors: list[str] = []
+
+    @property
+    def imported(self) -> int:
+        return self.created + self.updated
+
+    def import_rows(self, rows: Iterable[dict[str, Any]]) -> None:
+        try:
+            for chunk in chunked(enumerate(rows, start=1), self.batch_size):
+                self.import_batch(chunk)
+        finally:
+            if self.imported:
+                invalidate_catalog()
+                invalidate_shop_navigation()
+
+    def build_product(self, row_number: int, row: dict[str, Any]) -> Product | None:
+        form = ProductImportForm(row)
+        if not form.is_valid():
+            errors = '; '.join(
+                f"{field}: {' '.join(str(message) for message in messages)}"
+                for field, messages in form.errors.items()
+            )
+            self.errors.append(f"Row {row_number}: {errors}")
+            return None
+        data = form.cleaned_data
+
+        related_ids = {}
+        for field, ids in [('category', self.categories), ('brand', self.brands)]:
+            if data[field] and data[field] not in ids:
+                self.errors.append(
+                    f"Row {row_number}: unknown {field} '{data[field]}'."
+                )
+                return None
+            related_ids[f'{field}_id'] = ids.get(data[field])
+
+        return Product(
+            name=data['name'],
+            slug=data['slug'] or convert_to_slug(data['name']),
+            brief_description=data['brief_description'] or None,
+            full_description=data['full_description'] or None,
+            price=data['price'],
+            quantity=data['quantity'] or 0,
+            available=data['available'] is not False,
+            is_on_sale=bool(data['is_on_sale']),
+            sale_price=data['sale_price'],
+            **related_ids,
+        )
+
+    def drop_name_collisions(
+        self,
+        products: dict[str | None, Product],
+        row_numbers: dict[str | None, int],
+        name_slugs: dict[str, str | None],
+    ) -> None:
+        """
+        Removes the products whose names are already used by other slugs,
+        as the names are unique too, and reports them as row errors.
+        """
+        for slug, product in list(products.items()):
+            used_by = name_slugs.setdefault(product.name, slug)
+            if used_by != slug:
+                self.errors.append(
+                    f"Row {row_numbers[slug]}: the name '{product.name}' "
+                    f"is already used by the product '{used_by}'."
+                )
+                del products[slug]
+
+    def import_batch(self, rows: list[tuple[int, dict[str, Any]]]) -> None:
+        # The last row wins if a slug is repeated, like it would across batches
+        products = {}
+        row_numbers = {}
+        for row_number, row in rows:
+            product = self.build_product(row_number, row)
+            if product is not None:
+                products[product.slug] = product
+                row_numbers[product.slug] = row_number
+        if not products:
+            return
+
+        names = [product.name for product in products.values()]
+        with transaction.atomic():
+            existing = dict(
+                Product.objects.filter(
+                    Q(slug__in=products) | Q(name__in=names)
+                ).values_list('slug', 'name')
+            )
+            # The existing names go first, so they win over the imported ones
+            name_slugs = {name: slug for slug, name in existing.items()}
+            self.drop_name_collisions(products, row_numbers, name_slugs)
+            if not products:
+                return
+
+            new_products = [
+                product for slug, product in products.items() if slug not in existing
+            ]
+            publications = Publication.objects.bulk_create(
+                [Publication() for _ in new_products]
+            )
+            for product, publication in zip(new_products, publications):
+                product.publication = publication
+
+            Product.objects.bulk_create(
+                products.values(),
+                update_conflicts=True,
+                unique_fields=['slug'],
+                update_fields=UPDATED_FIELDS,
+            )
+        self.created += len(new_products)
+        self.updated += len(products) - len(new_products)
@@ -0,0 +1,30 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from shop.catalog import get_catalog_cache_stats, reset_catalog_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Displays the hit/miss metrics of the product catalog cache."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--reset', action='store_true',
+            help="Resets the metrics after displaying them."
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        stats = get_catalog_cache_stats()
+        hit_ratio = "-"
+        if stats['hit_ratio'] is not None:
+            hit_ratio = f"{stats['hit_ratio']:.1%}"
+        self.stdout.write(
+            f"Catalog version: {stats['version']}\n"
+            f"Hits: {stats['hits']}\n"
+            f"Misses: {stats['misses']}\n"
+            f"Hit ratio: {hit_ratio}"
+        )
+        if options['reset']:
+            reset_catalog_cache_stats()
+            self.stdout.write(self.style.SUCCESS("Metrics reset."))
@@ -0,0 +1,27 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from shop.models import Brand, Product
+from shop.renditions import (BRAND_LOGO_RENDITIONS, PRODUCT_IMAGE_RENDITIONS,
+                             generate_renditions)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates the missing renditions of the product images and brand logos, "
+        "e.g. after a change of the renditions settings or a cache flush."
+    )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        products = Product.objects.exclude(Q(image__isnull=True) | Q(image=''))
+        for product in products.iterator():
+            generate_renditions(product.image, PRODUCT_IMAGE_RENDITIONS)
+        brands = Brand.objects.exclude(Q(logo__isnull=True) | Q(logo=''))
+        for brand in brands.iterator():
+            generate_renditions(brand.logo, BRAND_LOGO_RENDITIONS)
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated the renditions of {products.count()} product images "
+            f"and {brands.count()} brand logos."
+        ))
@@ -0,0 +1,59 @@
+import time
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import DatabaseError
+
+from shop.importing import IMPORT_BATCH_SIZE, ProductImporter, read_rows
+
+FILE_FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports products from a CSV or JSON Lines file in batches, "
+        "updating the existing products with the same slugs."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('path', help="Path of the .csv or .jsonl file.")
+        parser.add_argument(
+            '--format', choices=['csv', 'jsonl'],
+            help="Format of the file, detected from its extension by default."
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+            help=f"Number of rows saved at once (default: {IMPORT_BATCH_SIZE})."
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        path = Path(options['path'])
+        file_format = options['format'] or FILE_FORMATS.get(path.suffix.lower())
+        if file_format is None:
+            raise CommandError(f"Cannot detect the format of {path}, use --format.")
+        if options['batch_size'] < 1:
+            raise CommandError("The batch size must be positive.")
+
+        importer = ProductImporter(batch_size=options['batch_size'])
+        start = time.perf_counter()
+        try:
+            with path.open(encoding='utf-8', newline='') as file:
+                importer.import_rows(read_rows(file, file_format))
+        except (OSError, ValueError, DatabaseError) as error:
+            raise CommandError(
+                f"Import stopped after {importer.imported} products: {error}"
+            ) from error
+        elapsed = time.perf_counter() - start
+
+        for row_error in importer.errors:
+            self.stderr.write(row_error)
+        rows = importer.imported + len(importer.errors)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {importer.imported} products "
+                f"({importer.created} created, {importer.updated} updated, "
+                f"{len(importer.errors)} skipped) in {elapsed:.2f}s, "
+                f"{rows / elapsed if elapsed else 0:.0f} rows/s."
+            )
+        )
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.3 on 2026-10-18 15:52
+
+from django.db import migrations, models
+import django.db.models.expressions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0007_product_publication"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                models.OrderBy(
+                    django.db.models.expressions.RawSQL(
+                        '("available" AND "quantity" > 0)',
+                        [],
+                        output_field=models.BooleanField(),
+                    ),
+                    descending=True,
+                ),
+                models.F("name"),
+                models.F("id"),
+                name="shop_product_display_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.3 on 2026-10-18 15:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0008_product_display_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["created_at"], name="shop_produc_created_ed077b_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.3 on 2026-10-18 15:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0009_product_created_at_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "brand", "available", "is_on_sale", "price"],
+                name="shop_produc_categor_0dfc97_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["brand", "available", "is_on_sale", "price"],
+                name="shop_produc_brand_i_28f07f_idx",
+            ),
+        ),
+    ]
@@ -1,7 +1,11 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
 from typing import Any
 
+from django.conf import settings
 from django.db import models
-from django.db.models import QuerySet
+from django.db.models import BooleanField, Case, Count, F, QuerySet, When
+from django.db.models.expressions import RawSQL
 from django.urls import reverse
 from django.utils import timezone
 
@@ -9,6 +13,15 @@ from comments.models import Publication
 from utils.polish_slug_utils import convert_to_slug
 
 
+class ProductsCountQuerySet(models.QuerySet):
+    def with_products_count(self) -> 'ProductsCountQuerySet':
+        """
+        Annotates the number of products, so lists of categories or brands
+        display it without a COUNT query per row.
+        """
+        return self.annotate(products_count=Count('products'))
+
+
 class Category(models.Model):
     """Model representing the base category for various products."""
 
@@ -16,6 +29,8 @@ class Category(models.Model):
     slug = models.SlugField(max_length=25, unique=True, null=True, blank=True)
     description = models.TextField(blank=True)
 
+    objects = ProductsCountQuerySet.as_manager()
+
     class Meta:
         verbose_name_plural = "Categories"
         ordering = ['name']
@@ -33,6 +48,8 @@ class Category(models.Model):
 
     @property
     def number_of_products(self) -> int:
+        if hasattr(self, 'products_count'):
+            return self.products_count
         return self.products.count()
 
 
@@ -44,6 +61,8 @@ class Brand(models.Model):
     description = models.TextField(blank=True)
     logo = models.ImageField(upload_to='brand_images/', null=True, blank=True)
 
+    objects = ProductsCountQuerySet.as_manager()
+
     class Meta:
         ordering = ['name']
 
@@ -59,13 +78,57 @@ class Brand(models.Model):
         return reverse("shop:brand_product_list", kwargs={"brand_slug": self.slug})
 
     @property
-    def number_of_products(self):
+    def number_of_products(self) -> int:
+        if hasattr(self, 'products_count'):
+            return self.products_count
         return self.products.count()
 
 
+def in_stock_expression() -> RawSQL:
+    """
+    True for products which can be bought now. The same expression is used
+    in the product lists ordering and in its index. The columns are not prefixed
+    with the table name, as SQLite matches the indexed expressions literally,
+    so it mustn't be used in queries joining tables with the same columns.
+    """
+    return RawSQL('("available" AND "quantity" > 0)', [], output_field=BooleanField())
+
+
+class ProductQuerySet(models.QuerySet):
+    def with_stock_status(self) -> 'ProductQuerySet':
+        """
+        Annotates in_stock, so the product lists can display products
+        available in stock first with one ORDER BY.
+        """
+        return self.annotate(in_stock=in_stock_expression())
+
+    def with_display_price(self) -> 'ProductQuerySet':
+        """
+        Annotates display_price, the same price as Product.current_price.
+        Unlike sale_price it is never NULL, so the cursor pagination can filter on it.
+        """
+        return self.annotate(display_price=Case(
+            When(is_on_sale=True, sale_price__isnull=False, then=F('sale_price')),
+            default=F('price'),
+        ))
+
+    def new(self, number_of_days: int | None = None) -> 'ProductQuerySet':
+        """
+        Filters products added in the last number_of_days days
+        (the SHOP_NEW_PRODUCTS_DAYS setting by default).
+        """
+        cutoff = Product.get_new_products_cutoff(number_of_days)
+        return self.filter(created_at__gt=cutoff)
+
+
 class Product(models.Model):
     """Model representing products in the product catalog."""
 
+    # Orderings of the product lists (with_stock_status, with_display_price for sales),
+    # used with the cursor pagination
+    DISPLAY_ORDERING = ['-in_stock', 'name', 'pk']
+    SALE_DISPLAY_ORDERING = ['-in_stock', 'display_price', 'pk']
+
     name = models.CharField(max_length=50, unique=True)
     slug = models.SlugField(max_length=50, unique=True, null=True, blank=True)
     publication = models.OneToOneField(
@@ -105,8 +168,22 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProductQuerySet.as_manager()
+
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(
+                in_stock_expression().desc(), F('name'), F('id'),
+                name='shop_product_display_idx'
+            ),
+            models.Index(fields=['created_at']),
+            # Indexes of the product list filters
+            models.Index(
+                fields=['category', 'brand', 'available', 'is_on_sale', 'price']
+            ),
+            models.Index(fields=['brand', 'available', 'is_on_sale', 'price']),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -122,6 +199,13 @@ class Product(models.Model):
     def get_absolute_url(self) -> str:
         return reverse("shop:product_detail", kwargs={"product_slug": self.slug})
 
+    @property
+    def current_price(self) -> Decimal:
+        """The price the product is sold at now, the sale price when it is on sale."""
+        if self.is_on_sale and self.sale_price is not None:
+            return self.sale_price
+        return self.price
+
     def get_related_products_by_category(self) -> QuerySet:
         if self.category:
             return Product.objects.filter(category=self.category).exclude(id=self.id)
@@ -130,11 +214,19 @@ class Product(models.Model):
     def get_related_products_by_brand(self) -> QuerySet:
         return Product.objects.filter(brand=self.brand).exclude(id=self.id)
 
-    def is_new(self, number_of_days: int = 30) -> bool:
+    @classmethod
+    def get_new_products_cutoff(cls, number_of_days: int | None = None) -> datetime:
+        """
+        Returns the creation date after which products are new.
+        Only full days are counted, so a product stays new
+        until the end of its last day.
+        """
+        if number_of_days is None:
+            number_of_days = settings.SHOP_NEW_PRODUCTS_DAYS
+        return timezone.now() - timedelta(days=number_of_days + 1)
+
+    def is_new(self, number_of_days: int | None = None) -> bool:
         """
         Check if product is new according to the passing number_of_days value.
         """
-        current_date = timezone.now()
-        created_date = self.created_at
-        time_difference = current_date - created_date
-        return time_difference.days <= number_of_days
+        return self.created_at > self.get_new_products_cutoff(number_of_days)
@@ -0,0 +1,193 @@
+import hashlib
+import logging
+from io import BytesIO
+from pathlib import PurePosixPath
+from typing import Any
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
+from django.db.models.fields.files import FieldFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+RENDITIONS_DIR = 'renditions'
+
+# Rendition widths (for 1x screens) and the sizes attribute of the images
+RENDITIONS: dict[str, dict[str, Any]] = {
+    'card': {
+        'width': 400,
+        'sizes': '(min-width: 1200px) 300px, (min-width: 768px) 33vw, 50vw',
+    },
+    'detail': {'width': 800, 'sizes': '(min-width: 768px) 50vw, 100vw'},
+    'logo': {'width': 120, 'sizes': '120px'},
+}
+PIXEL_DENSITIES = (1, 2)
+
+# Seconds for which the renditions not found in the storage are cached
+MISSING_RENDITIONS_CACHE_TIMEOUT = 5 * 60
+
+# Renditions generated for the images of each model
+PRODUCT_IMAGE_RENDITIONS = ['card', 'detail']
+BRAND_LOGO_RENDITIONS = ['logo']
+
+# Pillow format name and the saving options of each rendition file extension
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+# Rendition urls grouped by the file extension, e.g. {'webp': [(url, width), ...]}
+Renditions = dict[str, list[tuple[str, int]]]
+
+
+def get_source_version(storage: Storage, name: str) -> str:
+    """
+    Returns the short hash of the source image name and size. It is a part
+    of the renditions names and cache keys, so replacing the source
+    busts the cached renditions.
+    """
+    source = f'{name}:{storage.size(name)}'
+    return hashlib.md5(source.encode(), usedforsecurity=False).hexdigest()[:8]
+
+
+def get_rendition_name(name: str, version: str, width: int, extension: str) -> str:
+    source = PurePosixPath(name)
+    return str(
+        PurePosixPath(RENDITIONS_DIR, source.parent)
+        / f'{source.stem}-{version}-{width}w.{extension}'
+    )
+
+
+def get_rendition_widths(rendition: str, source_width: int) -> list[int]:
+    """
+    Returns the widths of the rendition for all the pixel densities.
+    Images are never upscaled, so too large widths are replaced by the source width.
+    """
+    base_width = RENDITIONS[rendition]['width']
+    return sorted(
+        {min(base_width * density, source_width) for density in PIXEL_DENSITIES}
+    )
+
+
+def _get_cache_key(name: str, version: str, rendition: str) -> str:
+    name_hash = hashlib.md5(name.encode(), usedforsecurity=False).hexdigest()
+    return f'shop:renditions:{name_hash}:{version}:{rendition}'
+
+
+def _render(source: Image.Image, width: int, extension: str) -> bytes:
+    image = source.copy()
+    image.thumbnail((width, width * 10), Image.LANCZOS)
+    pillow_format, options = FORMATS[extension]
+    if pillow_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    output = BytesIO()
+    image.save(output, pillow_format, **options)
+    return output.getvalue()
+
+
+def _find_renditions(
+    image: FieldFile, name: str, version: str, rendition: str
+) -> Renditions:
+    """
+    Returns the urls of the rendition files already in the storage, e.g. generated
+    by another process, or an empty dict if some of them are missing.
+    The names are deterministic, so only the source width is read from its header.
+    """
+    storage = image.storage
+    try:
+        with image.open('rb') as source_file:
+            with Image.open(source_file) as source:
+                widths = get_rendition_widths(rendition, source.width)
+    except (OSError, ValueError):
+        return {}
+    renditions: Renditions = {}
+    for extension in FORMATS:
+        names = [
+            get_rendition_name(name, version, width, extension) for width in widths
+        ]
+        if not all(storage.exists(rendition_name) for rendition_name in names):
+            return {}
+        renditions[extension] = [
+            (storage.url(rendition_name), width)
+            for rendition_name, width in zip(names, widths)
+        ]
+    return renditions
+
+
+def get_renditions(image: FieldFile, rendition: str) -> Renditions | None:
+    """
+    Returns the urls of the generated rendition files in all the formats,
+    or None if the renditions of the current source haven't been generated,
+    so the templates fall back to the original file. Nothing is generated here.
+
+    Each call reads the source size, which is a part of the cache key.
+    On a cache miss the rendition files are looked up in the storage
+    and the result is cached, the missing renditions only for a short time,
+    so the ones generated later by another process are found.
+    """
+    if not image.name:
+        return None
+    try:
+        version = get_source_version(image.storage, image.name)
+    except OSError:
+        return None
+    key = _get_cache_key(image.name, version, rendition)
+    renditions = cache.get(key)
+    if renditions is None:
+        renditions = _find_renditions(image, image.name, version, rendition)
+        timeout = None if renditions else MISSING_RENDITIONS_CACHE_TIMEOUT
+        cache.set(key, renditions, timeout=timeout)
+    return renditions or None
+
+
+def _build_renditions(
+    image: FieldFile, name: str, version: str, rendition: str
+) -> Renditions:
+    storage = image.storage
+    renditions: Renditions = {}
+    try:
+        with image.open('rb') as source_file:
+            source = Image.open(source_file)
+            widths = get_rendition_widths(rendition, source.width)
+            source = ImageOps.exif_transpose(source)
+            for extension in FORMATS:
+                names = [
+                    get_rendition_name(name, version, width, extension)
+                    for width in widths
+                ]
+                for rendition_name, width in zip(names, widths):
+                    if not storage.exists(rendition_name):
+                        storage.save(
+                            rendition_name,
+                            ContentFile(_render(source, width, extension))
+                        )
+                renditions[extension] = [
+                    (storage.url(rendition_name), width)
+                    for rendition_name, width in zip(names, widths)
+                ]
+    except (OSError, ValueError) as error:
+        logger.warning("Cannot render %s: %s", name, error)
+        return {}
+    return renditions
+
+
+def generate_renditions(image: FieldFile, renditions: list[str]) -> None:
+    """
+    Generates the missing rendition files of the image in all the formats
+    and caches their urls for the templates, e.g. right after the upload.
+    The cache keys contain the source version, so they are cached without expiry.
+    """
+    if not image.name:
+        return
+    try:
+        version = get_source_version(image.storage, image.name)
+    except OSError as error:
+        logger.warning("Cannot render %s: %s", image.name, error)
+        return
+    for rendition in renditions:
+        key = _get_cache_key(image.name, version, rendition)
+        if not cache.get(key):
+            built = _build_renditions(image, image.name, version, rendition)
+            cache.set(key, built, timeout=None)
@@ -1,10 +1,56 @@
-from django.db.models.signals import post_delete
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import Product
+from .catalog import invalidate_catalog, invalidate_product
+from .context_processors import invalidate_shop_navigation
+from .models import Brand, Category, Product
+from .renditions import (BRAND_LOGO_RENDITIONS, PRODUCT_IMAGE_RENDITIONS,
+                         generate_renditions)
 
 
 @receiver(post_delete, sender=Product)
 def delete_publication_with_product(sender, instance, **kwargs):
     if instance.publication:
         instance.publication.delete()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Brand)
+@receiver(post_delete, sender=Brand)
+def invalidate_navigation_cache(sender, instance, **kwargs):
+    invalidate_shop_navigation()
+    transaction.on_commit(invalidate_shop_navigation)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Brand)
+@receiver(post_delete, sender=Brand)
+def invalidate_catalog_cache(sender, instance, **kwargs):
+    invalidate_catalog()
+    transaction.on_commit(invalidate_catalog)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_cached_product(sender, instance, **kwargs):
+    invalidate_product(instance.slug)
+    transaction.on_commit(partial(invalidate_product, instance.slug))
+
+
+@receiver(post_save, sender=Product)
+def generate_product_image_renditions(sender, instance, **kwargs):
+    if instance.image:
+        generate_renditions(instance.image, PRODUCT_IMAGE_RENDITIONS)
+
+
+@receiver(post_save, sender=Brand)
+def generate_brand_logo_renditions(sender, instance, **kwargs):
+    if instance.logo:
+        generate_renditions(instance.logo, BRAND_LOGO_RENDITIONS)
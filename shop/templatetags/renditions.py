@@ -0,0 +1,53 @@
+from django import template
+from django.db.models.fields.files import FieldFile
+from django.utils.html import format_html
+
+from shop.renditions import RENDITIONS, get_renditions
+
+register = template.Library()
+
+
+def _format_srcset(renditions: list[tuple[str, int]]) -> str:
+    return ', '.join(f'{url} {width}w' for url, width in renditions)
+
+
+@register.filter(name='srcset')
+def srcset(image: FieldFile, rendition: str, extension: str = 'webp') -> str:
+    """
+    Returns the srcset attribute value of the image rendition,
+    e.g. {{ product.image|srcset:'card' }}, or an empty string
+    if it hasn't been generated.
+    """
+    renditions = get_renditions(image, rendition)
+    if not renditions or extension not in renditions:
+        return ''
+    return _format_srcset(renditions[extension])
+
+
+@register.simple_tag
+def picture(
+    image: FieldFile, rendition: str,
+    alt: str = '', css_class: str = '', loading: str = 'lazy'
+) -> str:
+    """
+    Renders the <picture> element serving the WebP rendition of the image
+    with the JPEG fallback, or the <img> of the original file if the renditions
+    haven't been generated,
+    e.g. {% picture product.image 'card' alt='Photo' css_class='card-img-top' %}.
+    """
+    renditions = get_renditions(image, rendition)
+    if not renditions:
+        return format_html(
+            '<img class="{}" src="{}" alt="{}" loading="{}" />',
+            css_class, image.url, alt, loading
+        )
+    webp, jpeg = renditions['webp'], renditions['jpg']
+    sizes = RENDITIONS[rendition]['sizes']
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}" />'
+        '<img class="{}" src="{}" srcset="{}" sizes="{}" alt="{}" loading="{}" />'
+        '</picture>',
+        _format_srcset(webp), sizes,
+        css_class, jpeg[0][0], _format_srcset(jpeg), sizes, alt, loading,
+    )
@@ -0,0 +1,19 @@
+import shutil
+import tempfile
+
+from django.test import override_settings
+
+
+class TemporaryMediaRootMixin:
+    """
+    Stores the files uploaded by the tests, and the renditions generated
+    for them, in a temporary MEDIA_ROOT removed after each test.
+    """
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
@@ -1,6 +1,9 @@
 from django.contrib.admin import AdminSite
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from django.utils.html import strip_tags
 
 from shop.admin import BrandAdmin, CategoryAdmin, ProductAdmin
@@ -101,3 +104,50 @@ class ProductAdminInterfaceTests(TestCase):
         )
         category_model_display = self.product_model_admin.category_model(product)
         self.assertEqual(category_model_display, None)
+
+
+class ProductsCountAdminTests(TestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            username='admin', password='password'
+        )
+        self.client.force_login(self.admin_user)
+        self.category = Category.objects.create(name='Bars')
+        self.empty_category = Category.objects.create(name='Drinks')
+        self.brand = Brand.objects.create(name='Brand X')
+        self.empty_brand = Brand.objects.create(name='Brand Y')
+        for number in range(3):
+            Product.objects.create(
+                name=f'Product {number}', price=1,
+                category=self.category, brand=self.brand
+            )
+
+    def test_category_changelist_sorted_by_number_of_products(self):
+        response = self.client.get(
+            reverse('admin:shop_category_changelist'), {'o': '-4'}
+        )
+        self.assertEqual(response.status_code, 200)
+        categories = list(response.context['cl'].result_list)
+        self.assertEqual(categories, [self.category, self.empty_category])
+        self.assertEqual(categories[0].number_of_products, 3)
+
+    def test_brand_changelist_sorted_by_number_of_products(self):
+        response = self.client.get(reverse('admin:shop_brand_changelist'), {'o': '4'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(response.context['cl'].result_list), [self.empty_brand, self.brand]
+        )
+
+    def test_changelist_queries_do_not_depend_on_number_of_rows(self):
+        Category.objects.bulk_create(
+            Category(name=f'Category {number}') for number in range(5)
+        )
+        url = reverse('admin:shop_category_changelist')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        queries_for_five_rows = len(queries)
+        Category.objects.bulk_create(
+            Category(name=f'Other {number}') for number in range(5)
+        )
+        with self.assertNumQueries(queries_for_five_rows):
+            self.client.get(url)
@@ -0,0 +1,126 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from shop.catalog import (get_cached_category, get_cached_page, get_cached_product,
+                          get_catalog_cache_stats, get_catalog_list_value,
+                          get_catalog_value)
+from shop.models import Brand, Category, Product
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Bars')
+        self.brand = Brand.objects.create(name='Brand X')
+        self.product = Product.objects.create(
+            name='Product', price=10, quantity=5,
+            category=self.category, brand=self.brand
+        )
+
+    def test_value_is_built_once(self):
+        calls = []
+        for _ in range(3):
+            value = get_catalog_value('value', lambda: calls.append(1) or 'built')
+        self.assertEqual(value, 'built')
+        self.assertEqual(len(calls), 1)
+
+    def test_miss_reads_the_cache_once(self):
+        with patch.object(cache, 'get', wraps=cache.get) as cache_get:
+            get_catalog_value('value', lambda: 'built')
+        value_reads = [
+            call for call in cache_get.call_args_list if call.args[0].endswith(':value')
+        ]
+        self.assertEqual(len(value_reads), 1)
+
+    def test_hits_and_misses_are_counted(self):
+        for _ in range(3):
+            get_catalog_value('value', lambda: 'built')
+        stats = get_catalog_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+        self.assertAlmostEqual(stats['hit_ratio'], 2 / 3)
+
+    def test_cached_product_is_loaded_with_related_objects(self):
+        get_cached_product(self.product.slug)
+        with self.assertNumQueries(0):
+            product = get_cached_product(self.product.slug)
+            self.assertEqual(product.category, self.category)
+            self.assertEqual(product.brand, self.brand)
+
+    def test_missing_product_is_not_cached(self):
+        self.assertIsNone(get_cached_product('missing'))
+        product = Product.objects.create(name='Missing', price=1)
+        self.assertEqual(get_cached_product('missing'), product)
+
+    def assert_invalidated_by(self, change):
+        get_cached_product(self.product.slug)
+        change()
+        with self.assertNumQueries(1):
+            get_cached_product(self.product.slug)
+
+    def test_product_save_invalidates_product(self):
+        self.assert_invalidated_by(self.product.save)
+
+    def test_product_change_keeps_other_products_cached(self):
+        other_product = Product.objects.create(name='Other', price=1)
+        get_cached_product(self.product.slug)
+        get_cached_category(self.category.slug)
+        other_product.save()
+        other_product.delete()
+        with self.assertNumQueries(0):
+            get_cached_product(self.product.slug)
+            get_cached_category(self.category.slug)
+
+    def test_product_delete_invalidates_product_lists(self):
+        other_product = Product.objects.create(name='Other', price=1)
+        calls = []
+        get_catalog_list_value('products', lambda: calls.append(1) or 'built')
+        other_product.delete()
+        get_catalog_list_value('products', lambda: calls.append(1) or 'built')
+        self.assertEqual(len(calls), 2)
+
+    def test_category_save_invalidates_catalog(self):
+        self.assert_invalidated_by(self.category.save)
+
+    def test_brand_delete_invalidates_catalog(self):
+        self.assert_invalidated_by(self.brand.delete)
+
+    def test_cached_page_keeps_cursors(self):
+        for number in range(12):
+            Product.objects.create(name=f'Product {number:02}', price=1, quantity=5)
+        request = RequestFactory().get('/')
+        products = Product.objects.with_stock_status()
+        page = get_cached_page(request, 'test', products, 12, Product.DISPLAY_ORDERING)
+        with self.assertNumQueries(0):
+            cached_page = get_cached_page(
+                request, 'test', products, 12, Product.DISPLAY_ORDERING
+            )
+            self.assertEqual(list(cached_page), list(page))
+            self.assertEqual(cached_page.next_cursor, page.next_cursor)
+
+    def test_product_pages_are_served_from_cache(self):
+        urls = [
+            reverse('shop:product_list'),
+            reverse('shop:category_list'),
+            reverse('shop:brand_list'),
+            reverse('shop:category_product_list', args=[self.category.slug]),
+            reverse('shop:brand_product_list', args=[self.brand.slug]),
+        ]
+        for url in urls:
+            self.client.get(url)
+            with self.assertNumQueries(0):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+    def test_stats_command(self):
+        get_catalog_value('value', lambda: 'built')
+        get_catalog_value('value', lambda: 'built')
+        out = StringIO()
+        call_command('catalog_cache_stats', '--reset', stdout=out)
+        self.assertIn('Hits: 1', out.getvalue())
+        self.assertIn('Hit ratio: 50.0%', out.getvalue())
+        self.assertEqual(get_catalog_cache_stats()['hits'], 0)
@@ -0,0 +1,41 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from model_bakery import baker
+
+from shop.context_processors import get_shop_navigation
+from shop.models import Brand, Category, Product
+
+
+class ShopNavigationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.categories = [
+            Category.objects.create(name=f'category {i}') for i in range(8)
+        ]
+        for number, category in enumerate(self.categories[1:], start=1):
+            baker.make(Product, category=category, _quantity=number)
+        self.brand = Brand.objects.create(name='Test Brand')
+
+    def test_navigation_contains_six_main_categories(self):
+        main_categories = get_shop_navigation()['main_categories_shop']
+        self.assertEqual(main_categories, self.categories[2:])
+
+    def test_navigation_contains_brands(self):
+        self.assertIn(self.brand, get_shop_navigation()['product_brands'])
+
+    def test_navigation_is_built_with_two_queries(self):
+        with self.assertNumQueries(2):
+            get_shop_navigation()
+
+    def test_navigation_invalidated_on_brand_change(self):
+        get_shop_navigation()
+        new_brand = Brand.objects.create(name='New Brand')
+        self.assertIn(new_brand, get_shop_navigation()['product_brands'])
+
+    def test_shop_pages_receive_only_shop_navigation(self):
+        response = self.client.get(reverse('shop:product_list'))
+        self.assertIn('main_categories_shop', response.context)
+        self.assertIn('product_brands', response.context)
+        self.assertNotIn('navbar_tags', response.context)
+        self.assertNotIn('main_categories_blog', response.context)
@@ -0,0 +1,76 @@
+from django.db.models import Q
+from django.test import TestCase
+
+from shop.forms import ProductFilterForm, get_product_facets
+from shop.models import Brand, Category, Product
+
+
+class ProductFilterFormTests(TestCase):
+    def test_conditions_of_valid_filters(self):
+        form = ProductFilterForm(
+            {'category': ['bars'], 'max_price': '10', 'on_sale': 'on'}
+        )
+        conditions = form.get_conditions()
+        self.assertEqual(set(conditions), {'category', 'price', 'on_sale'})
+        self.assertEqual(conditions['price'], Q(price__lte=10))
+
+    def test_invalid_filters_are_ignored(self):
+        form = ProductFilterForm(
+            {'category': ['not a slug'], 'min_price': '-5', 'brand': ['x']}
+        )
+        self.assertEqual(set(form.get_conditions()), {'brand'})
+
+    def test_no_filters(self):
+        self.assertEqual(ProductFilterForm({}).get_conditions(), {})
+
+
+class ProductFacetsTests(TestCase):
+    def setUp(self):
+        self.bars = Category.objects.create(name='Bars')
+        self.drinks = Category.objects.create(name='Drinks')
+        self.brand_x = Brand.objects.create(name='Brand X')
+        self.brand_y = Brand.objects.create(name='Brand Y')
+        Product.objects.create(
+            name='Bar X', price=10, quantity=5, category=self.bars, brand=self.brand_x
+        )
+        Product.objects.create(
+            name='Bar Y', price=20, quantity=0, category=self.bars, brand=self.brand_y,
+            is_on_sale=True, sale_price=15
+        )
+        Product.objects.create(
+            name='Drink X', price=30, quantity=5,
+            category=self.drinks, brand=self.brand_x
+        )
+        Product.objects.create(name='Other', price=40, quantity=5)
+
+    def get_facets(self, filters):
+        conditions = ProductFilterForm(filters).get_conditions()
+        return get_product_facets(Product.objects.all(), conditions)
+
+    def test_facet_counts_without_filters(self):
+        facets = self.get_facets({})
+        self.assertEqual(
+            facets['categories'],
+            [
+                {'slug': 'bars', 'name': 'Bars', 'count': 2},
+                {'slug': 'drinks', 'name': 'Drinks', 'count': 1},
+            ]
+        )
+        self.assertEqual([brand['count'] for brand in facets['brands']], [2, 1])
+        self.assertEqual(facets['price'], {'min': 10, 'max': 40})
+        self.assertEqual(facets['on_sale'], 1)
+        self.assertEqual(facets['in_stock'], 3)
+
+    def test_facet_counts_ignore_own_group_filter(self):
+        facets = self.get_facets({'category': ['bars'], 'brand': ['brand-x']})
+        # Categories counted with the brand filter only
+        self.assertEqual(
+            [category['count'] for category in facets['categories']], [1, 1]
+        )
+        # Brands counted with the category filter only
+        self.assertEqual([brand['count'] for brand in facets['brands']], [1, 1])
+        self.assertEqual(facets['in_stock'], 1)
+
+    def test_each_facet_group_uses_one_query(self):
+        with self.assertNumQueries(5):
+            self.get_facets({'category': ['bars'], 'min_price': '5', 'in_stock': 'on'})
@@ -0,0 +1,180 @@
+import json
+import shutil
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from comments.models import Publication
+from shop.catalog import get_cached_product
+from shop.importing import ProductImporter, chunked, read_rows
+from shop.models import Brand, Category, Product
+
+CSV_HEADER = 'name,slug,price,quantity,category,brand,available,is_on_sale,sale_price\n'
+
+
+class ReadRowsTests(TestCase):
+    def test_csv_rows(self):
+        file = StringIO(CSV_HEADER + 'Bar,,9.99,3,bars,,1,0,\n')
+        rows = list(read_rows(file, 'csv'))
+        self.assertEqual(rows[0]['name'], 'Bar')
+        self.assertEqual(rows[0]['price'], '9.99')
+
+    def test_json_lines_rows(self):
+        file = StringIO(
+            '{"name": "Bar", "price": 9.99}\n\n{"name": "Shake", "price": 5}\n'
+        )
+        self.assertEqual(
+            [row['name'] for row in read_rows(file, 'jsonl')], ['Bar', 'Shake']
+        )
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            list(read_rows(StringIO(''), 'xml'))
+
+    def test_chunked(self):
+        self.assertEqual(list(chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+
+
+class ProductImporterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Bars')
+        self.brand = Brand.objects.create(name='Brand X')
+
+    def make_rows(self, count, **fields):
+        return [
+            {'name': f'Product {number}', 'price': '10.00', 'quantity': '5', **fields}
+            for number in range(count)
+        ]
+
+    def test_products_are_created_with_publications(self):
+        importer = ProductImporter()
+        importer.import_rows(self.make_rows(3, category='bars', brand='brand-x'))
+
+        self.assertEqual(importer.created, 3)
+        products = Product.objects.order_by('name')
+        self.assertEqual(products.count(), 3)
+        self.assertEqual(Publication.objects.filter(product__isnull=False).count(), 3)
+        product = products.first()
+        self.assertEqual(product.slug, 'product-0')
+        self.assertEqual(product.category, self.category)
+        self.assertEqual(product.brand, self.brand)
+        self.assertTrue(product.available)
+        self.assertIsNotNone(product.created_at)
+
+    def test_existing_products_are_updated_by_slug(self):
+        product = Product.objects.create(name='Product 0', price=1, quantity=1)
+        publication_id = product.publication_id
+        importer = ProductImporter()
+        importer.import_rows(self.make_rows(2, is_on_sale='true', sale_price='8.00'))
+
+        self.assertEqual((importer.created, importer.updated), (1, 1))
+        product.refresh_from_db()
+        self.assertEqual(product.price, Decimal('10.00'))
+        self.assertEqual(product.quantity, 5)
+        self.assertTrue(product.is_on_sale)
+        self.assertEqual(product.publication_id, publication_id)
+        self.assertEqual(Publication.objects.count(), 2)
+
+    def test_queries_per_batch_are_constant(self):
+        importer = ProductImporter(batch_size=50)
+        # Per batch: the existing products, the publications
+        # and the products in a savepoint
+        with self.assertNumQueries(2 * 5):
+            importer.import_rows(self.make_rows(100, category='bars'))
+        self.assertEqual(Product.objects.count(), 100)
+
+    def test_invalid_rows_are_skipped(self):
+        rows = self.make_rows(1) + [
+            {'name': 'No price'},
+            {'name': 'Unknown', 'price': '1', 'category': 'missing'},
+            {'name': 'Negative', 'price': '1', 'quantity': '-1'},
+        ]
+        importer = ProductImporter()
+        importer.import_rows(rows)
+
+        self.assertEqual(importer.created, 1)
+        self.assertEqual(len(importer.errors), 3)
+        self.assertIn("Row 3: unknown category 'missing'.", importer.errors)
+        self.assertTrue(importer.errors[0].startswith('Row 2: price'))
+
+    def test_names_used_by_other_products_are_skipped(self):
+        Product.objects.create(name='Oat Bar', slug='custom-oat', price=1, quantity=1)
+        importer = ProductImporter()
+        importer.import_rows([{'name': 'Oat Bar', 'price': '2.00'}])
+
+        self.assertEqual(importer.imported, 0)
+        self.assertEqual(
+            importer.errors,
+            ["Row 1: the name 'Oat Bar' is already used by the product 'custom-oat'."]
+        )
+        self.assertEqual(Product.objects.get().slug, 'custom-oat')
+
+    def test_names_repeated_in_batch_are_skipped(self):
+        rows = [
+            {'name': 'Oat Bar', 'price': '2.00'},
+            {'name': 'Oat Bar', 'slug': 'oat-bar-2', 'price': '3.00'},
+        ]
+        importer = ProductImporter()
+        importer.import_rows(rows)
+
+        self.assertEqual(importer.created, 1)
+        self.assertEqual(
+            importer.errors,
+            ["Row 2: the name 'Oat Bar' is already used by the product 'oat-bar'."]
+        )
+        self.assertEqual(Product.objects.get().price, Decimal('2.00'))
+
+    def test_catalog_is_invalidated(self):
+        product = Product.objects.create(name='Product 0', price=1, quantity=1)
+        get_cached_product(product.slug)
+        ProductImporter().import_rows(self.make_rows(1))
+        self.assertEqual(get_cached_product(product.slug).price, Decimal('10.00'))
+
+
+class ImportProductsCommandTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Category.objects.create(name='Bars')
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def test_import_csv(self):
+        path = self.directory / 'products.csv'
+        path.write_text(
+            CSV_HEADER + 'Bar,,9.99,3,bars,,true,false,\nShake,,5,,,,0,,\n',
+            encoding='utf-8'
+        )
+        out = StringIO()
+        call_command('import_products', str(path), stdout=out)
+
+        self.assertIn(
+            'Imported 2 products (2 created, 0 updated, 0 skipped)', out.getvalue()
+        )
+        self.assertIn('rows/s', out.getvalue())
+        self.assertFalse(Product.objects.get(name='Shake').available)
+
+    def test_import_json_lines(self):
+        path = self.directory / 'products.jsonl'
+        path.write_text(
+            '\n'.join(
+                json.dumps({'name': name, 'price': 5}) for name in ['Bar', 'Shake']
+            ),
+            encoding='utf-8'
+        )
+        out, err = StringIO(), StringIO()
+        call_command(
+            'import_products', str(path), '--batch-size', '1', stdout=out, stderr=err
+        )
+        self.assertEqual(Product.objects.count(), 2)
+
+    def test_unknown_format(self):
+        path = self.directory / 'products.xml'
+        path.write_text('', encoding='utf-8')
+        with self.assertRaises(CommandError):
+            call_command('import_products', str(path))
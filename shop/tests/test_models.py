@@ -1,10 +1,11 @@
 from datetime import timedelta
 
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from shop.models import Brand, Category, Product
+from shop.tests.mixins import TemporaryMediaRootMixin
 
 
 class CategoryModelTests(TestCase):
@@ -58,8 +59,9 @@ class BrandModelTests(TestCase):
         self.assertEqual(self.brand.number_of_products, expected_number_of_products)
 
 
-class ProductModelTests(TestCase):
+class ProductModelTests(TemporaryMediaRootMixin, TestCase):
     def setUp(self):
+        super().setUp()
         with open('shop/tests/files/test_image.jpg', 'rb') as f:
             content = f.read(0
                              )
@@ -155,3 +157,75 @@ class ProductModelTests(TestCase):
         self.product.created_at = timezone.now() - timedelta(days=40)
         self.product.save()
         self.assertFalse(self.product.is_new())
+
+
+class ProductStockStatusTests(TestCase):
+    def setUp(self):
+        self.sold_out = Product.objects.create(name='A sold out', price=1, quantity=0)
+        self.unavailable = Product.objects.create(
+            name='B unavailable', price=1, quantity=5, available=False
+        )
+        self.in_stock = Product.objects.create(name='C in stock', price=1, quantity=5)
+
+    def test_in_stock_annotation(self):
+        products = Product.objects.with_stock_status().in_bulk()
+        self.assertFalse(products[self.sold_out.pk].in_stock)
+        self.assertFalse(products[self.unavailable.pk].in_stock)
+        self.assertTrue(products[self.in_stock.pk].in_stock)
+
+    def test_display_ordering_puts_products_in_stock_first(self):
+        with self.assertNumQueries(1):
+            products = list(
+                Product.objects.with_stock_status().order_by(*Product.DISPLAY_ORDERING)
+            )
+        self.assertEqual(products, [self.in_stock, self.sold_out, self.unavailable])
+
+
+class NewProductsTests(TestCase):
+    def setUp(self):
+        self.new_product = Product.objects.create(name='New', price=1)
+        self.old_product = Product.objects.create(name='Old', price=1)
+        self.old_product.created_at = timezone.now() - timedelta(days=40)
+        self.old_product.save()
+
+    def test_new_filters_products_in_sql(self):
+        self.assertQuerySetEqual(Product.objects.new(), [self.new_product])
+
+    def test_new_with_custom_number_of_days(self):
+        self.assertQuerySetEqual(
+            Product.objects.new(number_of_days=50), [self.new_product, self.old_product]
+        )
+
+    @override_settings(SHOP_NEW_PRODUCTS_DAYS=45)
+    def test_new_products_days_setting(self):
+        self.assertEqual(Product.objects.new().count(), 2)
+        self.assertTrue(self.old_product.is_new())
+
+    def test_new_agrees_with_is_new_at_the_window_end(self):
+        for days, hours in [(30, 23), (31, 1)]:
+            created_at = timezone.now() - timedelta(days=days, hours=hours)
+            self.old_product.created_at = created_at
+            self.old_product.save()
+            self.assertEqual(
+                Product.objects.new().filter(pk=self.old_product.pk).exists(),
+                self.old_product.is_new()
+            )
+
+
+class ProductsCountTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='Bars')
+        self.brand = Brand.objects.create(name='Brand X')
+        Product.objects.create(
+            name='Product', price=1, category=self.category, brand=self.brand
+        )
+
+    def test_number_of_products_uses_annotation(self):
+        category = Category.objects.with_products_count().get()
+        brand = Brand.objects.with_products_count().get()
+        with self.assertNumQueries(0):
+            self.assertEqual(category.number_of_products, 1)
+            self.assertEqual(brand.number_of_products, 1)
+
+    def test_number_of_products_without_annotation(self):
+        self.assertEqual(Category.objects.get().number_of_products, 1)
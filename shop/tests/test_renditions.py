@@ -0,0 +1,155 @@
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase
+from PIL import Image
+
+from shop.models import Brand, Product
+from shop.renditions import generate_renditions, get_rendition_widths, get_renditions
+from shop.tests.mixins import TemporaryMediaRootMixin
+
+
+def make_image(
+    width: int = 1000, height: int = 600, image_format: str = 'JPEG'
+) -> bytes:
+    output = BytesIO()
+    Image.new('RGB', (width, height), 'orange').save(output, image_format)
+    return output.getvalue()
+
+
+class RenditionsTests(TemporaryMediaRootMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def create_product(self, content: bytes, name: str = 'photo.jpg') -> Product:
+        return Product.objects.create(
+            name='Product', price=10, quantity=5,
+            image=SimpleUploadedFile(name, content, content_type='image/jpeg')
+        )
+
+    def test_rendition_widths_are_not_upscaled(self):
+        self.assertEqual(get_rendition_widths('card', 1000), [400, 800])
+        self.assertEqual(get_rendition_widths('card', 600), [400, 600])
+        self.assertEqual(get_rendition_widths('card', 300), [300])
+
+    def test_renditions_are_generated_on_upload(self):
+        product = self.create_product(make_image())
+        storage = product.image.storage
+        for extension, pillow_format in [('webp', 'WEBP'), ('jpg', 'JPEG')]:
+            renditions = get_renditions(product.image, 'card')[extension]
+            self.assertEqual([width for _, width in renditions], [400, 800])
+            for url, width in renditions:
+                name = url.removeprefix(storage.base_url)
+                with Image.open(storage.open(name)) as image:
+                    self.assertEqual(image.format, pillow_format)
+                    self.assertEqual(image.width, width)
+
+    def test_existing_renditions_are_reused(self):
+        product = self.create_product(make_image())
+        renditions = get_renditions(product.image, 'card')
+        cache.clear()
+        with patch('shop.renditions._render') as render:
+            generate_renditions(product.image, ['card'])
+        render.assert_not_called()
+        self.assertEqual(get_renditions(product.image, 'card'), renditions)
+
+    def test_renditions_are_found_in_storage_on_cache_miss(self):
+        product = self.create_product(make_image())
+        renditions = get_renditions(product.image, 'card')
+        # e.g. a restarted process or renditions generated by another process
+        cache.clear()
+        with patch('shop.renditions._render') as render:
+            html = Template(
+                "{% load renditions %}{% picture product.image 'card' %}"
+            ).render(Context({'product': product}))
+        render.assert_not_called()
+        self.assertIn(renditions['webp'][0][0], html)
+        with patch('shop.renditions._find_renditions') as find:
+            self.assertEqual(get_renditions(product.image, 'card'), renditions)
+        find.assert_not_called()
+
+    def test_missing_renditions_are_not_generated_on_render(self):
+        product = self.create_product(make_image())
+        storage = product.image.storage
+        for url, _ in get_renditions(product.image, 'card')['jpg']:
+            storage.delete(url.removeprefix(storage.base_url))
+        cache.clear()
+        with patch('shop.renditions._render') as render:
+            html = Template(
+                "{% load renditions %}{% picture product.image 'card' %}"
+            ).render(Context({'product': product}))
+        render.assert_not_called()
+        self.assertIn(f'src="{product.image.url}"', html)
+        self.assertNotIn('<picture>', html)
+
+    def test_renditions_urls_change_with_the_source(self):
+        product = self.create_product(make_image())
+        renditions = get_renditions(product.image, 'card')
+        product.image.save('photo.jpg', ContentFile(make_image(1200, 800)))
+        self.assertNotEqual(get_renditions(product.image, 'card'), renditions)
+
+    def test_invalid_image_has_no_renditions(self):
+        product = Product.objects.create(name='Product', price=10, quantity=5)
+        product.image.save('broken.jpg', ContentFile(b'not an image'), save=False)
+        with self.assertLogs('shop.renditions', 'WARNING'):
+            generate_renditions(product.image, ['card'])
+        self.assertIsNone(get_renditions(product.image, 'card'))
+
+    def test_brand_logo_renditions_are_generated_on_upload(self):
+        brand = Brand.objects.create(
+            name='Brand',
+            logo=SimpleUploadedFile('logo.png', make_image(300, 100, 'PNG'))
+        )
+        renditions = get_renditions(brand.logo, 'logo')['webp']
+        self.assertEqual([width for _, width in renditions], [120, 240])
+
+    def test_picture_tag_renders_webp_source_and_jpeg_fallback(self):
+        product = self.create_product(make_image())
+        html = Template(
+            "{% load renditions %}"
+            "{% picture product.image 'card' alt='Photo' css_class='card-img-top' %}"
+        ).render(Context({'product': product}))
+        self.assertIn('<source type="image/webp" srcset="', html)
+        self.assertIn('-800w.webp 800w', html)
+        self.assertIn('-400w.jpg 400w', html)
+        self.assertIn('class="card-img-top"', html)
+        self.assertNotIn(product.image.url, html)
+
+    def test_picture_tag_falls_back_to_original_image(self):
+        product = Product.objects.create(name='Product', price=10, quantity=5)
+        product.image.save('broken.jpg', ContentFile(b'not an image'), save=False)
+        with self.assertLogs('shop.renditions', 'WARNING'):
+            generate_renditions(product.image, ['card'])
+        html = Template(
+            "{% load renditions %}{% picture product.image 'card' alt='Photo' %}"
+        ).render(Context({'product': product}))
+        self.assertIn(f'src="{product.image.url}"', html)
+        self.assertNotIn('<picture>', html)
+
+    def test_srcset_filter(self):
+        product = self.create_product(make_image())
+        srcset = Template(
+            "{% load renditions %}{{ product.image|srcset:'detail' }}"
+        ).render(Context({'product': product}))
+        self.assertRegex(srcset, r'^\S+-800w\.webp 800w, \S+-1000w\.webp 1000w$')
+
+    def test_generate_renditions_command(self):
+        product = self.create_product(make_image())
+        Brand.objects.create(name='Brand without logo')
+        cache.clear()
+        out = StringIO()
+        call_command('generate_renditions', stdout=out)
+        self.assertIn(
+            'Generated the renditions of 1 product images and 0 brand logos.',
+            out.getvalue()
+        )
+        self.assertEqual(
+            [width for _, width in get_renditions(product.image, 'detail')['jpg']],
+            [800, 1000]
+        )
@@ -1,11 +1,13 @@
+from django.core.cache import cache
 from django.test import TestCase
 
 from shop.models import Brand, Category, Product
-from shop.utils import get_related_products
+from shop.utils import get_related_products, select_related_products
 
 
 class GetRelatedProductsTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.category = Category.objects.create(name='Test Category')
         self.brand_x = Brand.objects.create(name='Brand X')
         self.brand_y = Brand.objects.create(name='Brand Y')
@@ -39,3 +41,67 @@ class GetRelatedProductsTests(TestCase):
     def test_get_related_products_returns_empty_list_for_no_related_products(self):
         related_products = get_related_products(product=self.product4, num_products=4)
         self.assertEqual(len(related_products), 0)
+
+
+class SelectRelatedProductsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Bars')
+        self.other_category = Category.objects.create(name='Drinks')
+        self.brand = Brand.objects.create(name='Brand X')
+        self.other_brand = Brand.objects.create(name='Brand Y')
+        self.product = Product.objects.create(
+            name='Product', price=1, category=self.category, brand=self.brand
+        )
+        self.best_matches = [
+            Product.objects.create(
+                name=f'Best match {number}', price=1,
+                category=self.category, brand=self.brand
+            )
+            for number in range(2)
+        ]
+        for number in range(10):
+            Product.objects.create(
+                name=f'Same category {number}', price=1,
+                category=self.category, brand=self.other_brand
+            )
+            Product.objects.create(
+                name=f'Same brand {number}', price=1,
+                category=self.other_category, brand=self.brand
+            )
+        Product.objects.create(
+            name='Unrelated', price=1,
+            category=self.other_category, brand=self.other_brand
+        )
+
+    def test_products_with_same_category_and_brand_come_first(self):
+        related_products = select_related_products(self.product, 4, seed='seed')
+        self.assertCountEqual(related_products[:2], self.best_matches)
+        self.assertEqual(len(related_products), 4)
+        self.assertNotIn(self.product, related_products)
+
+    def test_selection_is_deterministic_for_seed(self):
+        self.assertEqual(
+            select_related_products(self.product, 4, seed='seed'),
+            select_related_products(self.product, 4, seed='seed')
+        )
+
+    def test_selection_changes_with_seed(self):
+        selections = {
+            tuple(select_related_products(self.product, 6, seed=str(seed))[2:])
+            for seed in range(5)
+        }
+        self.assertGreater(len(selections), 1)
+
+    def test_unrelated_products_are_not_selected(self):
+        related_products = select_related_products(self.product, 30, seed='seed')
+        self.assertEqual(len(related_products), 22)
+
+    def test_selection_uses_one_query(self):
+        with self.assertNumQueries(1):
+            select_related_products(self.product, 4, seed='seed')
+
+    def test_related_products_are_cached_in_time_window(self):
+        related_products = get_related_products(self.product, 4)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_related_products(self.product, 4), related_products)
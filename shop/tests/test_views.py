@@ -1,17 +1,29 @@
 from datetime import timedelta
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
 from comments.models import Comment
 from shop.models import Brand, Category, Product
+from shop.tests.mixins import TemporaryMediaRootMixin
 
 User = get_user_model()
 
 
+class DisableCatalogCacheMixin:
+    def disable_catalog_cache(self):
+        """Cached values expire at once, so the queries of the pages are counted."""
+        patcher = patch('shop.catalog.CATALOG_CACHE_TIMEOUT', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
 class ShopRedirectTest(TestCase):
     def test_shop_redirect_to_product_list(self):
         response = self.client.get(reverse('shop:shop_redirect'))
@@ -29,8 +41,9 @@ class ProductListTest(TestCase):
         self.assertEqual(response.status_code, 200)
 
 
-class CategoryProductListTests(TestCase):
+class CategoryProductListTests(TemporaryMediaRootMixin, TestCase):
     def setUp(self):
+        super().setUp()
         self.category = Category.objects.create(
             name='Test Category'
         )
@@ -165,8 +178,9 @@ class BrandProductListTests(TestCase):
         self.assertIn("brand you were looking for not found", message.message)
 
 
-class ProductDetailTests(TestCase):
+class ProductDetailTests(TemporaryMediaRootMixin, TestCase):
     def setUp(self):
+        super().setUp()
         with open('shop/tests/files/test_image.jpg', 'rb') as f:
             content = f.read(0)
         self.category = Category.objects.create(
@@ -220,6 +234,19 @@ class ProductDetailTests(TestCase):
             "currently unavailable", message.message
         )
 
+    def test_no_message_for_product_held_for_the_cart_in_product_detail(self):
+        self.product.quantity = 2
+        self.product.save()
+        self.client.post(
+            reverse('carts:cart_add'),
+            {'item_type': 'product', 'item_id': self.product.id, 'quantity': 2}
+        )
+        response = self.client.get(
+            reverse('shop:product_detail', args=[self.product.slug])
+        )
+        self.assertEqual(response.context['product'].quantity, 0)
+        self.assertEqual(list(response.context['messages']), [])
+
     def test_not_existing_product_in_product_detail(self):
         not_existing_slug = 'not-existing-slug'
         response = self.client.get(reverse('shop:product_detail', args=[not_existing_slug]))
@@ -379,3 +406,213 @@ class ProductNewListTests(TestCase):
         response = self.client.get(reverse('shop:product_new_list'))
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'shop/filtered_product_list.html')
+
+
+class ProductDetailConditionalGetTests(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(
+            name='Fake Product', price=19.99, quantity=10
+        )
+        self.url = self.product.get_absolute_url()
+
+    def get_etag(self) -> str:
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.headers['ETag']
+
+    def test_unchanged_product_returns_not_modified_with_one_query(self):
+        etag = self.get_etag()
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_stock_change_invalidates_etag(self):
+        etag = self.get_etag()
+        Product.objects.filter(pk=self.product.pk).update(quantity=0)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_active_comment_invalidates_etag(self):
+        etag = self.get_etag()
+        Comment.objects.create(
+            publication=self.product.publication, body='Nice.', active=True
+        )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_product_still_redirects(self):
+        response = self.client.get(reverse('shop:product_detail', args=['missing']))
+        self.assertRedirects(response, reverse('shop:product_list'))
+
+
+class ProductListPaginationTests(DisableCatalogCacheMixin, TestCase):
+    def setUp(self):
+        self.disable_catalog_cache()
+        self.category = Category.objects.create(name='Bars')
+        self.brand = Brand.objects.create(name='Brand')
+        for number in range(15):
+            Product.objects.create(
+                name=f'Product {number:02}',
+                price=10,
+                quantity=0 if number < 3 else 5,
+                category=self.category,
+                brand=self.brand,
+                is_on_sale=True,
+                sale_price=20 - number
+            )
+
+    def get_all_pages(self, url):
+        products, cursor = [], None
+        while True:
+            response = self.client.get(url, {'cursor': cursor} if cursor else {})
+            self.assertEqual(response.status_code, 200)
+            page = response.context['page_obj']
+            self.assertLessEqual(len(page), 12)
+            products.extend(product.name for product in page)
+            if not page.has_next():
+                return products
+            cursor = page.next_cursor
+
+    def test_product_list_is_paginated_with_products_in_stock_first(self):
+        products = self.get_all_pages(reverse('shop:product_list'))
+        expected = [f'Product {number:02}' for number in [*range(3, 15), *range(3)]]
+        self.assertEqual(products, expected)
+
+    def test_category_product_list_is_paginated(self):
+        url = reverse('shop:category_product_list', args=[self.category.slug])
+        self.assertEqual(len(self.get_all_pages(url)), 15)
+
+    def test_brand_product_list_is_paginated(self):
+        url = reverse('shop:brand_product_list', args=[self.brand.slug])
+        self.assertEqual(len(self.get_all_pages(url)), 15)
+
+    def test_on_sale_list_is_ordered_by_sale_price(self):
+        products = self.get_all_pages(reverse('shop:product_on_sale_list'))
+        expected = [
+            f'Product {number:02}' for number in [*range(14, 2, -1), *range(2, -1, -1)]
+        ]
+        self.assertEqual(products, expected)
+
+    def test_on_sale_list_without_sale_price_at_page_boundary(self):
+        # The last product of the first page is ordered by its regular price
+        Product.objects.filter(name='Product 03').update(sale_price=None, price=30)
+        products = self.get_all_pages(reverse('shop:product_on_sale_list'))
+        expected = [
+            f'Product {number:02}' for number in [*range(14, 2, -1), *range(2, -1, -1)]
+        ]
+        self.assertEqual(products, expected)
+
+    def test_product_list_page_is_loaded_with_fixed_number_of_queries(self):
+        self.client.get(reverse('shop:product_list'))  # Warm up the navigation cache
+        # One query for the page and one for each of the five facet groups
+        with self.assertNumQueries(6):
+            self.client.get(reverse('shop:product_list'))
+
+    def test_invalid_cursor_returns_not_found(self):
+        response = self.client.get(reverse('shop:product_list'), {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, 404)
+
+
+class ProductNewListPaginationTests(DisableCatalogCacheMixin, TestCase):
+    def setUp(self):
+        self.disable_catalog_cache()
+        for number in range(14):
+            Product.objects.create(name=f'New {number:02}', price=1, quantity=5)
+        old_product = Product.objects.create(name='Old', price=1, quantity=5)
+        old_product.created_at = timezone.now() - timedelta(days=40)
+        old_product.save()
+
+    def test_new_list_is_paginated(self):
+        response = self.client.get(reverse('shop:product_new_list'))
+        page = response.context['page_obj']
+        self.assertEqual(len(page), 12)
+        response = self.client.get(
+            reverse('shop:product_new_list'), {'cursor': page.next_cursor}
+        )
+        self.assertEqual(len(response.context['page_obj']), 2)
+        self.assertNotContains(response, '>Old<')
+
+    def test_new_list_queries_do_not_depend_on_number_of_products(self):
+        # Warm up the navigation cache
+        self.client.get(reverse('shop:product_new_list'))
+        with self.assertNumQueries(1):
+            self.client.get(reverse('shop:product_new_list'))
+
+
+class ProductListFiltersTests(TestCase):
+    def setUp(self):
+        self.bars = Category.objects.create(name='Bars')
+        self.drinks = Category.objects.create(name='Drinks')
+        self.brand = Brand.objects.create(name='Brand X')
+        Product.objects.create(
+            name='Bar', price=10, quantity=5, category=self.bars, brand=self.brand
+        )
+        Product.objects.create(
+            name='Sale bar', price=20, quantity=5, category=self.bars,
+            is_on_sale=True, sale_price=15
+        )
+        Product.objects.create(name='Drink', price=30, quantity=0, category=self.drinks)
+
+    def get_names(self, response):
+        return [product.name for product in response.context['products']]
+
+    def test_filter_by_category_and_price(self):
+        response = self.client.get(
+            reverse('shop:product_list'), {'category': 'bars', 'min_price': '15'}
+        )
+        self.assertEqual(self.get_names(response), ['Sale bar'])
+
+    def test_filter_by_many_categories(self):
+        response = self.client.get(
+            reverse('shop:product_list'), {'category': ['bars', 'drinks']}
+        )
+        self.assertEqual(len(response.context['products']), 3)
+
+    def test_filter_in_stock_and_on_sale(self):
+        response = self.client.get(reverse('shop:product_list'), {'in_stock': '1'})
+        self.assertEqual(self.get_names(response), ['Bar', 'Sale bar'])
+        response = self.client.get(reverse('shop:product_list'), {'on_sale': '1'})
+        self.assertEqual(self.get_names(response), ['Sale bar'])
+
+    def test_invalid_filters_are_ignored(self):
+        response = self.client.get(
+            reverse('shop:product_list'), {'min_price': 'abc', 'brand': 'brand-x'}
+        )
+        self.assertEqual(self.get_names(response), ['Bar'])
+
+    def test_pagination_links_keep_filters(self):
+        for number in range(12):
+            Product.objects.create(
+                name=f'Bar {number:02}', price=1, quantity=5, category=self.bars
+            )
+        response = self.client.get(reverse('shop:product_list'), {'category': 'bars'})
+        self.assertContains(response, '?category=bars&cursor=')
+
+
+class CategoryAndBrandListQueriesTests(TestCase):
+    def create_rows(self, amount):
+        first_number = Category.objects.count()
+        for number in range(first_number, first_number + amount):
+            category = Category.objects.create(name=f'Category {number}')
+            brand = Brand.objects.create(name=f'Brand {number}')
+            Product.objects.create(
+                name=f'Product {number}', price=1, category=category, brand=brand
+            )
+
+    def assert_constant_queries(self, url):
+        self.create_rows(1)
+        self.client.get(url)  # Warm up the navigation cache
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        queries_for_one_row = len(queries)
+        self.assertContains(response, '>1</span>')
+        self.create_rows(3)
+        self.client.get(url)
+        with self.assertNumQueries(queries_for_one_row):
+            self.client.get(url)
+
+    def test_category_list_queries_do_not_depend_on_number_of_categories(self):
+        self.assert_constant_queries(reverse('shop:category_list'))
+
+    def test_brand_list_queries_do_not_depend_on_number_of_brands(self):
+        self.assert_constant_queries(reverse('shop:brand_list'))
@@ -1,20 +1,66 @@
-from random import sample
+import random
+import time
 
-from django.db.models import Q, QuerySet
+from django.db.models import Case, Expression, F, IntegerField, Q, Value, When
+from django.db.models.functions import Mod
+
+from utils.cache_utils import get_or_build
 
 from .models import Product
 
+RELATED_PRODUCTS_WINDOW = 15 * 60  # seconds
+# The Mersenne prime used to shuffle the related products
+SHUFFLE_MODULUS = 2_147_483_647
+
+
+def select_related_products(
+    product: Product, num_products: int, seed: str
+) -> list[Product]:
+    """
+    Selects products of the same category or brand in one query returning
+    only num_products rows. Products sharing both the category and the brand
+    come first, the others are shuffled in the database with the given seed.
+    """
+    shared_fields = Q()
+    if product.category_id:
+        shared_fields |= Q(category_id=product.category_id)
+    if product.brand_id:
+        shared_fields |= Q(brand_id=product.brand_id)
+    if not shared_fields:
+        return []
+
+    relevance: Expression = Value(0)
+    if product.category_id and product.brand_id:
+        relevance = Case(
+            When(
+                Q(category_id=product.category_id, brand_id=product.brand_id),
+                then=Value(1)
+            ),
+            default=Value(0),
+            output_field=IntegerField()
+        )
+
+    shuffle = random.Random(seed)
+    multiplier = shuffle.randrange(1, SHUFFLE_MODULUS)
+    offset = shuffle.randrange(SHUFFLE_MODULUS)
+
+    return list(
+        Product.objects.filter(shared_fields).exclude(pk=product.pk).annotate(
+            relevance=relevance,
+            shuffle_key=Mod(F('id') * multiplier + offset, SHUFFLE_MODULUS)
+        ).order_by('-relevance', 'shuffle_key', 'pk')[:num_products]
+    )
 
-def get_related_products(product: Product, num_products: int) -> list[Product] | QuerySet[Product]:
-    related_products_by_category = product.get_related_products_by_category()
-    related_products_by_brand = product.get_related_products_by_brand()
-    unique_related_products = (related_products_by_category | related_products_by_brand).distinct()
-    if len(unique_related_products) > num_products:
-        return sample(list(unique_related_products), k=num_products)
-    return unique_related_products
 
-def sort_products_to_display(products: QuerySet[Product]) -> list[Product]:
-    products_available = products.filter(Q(available=True) & ~Q(quantity=0))
-    products_not_available = products.filter(Q(available=False) | Q(quantity=0))
-    sorted_products = list(products_available) + list(products_not_available)
-    return sorted_products
+def get_related_products(product: Product, num_products: int) -> list[Product]:
+    """
+    Returns related products of the product. The selection is cached
+    and stays the same for every page view in the current time window.
+    """
+    window = int(time.time() // RELATED_PRODUCTS_WINDOW)
+    seed = f'{product.pk}:{window}'
+    return get_or_build(
+        f'shop:related_products:{product.pk}:{num_products}:{window}',
+        lambda: select_related_products(product, num_products, seed=seed),
+        timeout=RELATED_PRODUCTS_WINDOW
+    )
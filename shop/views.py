@@ -7,11 +7,19 @@ from django.utils.html import format_html
 from django.views.generic import DetailView
 from django.views.generic.edit import FormMixin
 
+from carts.reservations import find_cart_key, get_held_quantities
 from comments.forms import CommentForm
 from comments.views import CommentSubmissionMixin
+from utils.conditional_utils import ConditionalDetailMixin
+from utils.request_utils import get_query_string_without
 
+from .catalog import (get_cached_brand, get_cached_category, get_cached_page,
+                      get_cached_product, get_catalog_list_value, get_request_query_key)
+from .forms import ProductFilterForm, filter_products, get_product_facets
 from .models import Brand, Category, Product
-from .utils import get_related_products, sort_products_to_display
+from .utils import get_related_products
+
+PRODUCTS_PER_PAGE = 12
 
 
 def shop_redirect(request: HttpRequest) -> HttpResponseRedirect:
@@ -19,18 +27,40 @@ def shop_redirect(request: HttpRequest) -> HttpResponseRedirect:
 
 # Views related to products
 def product_list(request: HttpRequest) -> HttpResponse:
-    products = Product.objects.all()
-    products_sorted = sort_products_to_display(products)
-    return render(request, 'shop/product_list.html', {'products': products_sorted})
+    filter_form = ProductFilterForm(request.GET)
+    conditions = filter_form.get_conditions()
+    products = filter_products(Product.objects.with_stock_status(), conditions)
+    page = get_cached_page(
+        request, 'products', products, PRODUCTS_PER_PAGE, Product.DISPLAY_ORDERING
+    )
+    facets = get_catalog_list_value(
+        f'facets:{get_request_query_key(request)}',
+        lambda: get_product_facets(Product.objects.all(), conditions)
+    )
+    return render(
+        request,
+        'shop/product_list.html',
+        {
+            'products': page,
+            'page_obj': page,
+            'filter_form': filter_form,
+            'facets': facets,
+            'filter_query': get_query_string_without(request, 'cursor'),
+        }
+    )
 
 def product_on_sale_list(request: HttpRequest) -> HttpResponse:
-    products = Product.objects.filter(is_on_sale=True).order_by('sale_price')
-    if products:
-        products_sorted = sort_products_to_display(products)
+    products = Product.objects.filter(
+        is_on_sale=True
+    ).with_stock_status().with_display_price()
+    page = get_cached_page(
+        request, 'on_sale', products, PRODUCTS_PER_PAGE, Product.SALE_DISPLAY_ORDERING
+    )
+    if page or page.has_previous():
         return render(
             request,
             'shop/filtered_product_list.html',
-            {'sale': True, 'products': products_sorted}
+            {'sale': True, 'products': page, 'page_obj': page}
         )
     messages.error(
         request, "Unfortunately, there are no products on sale."
@@ -38,14 +68,15 @@ def product_on_sale_list(request: HttpRequest) -> HttpResponse:
     return redirect('shop:product_list')
 
 def product_new_list(request: HttpRequest) -> HttpResponse:
-    products = Product.objects.all()
-    products_sorted = sort_products_to_display(products)
-    new_products_sorted = [product for product in products_sorted if product.is_new()]
-    if new_products_sorted:
+    products = Product.objects.new().with_stock_status()
+    page = get_cached_page(
+        request, 'new', products, PRODUCTS_PER_PAGE, Product.DISPLAY_ORDERING
+    )
+    if page or page.has_previous():
         return render(
             request,
             'shop/filtered_product_list.html',
-            {'new': True, 'products': new_products_sorted}
+            {'new': True, 'products': page, 'page_obj': page}
         )
     messages.error(
         request, "Unfortunately, there are no new products in store at this moment."
@@ -53,16 +84,26 @@ def product_new_list(request: HttpRequest) -> HttpResponse:
     return redirect('shop:product_list')
 
 
-class ProductDetailView(CommentSubmissionMixin, FormMixin, DetailView):
+class ProductDetailView(
+    ConditionalDetailMixin, CommentSubmissionMixin, FormMixin, DetailView
+):
     form_class = CommentForm
     model = Product
     slug_url_kwarg = 'product_slug'
     template_name = 'shop/product_detail.html'
+    version_fields = [
+        'pk', 'updated_at', 'quantity', 'available',
+        'publication__active_comments_count', 'publication__last_comment_at',
+    ]
 
     def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
         try:
             product = self.get_object()
-            if not product.available or product.quantity == 0:
+            # The last units held for the buyer's cart are still available to them
+            if not product.available or (
+                product.quantity == 0
+                and not get_held_quantities(find_cart_key(request), [product.pk])
+            ):
                 messages.error(
                         self.request,
                         format_html(
@@ -79,6 +120,12 @@ class ProductDetailView(CommentSubmissionMixin, FormMixin, DetailView):
             )
             return redirect('shop:product_list')
 
+    def get_object(self, queryset: Any = None) -> Product:
+        product = get_cached_product(self.kwargs[self.slug_url_kwarg])
+        if product is None:
+            raise Http404("No product found matching the query.")
+        return product
+
     def get_success_url(self) -> str:
         return self.object.get_absolute_url()
 
@@ -103,17 +150,22 @@ class ProductDetailView(CommentSubmissionMixin, FormMixin, DetailView):
 
 # Views related to categories
 def category_list(request: HttpRequest) -> HttpResponse:
-    categories = Category.objects.all()
+    categories = get_catalog_list_value(
+        'categories', lambda: list(Category.objects.with_products_count())
+    )
     return render(request, 'shop/category_list.html', {'categories': categories})
 
 def category_product_list(request: HttpRequest, category_slug: str) -> HttpResponse:
     try:
-        category = Category.objects.get(slug=category_slug)
-        products = category.products.all()
-        products_sorted = sort_products_to_display(products)
+        category = get_cached_category(category_slug)
+        products = category.products.with_stock_status()
+        page = get_cached_page(
+            request, f'category:{category.pk}', products,
+            PRODUCTS_PER_PAGE, Product.DISPLAY_ORDERING
+        )
         return render(
             request, 'shop/filtered_product_list.html',
-            {'category': category, 'products': products_sorted}
+            {'category': category, 'products': page, 'page_obj': page}
         )
 
     except Category.DoesNotExist:
@@ -124,17 +176,21 @@ def category_product_list(request: HttpRequest, category_slug: str) -> HttpRespo
 
 # Views related to brands
 def brand_list(request: HttpRequest) -> HttpResponse:
-    brands = Brand.objects.all()
+    brands = get_catalog_list_value(
+        'brands', lambda: list(Brand.objects.with_products_count())
+    )
     return render(request, 'shop/brand_list.html', {'brands': brands})
 
 def brand_product_list(request: HttpRequest, brand_slug: str) -> HttpResponse:
     try:
-        brand = Brand.objects.get(slug=brand_slug)
-        brand_products = brand.products.all()
-        products_sorted = sort_products_to_display(brand_products)
-        available_products = brand_products.filter(available=True)
+        brand = get_cached_brand(brand_slug)
+        brand_products = brand.products.with_stock_status()
+        page = get_cached_page(
+            request, f'brand:{brand.pk}', brand_products,
+            PRODUCTS_PER_PAGE, Product.DISPLAY_ORDERING
+        )
 
-        if not brand_products:
+        if not page and not page.has_previous():
             messages.error(
                 request,
                 "At this moment, "
@@ -143,7 +199,11 @@ def brand_product_list(request: HttpRequest, brand_slug: str) -> HttpResponse:
             )
             return redirect('shop:product_list')
 
-        if not available_products:
+        has_available_products = get_catalog_list_value(
+            f'brand:{brand.pk}:has_available_products',
+            lambda: brand_products.filter(available=True).exists()
+        )
+        if not has_available_products:
             messages.error(
                 request,
                 "At this moment, "
@@ -154,7 +214,7 @@ def brand_product_list(request: HttpRequest, brand_slug: str) -> HttpResponse:
         return render(
             request,
             'shop/filtered_product_list.html',
-            {'brand': brand, 'products': products_sorted}
+            {'brand': brand, 'products': page, 'page_obj': page}
         )
 
     except Brand.DoesNotExist:
@@ -0,0 +1,72 @@
+import time
+from typing import Any, Callable
+
+from django.core.cache import cache
+
+LOCK_TIMEOUT = 10  # seconds
+LOCK_WAIT_INTERVAL = 0.05  # seconds
+LOCK_WAIT_ATTEMPTS = 40
+
+
+def get_cache_version(namespace: str) -> int:
+    """
+    Returns the current version of the given cache namespace.
+    """
+    version_key = f'{namespace}:version'
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, 1, timeout=None)
+        version = cache.get(version_key, 1)
+    return version
+
+
+def bump_cache_version(namespace: str) -> None:
+    """
+    Invalidates all values cached in the given namespace by bumping its version.
+    Old values are never read again and simply expire.
+    """
+    version_key = f'{namespace}:version'
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, 2, timeout=None)
+
+
+def get_versioned_key(namespace: str, name: str) -> str:
+    return f'{namespace}:{get_cache_version(namespace)}:{name}'
+
+
+def get_or_build(key: str, builder: Callable[[], Any], timeout: int) -> Any:
+    """
+    Returns the cached value for the key or builds and caches it.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+    return build_once(key, builder, timeout)
+
+
+def build_once(key: str, builder: Callable[[], Any], timeout: int) -> Any:
+    """
+    Builds and caches the value missing for the key.
+
+    Only one caller builds a missing value at a time, the others wait
+    for it to appear in the cache instead of recomputing it themselves.
+    """
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, True, timeout=LOCK_TIMEOUT):
+        try:
+            value = builder()
+            cache.set(key, value, timeout=timeout)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    for _ in range(LOCK_WAIT_ATTEMPTS):
+        time.sleep(LOCK_WAIT_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+
+    # The building process took too long, don't keep the request waiting
+    return builder()
@@ -0,0 +1,78 @@
+import hashlib
+from datetime import datetime
+from typing import Any
+
+from django.contrib import messages
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalDetailMixin:
+    """
+    Mixin for detail views answering GET requests with 304 Not Modified
+    when the displayed object hasn't changed since the client's copy.
+
+    The validators are computed from a version stamp loaded with one query
+    of the version_fields, so unchanged pages skip the whole context building.
+    Datetime fields of the stamp give the Last-Modified date, all the fields
+    together with the current user give the ETag.
+    """
+    request: HttpRequest
+    kwargs: dict[str, Any]
+    slug_url_kwarg: str
+    version_fields: list[str] = ['pk', 'updated_at']
+
+    def get_version_stamp(self) -> dict[str, Any] | None:
+        """
+        Returns the values of the version fields of the displayed object
+        or None if it doesn't exist.
+        """
+        queryset: QuerySet = self.get_queryset()  # type: ignore
+        return queryset.filter(
+            slug=self.kwargs.get(self.slug_url_kwarg)
+        ).values(*self.version_fields).first()
+
+    def get_last_modified(self, stamp: dict[str, Any]) -> datetime | None:
+        dates = [value for value in stamp.values() if isinstance(value, datetime)]
+        return max(dates, default=None)
+
+    def get_etag(self, stamp: dict[str, Any]) -> str:
+        """
+        Returns the weak ETag of the page, the rendered page also depends
+        on the current user.
+        """
+        user_pk = self.request.user.pk if self.request.user.is_authenticated else None
+        version = repr((user_pk, sorted(stamp.items())))
+        return f'W/"{hashlib.md5(version.encode(), usedforsecurity=False).hexdigest()}"'
+
+    def dispatch(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        # Pending messages must be rendered, they would get lost with 304 response
+        if request.method not in ('GET', 'HEAD') or len(messages.get_messages(request)):
+            return super().dispatch(request, *args, **kwargs)  # type: ignore
+
+        stamp = self.get_version_stamp()
+        if stamp is None:
+            return super().dispatch(request, *args, **kwargs)  # type: ignore
+
+        etag = self.get_etag(stamp)
+        last_modified = self.get_last_modified(stamp)
+        last_modified_timestamp = (
+            round(last_modified.timestamp()) if last_modified else None
+        )
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified_timestamp
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)  # type: ignore
+            if response.status_code != 200:
+                return response
+
+        if last_modified_timestamp is not None:
+            response.headers['Last-Modified'] = http_date(last_modified_timestamp)
+        response.headers['ETag'] = quote_etag(etag)
+        # The page is user dependent and must be revalidated on every visit
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
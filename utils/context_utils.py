@@ -0,0 +1,52 @@
+import logging
+from typing import Any, Callable
+
+from django.http import HttpRequest, HttpResponse
+from django.utils.functional import SimpleLazyObject
+
+logger = logging.getLogger(__name__)
+
+
+def lazy_context_value(
+    request: HttpRequest, name: str, factory: Callable[[], Any]
+) -> SimpleLazyObject:
+    """
+    Wraps a context processor value, so it is computed only when a template touches it.
+    The provided and evaluated values are recorded on the request.
+    """
+    provided: set[str] | None = getattr(request, 'provided_context_values', None)
+    if provided is None:
+        provided = request.provided_context_values = set()  # type: ignore
+    provided.add(name)
+
+    def evaluate() -> Any:
+        evaluated: set[str] | None = getattr(request, 'evaluated_context_values', None)
+        if evaluated is None:
+            evaluated = request.evaluated_context_values = set()  # type: ignore
+        evaluated.add(name)
+        return factory()
+
+    return SimpleLazyObject(evaluate)
+
+
+class ContextValuesUsageMiddleware:
+    """
+    Logs which lazy context processor values were provided for the request
+    and which of them were actually evaluated by templates.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        response = self.get_response(request)
+        provided: set[str] = getattr(request, 'provided_context_values', set())
+        if provided:
+            evaluated: set[str] = getattr(request, 'evaluated_context_values', set())
+            logger.info(
+                "Context values for %s - evaluated: %s, unused: %s",
+                request.path,
+                sorted(evaluated),
+                sorted(provided - evaluated),
+            )
+        return response
@@ -0,0 +1,202 @@
+import base64
+import json
+from collections.abc import Sequence
+from typing import Any
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Model, Q, QuerySet
+from django.http import Http404, HttpRequest
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage(Sequence):
+    """
+    A single page of the cursor paginator.
+    Provides the same has_next/has_previous API as Django's Page,
+    but links to other pages with cursors instead of page numbers.
+    """
+
+    def __init__(
+        self,
+        object_list: list[Model],
+        paginator: 'CursorPaginator',
+        has_next: bool,
+        has_previous: bool,
+    ) -> None:
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self) -> str:
+        return f'<CursorPage with {len(self.object_list)} objects>'
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def __getitem__(self, index: Any) -> Any:
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self) -> str | None:
+        if not self.has_next() or not self.object_list:
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1], 'next')
+
+    @property
+    def previous_cursor(self) -> str | None:
+        if not self.has_previous() or not self.object_list:
+            return None
+        return self.paginator.encode_cursor(self.object_list[0], 'previous')
+
+
+class CursorPaginator:
+    """
+    Keyset paginator which filters on the values of the ordering fields
+    of the last (or first) displayed object instead of using OFFSET,
+    so every page costs the same. It doesn't count the total number of objects.
+
+    The ordering must be unique, so it should end with the primary key,
+    e.g. ['-pub_date', '-pk'].
+    """
+
+    def __init__(self, queryset: QuerySet, per_page: int, ordering: list[str]) -> None:
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = ordering
+
+    @property
+    def fields(self) -> list[str]:
+        return [field.lstrip('-') for field in self.ordering]
+
+    def encode_cursor(self, obj: Model, direction: str) -> str:
+        values = [getattr(obj, field) for field in self.fields]
+        data = json.dumps({'d': direction, 'v': values}, cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor: str) -> tuple[str, list[Any]]:
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(cursor + padding))
+            direction, values = data['d'], data['v']
+        except (ValueError, TypeError, KeyError) as error:
+            raise InvalidCursor('Invalid cursor.') from error
+
+        if direction not in ('next', 'previous') or len(values) != len(self.fields):
+            raise InvalidCursor('Invalid cursor.')
+        return direction, values
+
+    def _get_keyset_filter(self, values: list[Any], reverse: bool) -> Q:
+        """
+        Builds the filter selecting objects placed after the given values
+        (or before them if reverse is True) according to the ordering.
+        """
+        keyset_filter = Q()
+        for index, field in enumerate(self.ordering):
+            descending = field.startswith('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition = Q(**{
+                self.fields[number]: values[number] for number in range(index)
+            })
+            condition &= Q(**{f'{self.fields[index]}__{lookup}': values[index]})
+            keyset_filter |= condition
+        return keyset_filter
+
+    def _reverse_ordering(self) -> list[str]:
+        return [
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in self.ordering
+        ]
+
+    def _get_objects(self, values: list[Any], reverse: bool) -> list[Model]:
+        """
+        Returns up to per_page + 1 objects placed after the cursor values,
+        raises InvalidCursor if the values don't fit the ordering fields.
+        """
+        ordering = self._reverse_ordering() if reverse else self.ordering
+        try:
+            return list(
+                self.queryset.filter(
+                    self._get_keyset_filter(values, reverse)
+                ).order_by(*ordering)[:self.per_page + 1]
+            )
+        except (ValidationError, ValueError, TypeError) as error:
+            raise InvalidCursor('Invalid cursor.') from error
+
+    def page(self, cursor: str | None = None) -> CursorPage:
+        if not cursor:
+            objects = list(self.queryset.order_by(*self.ordering)[:self.per_page + 1])
+            return CursorPage(
+                objects[:self.per_page], self,
+                has_next=len(objects) > self.per_page,
+                has_previous=False
+            )
+
+        direction, values = self.decode_cursor(cursor)
+        objects = self._get_objects(values, reverse=direction == 'previous')
+        if not objects:
+            # A stale cursor pointing past the end (or the start) of the list,
+            # e.g. after the objects were deleted, shows the first page
+            return self.page()
+
+        if direction == 'next':
+            return CursorPage(
+                objects[:self.per_page], self,
+                has_next=len(objects) > self.per_page,
+                has_previous=True
+            )
+        return CursorPage(
+            objects[:self.per_page][::-1], self,
+            has_next=True,
+            has_previous=len(objects) > self.per_page
+        )
+
+
+def get_cursor_page(
+    request: HttpRequest,
+    queryset: QuerySet,
+    per_page: int,
+    ordering: list[str],
+    cursor_kwarg: str = 'cursor',
+) -> CursorPage:
+    """
+    Returns the page of the queryset selected by the cursor in the request
+    query string, raises Http404 for invalid cursors.
+    """
+    paginator = CursorPaginator(queryset, per_page, ordering)
+    try:
+        return paginator.page(request.GET.get(cursor_kwarg))
+    except InvalidCursor as error:
+        raise Http404('Invalid cursor.') from error
+
+
+class CursorPaginationMixin:
+    """
+    Mixin replacing the offset pagination of ListView with the cursor pagination.
+    """
+    request: HttpRequest
+    cursor_ordering: list[str] = ['-pk']
+    cursor_kwarg = 'cursor'
+
+    # The paginator and page are typed as Any, because they don't subclass
+    # the Paginator and Page expected by MultipleObjectMixin
+    def paginate_queryset(
+        self, queryset: Any, page_size: int
+    ) -> tuple[Any, Any, list[Model], bool]:
+        page = get_cursor_page(
+            self.request, queryset, page_size, self.cursor_ordering, self.cursor_kwarg
+        )
+        return (page.paginator, page, page.object_list, page.has_other_pages())
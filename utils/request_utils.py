@@ -0,0 +1,23 @@
+from django.http import HttpRequest
+
+
+def get_request_section(request: HttpRequest) -> str | None:
+    """
+    Returns the URL namespace of the website section (e.g. 'blog', 'shop')
+    the request was resolved to, or None if it was not resolved.
+    """
+    resolver_match = getattr(request, 'resolver_match', None)
+    if resolver_match is None:
+        return None
+    return resolver_match.namespace
+
+
+def get_query_string_without(request: HttpRequest, *keys: str) -> str:
+    """
+    Returns the query string of the request without the given parameters,
+    e.g. to keep the list filters in the pagination links.
+    """
+    query = request.GET.copy()
+    for key in keys:
+        query.pop(key, None)
+    return query.urlencode()